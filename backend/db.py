@@ -0,0 +1,252 @@
+"""
+Shared Mongo data-access layer for the Flask app, the scraper and scripts.
+
+Kept free of Flask/ML imports so the GitHub Actions scraper (which only
+installs pymongo) can use it too.
+
+Clients come from `get_client()`: one pooled MongoClient per process,
+configured from the environment (MongoConfig: pool size, timeouts, read
+preference, wire compression) and created lazily. MongoClient is not
+fork-safe, so a client created before a fork (e.g. gunicorn's
+preload_app master) is never reused by the child: the owning pid is
+checked and each worker opens its own pool on first use. Writes of
+articles go through `bulk_upsert_by_link` (one unordered bulk_write,
+deduplicated on the unique `link` index) and reads through
+`find_projected`.
+
+Index management lives here so neither the request handlers nor the
+scraper build indexes inline. Run it as a migration step:
+
+    python db.py            # create any missing index
+    python db.py --dry-run  # print what would be created
+    python db.py --verify   # exit 1 if an index is missing
+"""
+
+import argparse
+import os
+import sys
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+DB_NAME = "NewsBiasApp"
+COLLECTION_NAME = "NewsArtciles"
+
+# single-document collection holding the articles' data version stamp
+META_COLLECTION_NAME = "meta"
+DATA_VERSION_ID = "articles"
+
+# (name, keys, options) for every index the app's queries rely on. Names
+# are Mongo's defaults, so indexes created elsewhere (e.g. the Next.js
+# search route) are recognised instead of conflicting.
+INDEXES = [
+    # $text search in /search
+    ("title_text_text_text", [("title", "text"), ("text", "text")], {}),
+    # dedupe on insert: re-runs of the scraper skip known links
+    ("link_1", [("link", 1)], {"unique": True}),
+    # newest-first listing, keyset pagination and retention; also serves
+    # any sort or range query on published_date alone (index prefix)
+    ("published_date_-1__id_-1", [("published_date", -1), ("_id", -1)], {}),
+]
+
+
+def mongo_url():
+    return str(os.getenv("MONGO_DB_URI")) + "&ssl_cert_reqs=CERT_NONE"
+
+
+def _env(name, default, cast=str):
+    # read when the config is built, i.e. after dotenv.load_dotenv()
+    return field(default_factory=lambda: cast(os.getenv(name, default)))
+
+
+@dataclass
+class MongoConfig:
+    uri: str = field(default_factory=mongo_url)
+    # connections per process; bounds what each gunicorn worker can open
+    max_pool_size: int = _env("MONGO_MAX_POOL_SIZE", "20", int)
+    min_pool_size: int = _env("MONGO_MIN_POOL_SIZE", "0", int)
+    max_idle_time_ms: int = _env("MONGO_MAX_IDLE_TIME_MS", "60000", int)
+    # how long a request waits for a free pooled connection before failing
+    wait_queue_timeout_ms: int = _env("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000", int)
+    server_selection_timeout_ms: int = _env("MONGO_SERVER_SELECTION_TIMEOUT_MS", "30000", int)
+    connect_timeout_ms: int = _env("MONGO_CONNECT_TIMEOUT_MS", "10000", int)
+    socket_timeout_ms: int = _env("MONGO_SOCKET_TIMEOUT_MS", "30000", int)
+    # reads tolerate a secondary when the primary is unavailable
+    read_preference: str = _env("MONGO_READ_PREFERENCE", "primaryPreferred")
+    # "zstd" / "snappy" need the optional zstandard / python-snappy packages
+    compressors: str = _env("MONGO_COMPRESSORS", "zlib")
+    app_name: str = _env("MONGO_APP_NAME", "news-bias-detector")
+
+    def client_kwargs(self):
+        return {
+            "maxPoolSize": self.max_pool_size,
+            "minPoolSize": self.min_pool_size,
+            "maxIdleTimeMS": self.max_idle_time_ms,
+            "waitQueueTimeoutMS": self.wait_queue_timeout_ms,
+            "serverSelectionTimeoutMS": self.server_selection_timeout_ms,
+            "connectTimeoutMS": self.connect_timeout_ms,
+            "socketTimeoutMS": self.socket_timeout_ms,
+            "readPreference": self.read_preference,
+            "compressors": self.compressors,
+            "appname": self.app_name,
+            "retryWrites": True,
+            # no background connection until the first operation
+            "connect": False,
+        }
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_client(config: MongoConfig = None):
+    """This process's shared MongoClient, created on first use.
+
+    `config` only applies when the client is (re)created.
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                from pymongo import MongoClient
+
+                # a client inherited across fork is dropped, not closed:
+                # its sockets belong to the parent
+                config = config or MongoConfig()
+                _client = MongoClient(config.uri, **config.client_kwargs())
+                _client_pid = pid
+    return _client
+
+
+def get_db(config: MongoConfig = None):
+    return get_client(config)[DB_NAME]
+
+
+def get_collection(name=COLLECTION_NAME, config: MongoConfig = None):
+    return get_db(config)[name]
+
+
+def close_client():
+    global _client, _client_pid
+    with _client_lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client, _client_pid = None, None
+
+
+# ---- bulk helpers ------------------------------------------------------
+
+
+def upsert_ops(articles):
+    """UpdateOne upserts keyed on `link`; existing articles are left untouched."""
+    from pymongo import UpdateOne
+
+    return [UpdateOne({"link": a["link"]}, {"$setOnInsert": a}, upsert=True) for a in articles]
+
+
+def bulk_upsert_by_link(collection, articles):
+    """Insert new articles in one unordered bulk_write; returns (added, duplicates).
+
+    Links already stored count as duplicates. Articles without a link are
+    skipped (and counted as duplicates) since they cannot be deduplicated.
+    """
+    from pymongo.errors import BulkWriteError
+
+    articles = list(articles)
+    ops = upsert_ops(a for a in articles if a.get("link"))
+    if not ops:
+        return 0, len(articles)
+    try:
+        added = collection.bulk_write(ops, ordered=False).upserted_count
+    except BulkWriteError as bwe:
+        # concurrent upserts of one link race on the unique index
+        added = bwe.details.get("nUpserted", 0)
+    return added, len(articles) - added
+
+
+def find_projected(collection, query=None, fields=(), sort=None, limit=0, batch_size=0):
+    """Cursor over `query` returning only `fields` (plus _id unless excluded
+    with "-_id"); the server never sends the rest of the document."""
+    projection = {f: 1 for f in fields if f != "-_id"}
+    if "-_id" in fields:
+        projection["_id"] = 0
+    cursor = collection.find(query or {}, projection or None, limit=limit, batch_size=batch_size)
+    return cursor.sort(sort) if sort else cursor
+
+
+def _index_matches(keys, options, info):
+    """Whether an index_information() entry implements a declared index."""
+    text_fields = [field for field, kind in keys if kind == "text"]
+    if text_fields:
+        return sorted(info.get("weights", {})) == sorted(text_fields)
+    return list(info["key"]) == list(keys) and info.get("unique", False) == options.get(
+        "unique", False
+    )
+
+
+def verify_indexes(collection):
+    """Names of declared indexes that are missing on `collection`."""
+    existing = collection.index_information().values()
+    return [
+        name
+        for name, keys, options in INDEXES
+        if not any(_index_matches(keys, options, info) for info in existing)
+    ]
+
+
+def ensure_indexes(collection, dry_run=False):
+    """Create any missing declared index; returns the names (to be) created."""
+    missing = verify_indexes(collection)
+    for name, keys, options in INDEXES:
+        if name in missing and not dry_run:
+            collection.create_index(keys, name=name, **options)
+    return missing
+
+
+def get_data_version(db):
+    """Current articles version stamp (0 before the first bump)."""
+    doc = db[META_COLLECTION_NAME].find_one({"_id": DATA_VERSION_ID}, {"version": 1})
+    return doc["version"] if doc else 0
+
+
+def bump_data_version(db):
+    """Mark the articles as changed so API response caches are invalidated."""
+    from pymongo import ReturnDocument
+
+    doc = db[META_COLLECTION_NAME].find_one_and_update(
+        {"_id": DATA_VERSION_ID},
+        {"$inc": {"version": 1}, "$set": {"updated_at": datetime.now(timezone.utc)}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return doc["version"]
+
+
+def main():
+    import dotenv
+
+    parser = argparse.ArgumentParser(description="Create or verify the app's Mongo indexes.")
+    parser.add_argument("--dry-run", action="store_true", help="only print missing indexes")
+    parser.add_argument("--verify", action="store_true", help="exit 1 if any index is missing")
+    args = parser.parse_args()
+
+    dotenv.load_dotenv()
+    collection = get_collection()
+
+    if args.verify or args.dry_run:
+        missing = verify_indexes(collection)
+        for name in missing:
+            print(f"missing index: {name}")
+        print("indexes OK" if not missing else f"{len(missing)} index(es) missing")
+        if args.verify and missing:
+            sys.exit(1)
+        return
+
+    created = ensure_indexes(collection)
+    print(f"created: {', '.join(created)}" if created else "indexes OK")
+
+
+if __name__ == "__main__":
+    main()
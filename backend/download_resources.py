@@ -1,9 +1,87 @@
-import nltk
+"""
+Download and verify the NLTK data the preprocessor needs.
+
+    python download_resources.py           # download (image build, CI)
+    python download_resources.py --verify  # exit 1 unless every resource loads
+
+The Docker image runs both at build time and sets NLTK_DATA_VERIFIED=1,
+so main.py skips its per-boot lookups (ensure_resources).
+"""
+
+import argparse
+import os
+import sys
+
+# nltk.download id -> path nltk.data.find resolves it under
+RESOURCES = {
+    "punkt": "tokenizers/punkt",
+    "stopwords": "corpora/stopwords",
+    "wordnet": "corpora/wordnet",
+}
+
+LOCAL_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nltk_data")
+
 
 def download_resources():
-    resources = ['punkt', 'stopwords', 'wordnet']
-    for resource in resources:
+    import nltk
+
+    for resource in RESOURCES:
         nltk.download(resource)
 
+
+def missing_resources():
+    """Ids of RESOURCES that cannot be found or do not load."""
+    import nltk
+
+    missing = []
+    for resource, path in RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            missing.append(resource)
+    if "stopwords" not in missing:
+        try:
+            nltk.corpus.stopwords.words("english")
+        except (LookupError, OSError):
+            missing.append("stopwords")
+    if "wordnet" not in missing:
+        try:
+            nltk.corpus.wordnet.ensure_loaded()
+        except (LookupError, OSError):
+            missing.append("wordnet")
+    return missing
+
+
+def ensure_resources(download_dir=LOCAL_DATA_DIR):
+    """Boot-time fallback: download whatever is missing into `download_dir`."""
+    import nltk
+
+    os.makedirs(download_dir, exist_ok=True)
+    if download_dir not in nltk.data.path:
+        nltk.data.path.append(download_dir)
+    for resource, path in RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            print(f"Downloading NLTK resource: {resource}")
+            nltk.download(resource, download_dir=download_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download or verify NLTK data.")
+    parser.add_argument("--verify", action="store_true", help="exit 1 if a resource is missing")
+    args = parser.parse_args()
+
+    if not args.verify:
+        download_resources()
+        return
+    missing = missing_resources()
+    for resource in missing:
+        print(f"missing NLTK resource: {resource}")
+    print("NLTK data OK" if not missing else f"{len(missing)} NLTK resource(s) missing")
+    if missing:
+        sys.exit(1)
+
+
 if __name__ == "__main__":
-    download_resources()
\ No newline at end of file
+    main()
@@ -0,0 +1,173 @@
+"""
+Persistent fetch cache for the news scraper.
+
+Keeps, between cron runs, in one small JSON file:
+
+  * the ETag / Last-Modified validators of every feed and sitemap, so the
+    next run sends a conditional request and reuses the cached link list
+    on a 304 instead of re-downloading and re-parsing it;
+  * a set of links already handled, so known articles are never downloaded
+    or extracted again. A link is added once its article has been written
+    to Mongo (`mark_fetched`), or once its page was downloaded and dropped
+    (unextractable, junk or a near-duplicate; `mark_seen`), so only an
+    article lost to a failed write or a crash is fetched again next run.
+    It is topped up in bulk from
+    Mongo's `link` field, which keeps it correct even when the local file
+    is lost.
+"""
+
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+from dataclasses import dataclass
+
+from db import find_projected
+
+
+@dataclass
+class FetchCacheConfig:
+    path: str = os.getenv(
+        "SCRAPE_CACHE_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), ".scrape_cache.json"),
+    )
+    # links remembered locally; the oldest are dropped past this
+    max_seen: int = int(os.getenv("SCRAPE_CACHE_MAX_SEEN", "20000"))
+    # fallback page size used to estimate bytes saved before any page is measured
+    default_page_bytes: int = 150_000
+
+
+class FetchCache:
+    def __init__(self, config: FetchCacheConfig = None):
+        self.config = config or FetchCacheConfig()
+        self.feeds = {}
+        self.seen = {}  # link -> None; a dict keeps insertion order for trimming
+        self.page_bytes = [0, 0]  # [total bytes, pages] across runs
+        self._lock = threading.Lock()  # discovery threads update feeds/stats
+        self.stats = {
+            "feeds_not_modified": 0,
+            "feeds_fetched": 0,
+            "seen_skipped": 0,
+            "pages_fetched": 0,
+            "bytes_fetched": 0,
+            "bytes_saved": 0,
+        }
+
+    @classmethod
+    def load(cls, config: FetchCacheConfig = None):
+        cache = cls(config)
+        try:
+            with open(cache.config.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            cache.feeds = data.get("feeds", {})
+            cache.seen = dict.fromkeys(data.get("seen", []))
+            cache.page_bytes = data.get("page_bytes", [0, 0])
+        except FileNotFoundError:
+            pass
+        except Exception as ex:
+            print(f"fetch cache unreadable ({type(ex).__name__}), starting fresh")
+        return cache
+
+    def save(self):
+        seen = list(self.seen)[-self.config.max_seen :]
+        tmp_path = f"{self.config.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"feeds": self.feeds, "seen": seen, "page_bytes": self.page_bytes}, f)
+        os.replace(tmp_path, self.config.path)
+
+    def load_seen_from_collection(self, collection):
+        """Bulk-load every stored link in one projected query."""
+        before = len(self.seen)
+        for doc in find_projected(collection, fields=("link", "-_id"), batch_size=10000):
+            if doc.get("link"):
+                self.seen.setdefault(doc["link"], None)
+        print(f"fetch cache: {len(self.seen) - before} links loaded from Mongo")
+
+    # ---- article pages -------------------------------------------------
+
+    @property
+    def avg_page_bytes(self):
+        total, pages = self.page_bytes
+        return total // pages if pages else self.config.default_page_bytes
+
+    def is_seen(self, url):
+        if url in self.seen:
+            self.stats["seen_skipped"] += 1
+            self.stats["bytes_saved"] += self.avg_page_bytes
+            return True
+        return False
+
+    def record_fetch(self, nbytes):
+        """Count a downloaded page (the link is not remembered yet)."""
+        self.stats["pages_fetched"] += 1
+        self.stats["bytes_fetched"] += nbytes
+        self.page_bytes = [self.page_bytes[0] + nbytes, self.page_bytes[1] + 1]
+
+    def mark_seen(self, url):
+        """Remember a downloaded link that will not be stored; fetching it
+        again would only drop it again."""
+        self.seen[url] = None
+
+    def mark_fetched(self, articles):
+        """Remember the links of `articles`; call once they are written to
+        Mongo or dropped before the write."""
+        for article in articles:
+            if article.get("link"):
+                self.mark_seen(article["link"])
+
+    # ---- feeds and sitemaps --------------------------------------------
+
+    def validators(self, url):
+        entry = self.feeds.get(url, {})
+        return entry.get("etag"), entry.get("modified")
+
+    def not_modified(self, url):
+        """Count a 304 and return the link list cached for `url`."""
+        entry = self.feeds.get(url, {})
+        with self._lock:
+            self.stats["feeds_not_modified"] += 1
+            self.stats["bytes_saved"] += entry.get("bytes", 0)
+        return [tuple(link) for link in entry.get("links", [])]
+
+    def store_feed(self, url, etag, modified, links, nbytes=0):
+        with self._lock:
+            self.stats["feeds_fetched"] += 1
+            self.feeds[url] = {
+                "etag": etag,
+                "modified": modified,
+                "links": [list(link) for link in links],
+                "bytes": nbytes,
+            }
+
+    def probe(self, url, timeout=30):
+        """Conditional HEAD of `url` with the cached validators.
+
+        Returns (status, etag, modified); status is 304 when unchanged.
+        Used for sitemaps, whose discovery (trafilatura) cannot send
+        conditional requests itself.
+        """
+        etag, modified = self.validators(url)
+        req = urllib.request.Request(url, method="HEAD", headers={"User-Agent": "Mozilla/5.0"})
+        if etag:
+            req.add_header("If-None-Match", etag)
+        if modified:
+            req.add_header("If-Modified-Since", modified)
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                return resp.status, resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+        except urllib.error.HTTPError as err:
+            if err.code == 304:
+                return 304, etag, modified
+            return err.code, None, None
+        except (urllib.error.URLError, OSError):
+            return None, None, None
+
+    def summary(self):
+        s = self.stats
+        return (
+            f"cache: {s['feeds_not_modified']} feeds not modified, "
+            f"{s['seen_skipped']} known links skipped, "
+            f"{s['pages_fetched']} pages fetched ({s['bytes_fetched'] / 1e6:.1f} MB), "
+            f"~{s['bytes_saved'] / 1e6:.1f} MB saved"
+        )
@@ -0,0 +1,54 @@
+"""
+Gunicorn settings for the production API (Dockerfile CMD).
+
+    gunicorn -c gunicorn.conf.py main:app
+
+preload_app imports main.py once in the master: NLTK corpora, the model
+registry (model.pkl + preprocess.pkl, warmed by main.warm_model) and the
+search backend are loaded before the workers fork, so they share those
+pages copy-on-write instead of each loading its own copy. gc.freeze()
+moves everything loaded so far out of the collector's reach, so garbage
+collection in a worker does not touch (and copy) the shared pages.
+
+Mongo clients (db.get_client) and ONNX sessions are per process and are
+created again in each worker on first use.
+"""
+
+import gc
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+preload_app = True
+
+# processes; each serves `threads` requests at once. Inference releases
+# the GIL in xgboost/numpy, and most other requests wait on Mongo.
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+worker_class = "gthread" if threads > 1 else "sync"
+
+# /scaper and /get-scrape can run for minutes
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+# recycle workers after this many requests (0 = never)
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+
+# heartbeat files on tmpfs; a slow overlay disk can get workers killed
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+accesslog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def when_ready(server):
+    # runs in the master after the app is loaded, before the first fork
+    gc.freeze()
+    server.log.info(f"preloaded app; {workers} workers x {threads} threads")
+
+
+def post_worker_init(worker):
+    # re-creates per-process state (e.g. the ONNX session) before the
+    # worker accepts requests; a no-op for the preloaded pickle model
+    import main
+
+    main.warm_model()
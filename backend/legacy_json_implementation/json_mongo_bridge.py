@@ -1,10 +1,13 @@
 import json
-from pymongo import MongoClient
+import os
+import sys
 
-client = MongoClient('mongodb://localhost:27017/')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db import MongoConfig, get_collection  # noqa: E402
 
-db = client['NewsBiasApp']
-collection = db['NewsArtciles']
+# pooled client from db.py (pool size and timeouts from MONGO_* env vars),
+# still pointed at the local server this script has always loaded into
+collection = get_collection(config=MongoConfig(uri='mongodb://localhost:27017/'))
 
 with open('./news_articles.json', 'r', encoding='utf-8') as f:
     articles = json.load(f)
@@ -1,63 +1,94 @@
 import os
-import subprocess
+import base64
+import threading
+from datetime import datetime
 
-# Ensure NLTK resources are downloaded
-subprocess.run(["python", "download_resources.py"])
+# Heavy imports are deferred to first use: pandas/sklearn/xgboost/nltk load
+# with the model (warm_model, or the first prediction with PRELOAD_MODEL=0)
+# and trafilatura with the scrape endpoints. scripts/startup_profile.py
+# reports what a cold import of this module costs.
 
-from flask import Flask, jsonify, request
-import pandas as pd
-from src.pipeline.predict_pipeline import PredictPipeline
+from flask import Flask, Response, jsonify, request, stream_with_context
+from src.pipeline.predict_pipeline import load_predict_pipeline
 from flask_cors import CORS
-import webscapper
-import json
-from nltk.data import find
-import nltk
-from pymongo import MongoClient
-from bson.json_util import dumps
-from pymongo.errors import BulkWriteError
+from db import (
+    bump_data_version,
+    bulk_upsert_by_link,
+    ensure_indexes,
+    get_collection,
+    get_data_version,
+    get_db,
+)
+from retention import delete_oldest, filter_batch
+from retention import enforce as enforce_retention
+from response_cache import ResponseCache
+from bson import ObjectId
+from bson.json_util import dumps, loads
 import dotenv
 
 # Load environment variables
 dotenv.load_dotenv()
 
+# NLTK data is downloaded and verified when the image is built
+# (download_resources.py --verify), which sets NLTK_DATA_VERIFIED=1; other
+# environments check it here and fetch anything missing
+if os.getenv("NLTK_DATA_VERIFIED") != "1":
+    from download_resources import ensure_resources
 
-def ensure_nltk_resource(resource_name):
-    nltk_data_dir = os.path.join(
-        os.path.dirname(
-            os.path.abspath(
-                __file__,
-            )
-        ),
-        "nltk_data",
-    )
-    os.makedirs(
-        nltk_data_dir,
-        exist_ok=True,
-    )
-
-    if nltk_data_dir not in nltk.data.path:
-        nltk.data.path.append(nltk_data_dir)
+    ensure_resources()
 
+# MongoDB: handlers call get_collection()/get_db() per request, so each
+# (forked) worker lazily opens its own bounded pool (db.MongoConfig).
+# Indexes are normally a migration step (python db.py);
+# ENSURE_INDEXES_ON_START=0 skips the round trips at boot.
+if os.getenv("ENSURE_INDEXES_ON_START", "1") == "1":
     try:
-        find(resource_name)
+        ensure_indexes(get_collection())
+    except Exception as e:
+        print(f"index note: {e}")
 
-    except LookupError:
-        print(f"Downloading NLTK resource: {resource_name}")
-        nltk.download(
-            resource_name,
-            download_dir=nltk_data_dir,
-        )
+# pre-serialised /cache and /search responses, invalidated by the version
+# stamp the scraper bumps after each run
+response_cache = ResponseCache(version_fn=lambda: get_data_version(get_db()))
 
+# "mongo" ($text) or "bm25" (in-process index, src/search_index.py)
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "mongo")
+bm25_backend = None
+if SEARCH_BACKEND == "bm25":
+    from src.search_index import BM25SearchBackend
 
-ensure_nltk_resource("punkt")
-ensure_nltk_resource("wordnet")
-ensure_nltk_resource("stopwords")
+    bm25_backend = BM25SearchBackend()
 
-# MongoDB setup
-mongodb_url = str(os.getenv("MONGO_DB_URI")) + "&ssl_cert_reqs=CERT_NONE"
-client = MongoClient(mongodb_url)
-db = client["NewsBiasApp"]
-collection = db["NewsArtciles"]
+# one pipeline per worker; artifacts are loaded once and hot-reloaded by
+# the model registry when a retrain replaces them. INFERENCE_ENGINE=onnx
+# serves model.onnx through onnxruntime instead of the pickles.
+predict_pipeline = load_predict_pipeline()
+
+# request limits for /predict-batch
+PREDICT_MAX_ARTICLES = int(os.getenv("PREDICT_MAX_ARTICLES", "1000"))
+PREDICT_MAX_BATCH_SIZE = int(os.getenv("PREDICT_MAX_BATCH_SIZE", "512"))
+
+# set once a model is loaded and has served a prediction; /ready reports it
+model_ready = threading.Event()
+_warm_lock = threading.Lock()
+
+
+def warm_model():
+    """Load the model and run one prediction so the first request is not
+    slowed by unpickling or NLTK's lazy loaders. Under gunicorn with
+    preload_app this runs in the master, before workers fork, so every
+    worker shares the loaded model copy-on-write (see gunicorn.conf.py)."""
+    with _warm_lock:
+        try:
+            predict_pipeline.predict("warm up")
+            model_ready.set()
+        except Exception as e:
+            print(f"model warm-up failed: {e}")
+    return model_ready.is_set()
+
+
+if os.getenv("PRELOAD_MODEL", "1") == "1":
+    warm_model()
 
 app = Flask(__name__)
 CORS(
@@ -80,6 +111,25 @@ def home():
     return jsonify(message="Welcome to the News Classifier API")
 
 
+@app.route("/ready")
+def ready():
+    """
+    Readiness probe: 200 once the model is loaded and warm, 503 before.
+
+    If the model is not warm yet (PRELOAD_MODEL=0, or the preload failed), a
+    background warm-up is started and the probe keeps answering 503 until it
+    succeeds.
+
+    Returns:
+        JSON: {"ready": bool} and, when ready, the model version.
+    """
+    if model_ready.is_set():
+        return jsonify({"ready": True, "model_version": predict_pipeline.model_version})
+    if not _warm_lock.locked():
+        threading.Thread(target=warm_model, daemon=True).start()
+    return jsonify({"ready": False}), 503
+
+
 @app.route("/predict", methods=["POST"])
 def bias():
     """
@@ -96,11 +146,7 @@ def bias():
     """
     try:
         data = request.json
-        pred = pd.DataFrame([data])
-        pred["text"] = pred["title"] + pred["text"]
-        predict_pipeline = PredictPipeline()
-
-        result = predict_pipeline.predict(pred["text"].iloc[0])
+        result = predict_pipeline.predict(data["title"] + data["text"])
 
         return jsonify(
             {
@@ -119,6 +165,93 @@ def bias():
         )
 
 
+@app.route("/predict-batch", methods=["POST"])
+def bias_batch():
+    """
+    Handles POST requests to the /predict-batch endpoint to score many articles at once.
+
+    The function expects a JSON payload with an 'articles' list (at most
+    PREDICT_MAX_ARTICLES) of {'title', 'text'} objects and an optional positive
+    integer 'batch_size', capped at PREDICT_MAX_BATCH_SIZE. Articles are scored in
+    chunks with one vectorised transform and predict_proba call per chunk.
+
+    Returns:
+        JSON: A JSON response with one {'bias', 'probability'} entry per article, in
+        input order, and the version of the model that scored them, or an error
+        message (400 for a malformed payload, 413 for too many articles).
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get("articles"), list):
+        return jsonify({"error": "Expected an 'articles' list"}), 400
+
+    articles = data["articles"]
+    if len(articles) > PREDICT_MAX_ARTICLES:
+        return jsonify({"error": f"At most {PREDICT_MAX_ARTICLES} articles per request"}), 413
+    for i, a in enumerate(articles):
+        if not isinstance(a, dict) or not all(
+            isinstance(a.get(key), (str, type(None))) for key in ("title", "text")
+        ):
+            return jsonify({"error": f"articles[{i}] must be an object with string 'title' and 'text'"}), 400
+
+    batch_size = data.get("batch_size")
+    if batch_size is not None:
+        if isinstance(batch_size, bool) or not isinstance(batch_size, int) or batch_size < 1:
+            return jsonify({"error": "'batch_size' must be a positive integer"}), 400
+        batch_size = min(batch_size, PREDICT_MAX_BATCH_SIZE)
+
+    try:
+        texts = [f"{a.get('title') or ''}{a.get('text') or ''}" for a in articles]
+        # results and version come from the same model snapshot, even if a
+        # hot reload lands mid-request
+        results, version = predict_pipeline.predict_batch(texts, batch_size, with_version=True)
+
+        return jsonify(
+            {
+                "model_version": version,
+                "results": [
+                    {
+                        "bias": r["label"],
+                        "probability": r["probability"],
+                    }
+                    for r in results
+                ],
+            }
+        )
+
+    except Exception as e:
+        return (
+            jsonify(
+                {
+                    "error": f"Failed to predict: {e}",
+                }
+            ),
+            500,
+        )
+
+
+@app.route("/model", methods=["GET"])
+def model_info():
+    """
+    Reports the state of the inference engine (the shared model registry, or
+    the ONNX session).
+
+    Returns:
+        JSON: The engine, loaded model version, load/reload counts and load timings.
+    """
+    try:
+        return jsonify(predict_pipeline.stats())
+
+    except Exception as e:
+        return (
+            jsonify(
+                {
+                    "error": f"Failed to load model: {e}",
+                }
+            ),
+            500,
+        )
+
+
 @app.route("/get-scrape", methods=["GET", "POST"])
 def get_scrape():
     """
@@ -146,6 +279,8 @@ def get_scrape():
     if not websites:
         return jsonify({"error": "No websites provided"}), 400
 
+    import webscapper
+
     results = webscapper.scrape(websites, count)
     valid_results = [r for r in results if r.get("title") and r.get("text")]
 
@@ -205,71 +340,163 @@ def scrape():
     if not websites:
         return jsonify({"error": "No websites provided"}), 400
 
+    import webscapper
+
     results = webscapper.scrape(websites, count)
     valid_results = [r for r in results if r.get("title") and r.get("text")]
+    filter_batch(valid_results)
 
     if not valid_results:
         return jsonify({"message": "No valid results to insert"}), 200
 
-    added_count = 0
-    duplicate_count = 0
-
+    collection = get_collection()
     try:
-        result = collection.insert_many(valid_results, ordered=False)
-        added_count = len(result.inserted_ids)
-        duplicate_count = len(valid_results) - added_count
-
-    except BulkWriteError as bwe:
-        write_errors = bwe.details.get("writeErrors", [])
-        added_count = len(valid_results) - len(write_errors)
-        duplicate_count = len(write_errors)
+        added_count, duplicate_count = bulk_upsert_by_link(collection, valid_results)
 
     except Exception as e:
         return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
 
-    unwanted_texts = [
-        "",
-        "Get App for Better Experience",
-        "Log onto movie.ndtv.com for more celebrity pictures",
-        "No description available.",
-    ]
-
-    collection.delete_many(
-        {"title": {"$exists": True, "$regex": "^(?i)(dell|hp|acer|lenovo)"}}
-    )
-    collection.delete_many({"text": {"$in": unwanted_texts}})
-
-    total_count = collection.count_documents({})
-    if total_count > 1500:
-        excess_docs = total_count - 1500
-        oldest_docs = (
-            collection.find({}, {"_id": 1}).sort("published_date", 1).limit(excess_docs)
-        )
-        doc_ids = [doc["_id"] for doc in oldest_docs]
-        if doc_ids:
-            collection.delete_many({"_id": {"$in": doc_ids}})
+    retention = enforce_retention(collection)
 
     return jsonify(
         {
             "message": "Scraping completed!",
             "added_articles": added_count,
             "duplicates_skipped": duplicate_count,
+            "retention_removed": retention["removed"],
         }
     )
 
 
+CACHE_MAX_PAGE_SIZE = 200
+SEARCH_DEFAULT_LIMIT = 50
+LIST_VIEW_EXCLUDE = {"text": 0}
+
+
+def _encode_cursor(doc):
+    """Opaque keyset cursor for the (published_date, _id) sort position."""
+    token = dumps({"d": doc.get("published_date"), "i": doc["_id"]})
+    return base64.urlsafe_b64encode(token.encode()).decode()
+
+
+def _decode_cursor(cursor):
+    """(published_date, _id) of a cursor from _encode_cursor; ValueError if malformed."""
+    try:
+        last = loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        date, _id = last["d"], last["i"]
+    except Exception as e:
+        # bad base64/UTF-8/JSON, a bad $oid or $date, or not a cursor object
+        raise ValueError(f"Invalid cursor: {type(e).__name__}") from e
+    if not isinstance(_id, ObjectId) or not (date is None or isinstance(date, (datetime, str))):
+        raise ValueError("Invalid cursor")
+    return date, _id
+
+
+def _keyset_filter(cursor):
+    """Documents strictly after `cursor` in (published_date, _id) desc order.
+
+    BSON sorts date > string > null, and `$lt` only compares values of the
+    same type, so the lower bands are matched explicitly: string dates
+    (stored before retention's backfill converted them) follow every real
+    date, and missing/null dates come last. Raises ValueError for a
+    malformed cursor.
+    """
+    date, _id = _decode_cursor(cursor)
+    if date is None:
+        return {"published_date": None, "_id": {"$lt": _id}}
+    clauses = [
+        {"published_date": {"$lt": date}},
+        {"published_date": date, "_id": {"$lt": _id}},
+        {"published_date": None},
+    ]
+    if not isinstance(date, str):
+        clauses.append({"published_date": {"$type": "string"}})
+    return {"$or": clauses}
+
+
+def _projection(fields, view):
+    """`fields` (list or comma string) keeps only those fields; `view="list"`
+    drops the full article text."""
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    fields = [f.strip() for f in fields or [] if f.strip()]
+    if fields:
+        return {f: 1 for f in fields + ["published_date"]}
+    if view == "list":
+        return dict(LIST_VIEW_EXCLUDE)
+    return None
+
+
+def _stream_documents(first, docs, as_ndjson, envelope=None):
+    """Encode BSON documents one at a time, straight to JSON text.
+
+    Yields a JSON array (or an {"articles": [...], ...} envelope when
+    paginating), or one document per line for NDJSON.
+    """
+    if as_ndjson:
+        if first is None:
+            return
+        yield dumps(first) + "\n"
+        for doc in docs:
+            yield dumps(doc) + "\n"
+        return
+
+    yield '{"articles": [' if envelope is not None else "["
+    if first is not None:
+        yield dumps(first)
+        for doc in docs:
+            yield "," + dumps(doc)
+    if envelope is None:
+        yield "]"
+    else:
+        yield "], " + dumps(envelope)[1:]
+
+
 @app.route("/cache", methods=["GET", "OPTIONS"])
+@response_cache.cached
 def cache():
     """
     Retrieves cached data from the database, sorted by published date in descending order.
 
+    Query parameters (all optional):
+        limit:  page size (max 200). Without it every document is returned as
+                a plain JSON array, as before.
+        cursor: the `next_cursor` of the previous page (keyset pagination on
+                published_date + _id, so deep pages cost the same as the first).
+        fields: comma-separated projection, e.g. `fields=title,link,thumbnail`.
+        view:   `list` to omit the full article text. Ingest-time bias scores
+                (bias, bias_probability, model_version) are kept in every view.
+        format: `ndjson` to stream one document per line; the next page cursor
+                is sent in the X-Next-Cursor header.
+
     Returns:
-        Response: A JSON response containing the cached data if available,
+        Response: A streamed JSON response containing the cached data if available,
                 or an error message if no cached data is found or if an exception occurs.
     """
     try:
-        entire_data = list(collection.find().sort("published_date", -1))
-        if not entire_data:
+        args = request.args
+        limit = args.get("limit", type=int)
+        page_cursor = args.get("cursor")
+        projection = _projection(args.get("fields"), args.get("view"))
+        as_ndjson = args.get("format") == "ndjson"
+
+        try:
+            query = _keyset_filter(page_cursor) if page_cursor else {}
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        docs = get_collection().find(query, projection).sort(
+            [("published_date", -1), ("_id", -1)]
+        )
+        if limit is not None:
+            limit = max(1, min(limit, CACHE_MAX_PAGE_SIZE))
+            page = list(docs.limit(limit))
+            next_cursor = _encode_cursor(page[-1]) if len(page) == limit else None
+            first, docs = (page[0], iter(page[1:])) if page else (None, iter(()))
+        else:
+            next_cursor = None
+            first = next(docs, None)
+
+        if first is None and not page_cursor:
             return (
                 jsonify(
                     {
@@ -278,7 +505,16 @@ def cache():
                 ),
                 404,
             )
-        return jsonify(json.loads(dumps(entire_data)))
+
+        envelope = {"next_cursor": next_cursor} if limit is not None else None
+        body = _stream_documents(first, docs, as_ndjson, envelope)
+        response = Response(
+            stream_with_context(body),
+            mimetype="application/x-ndjson" if as_ndjson else "application/json",
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return response
 
     except Exception as e:
         return (
@@ -292,6 +528,7 @@ def cache():
 
 
 @app.route("/search", methods=["POST"])
+@response_cache.cached
 def search():
     """
     Handles the search functionality for articles based on a keyword.
@@ -300,6 +537,15 @@ def search():
     collection for matches in the 'title' and 'text' fields using MongoDB's text search.
     The results are sorted by their relevance score.
 
+    Optional payload fields: 'limit' (default 50, max 200) and 'skip' for paging,
+    'fields' to choose the returned fields, and 'view' ('list' by default, which
+    omits the full text; 'full' returns whole documents). The text index is
+    managed by db.ensure_indexes at startup, not per request.
+
+    With SEARCH_BACKEND=bm25 the ranking comes from the in-process BM25 index
+    instead of Mongo's $text, and only the page of matching documents is read
+    from Mongo.
+
     Args:
         None
 
@@ -330,13 +576,32 @@ def search():
         )
 
     try:
-        collection.create_index([("title", "text"), ("text", "text")])
-
-        results = collection.find(
-            {"$text": {"$search": keyword}}, {"score": {"$meta": "textScore"}}
-        ).sort([("score", {"$meta": "textScore"})])
+        limit = max(1, min(int(data.get("limit", SEARCH_DEFAULT_LIMIT)), CACHE_MAX_PAGE_SIZE))
+        skip = max(0, int(data.get("skip", 0)))
+        projection = _projection(data.get("fields"), data.get("view", "list")) or {}
+        collection = get_collection()
+
+        if bm25_backend is not None:
+            bm25_backend.refresh(collection, response_cache.version())
+            ranked = bm25_backend.search(keyword, limit=limit, skip=skip)
+            scores = dict(ranked)
+            found = {
+                doc["_id"]: doc
+                for doc in collection.find({"_id": {"$in": list(scores)}}, projection or None)
+            }
+            articles = [
+                dict(found[key], score=score) for key, score in ranked if key in found
+            ]
+        else:
+            projection["score"] = {"$meta": "textScore"}
+            results = (
+                collection.find({"$text": {"$search": keyword}}, projection)
+                .sort([("score", {"$meta": "textScore"})])
+                .skip(skip)
+                .limit(limit)
+            )
+            articles = list(results)
 
-        articles = list(results)
         if not articles:
             return (
                 jsonify(
@@ -346,7 +611,7 @@ def search():
                 ),
                 404,
             )
-        return jsonify(json.loads(dumps(articles)))
+        return Response(dumps(articles), mimetype="application/json")
 
     except Exception as e:
         return (
@@ -359,26 +624,37 @@ def search():
         )
 
 
+@app.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    """
+    Reports the response cache's hit/miss/eviction counters and memory use.
+
+    Returns:
+        JSON: The cache counters, entry count, cached bytes and data version.
+    """
+    return jsonify(response_cache.stats())
+
+
 @app.route("/delete", methods=["DELETE"])
 def delete():
     """
     Deletes the oldest 1000 documents from the collection based on the published date.
-    This function retrieves the oldest 1000 documents from the MongoDB collection,
-    deletes them, and returns a JSON response indicating the number of documents deleted.
+    The 1000th oldest document is found on the (published_date, _id) index and
+    everything at or before it is removed with one range delete (retention.py).
     Returns:
-        Response: A JSON response containing a message with the number of deleted documents
-                or an error message if the deletion fails.
+        Response: A JSON response with the number of deleted documents and the
+                time spent, or an error message if the deletion fails.
     """
     try:
-        oldest_docs = collection.find().sort("published_date", 1).limit(1000)
-
-        doc_ids = [doc["_id"] for doc in oldest_docs]
+        report = delete_oldest(get_collection(), 1000)
 
-        if doc_ids:
-            result = collection.delete_many({"_id": {"$in": doc_ids}})
+        if report["removed"]:
+            bump_data_version(get_db())
+            response_cache.clear()
             return jsonify(
                 {
-                    "message": f"Deleted {result.deleted_count} documents",
+                    "message": f"Deleted {report['removed']} documents",
+                    "seconds": report["seconds"],
                 }
             )
 
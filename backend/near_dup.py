@@ -0,0 +1,216 @@
+"""
+Near-duplicate detection for scraped articles (MinHash + LSH).
+
+The unique `link` index only catches the same URL twice. A wire story
+syndicated across outlets, or republished under a new URL, has different
+links but nearly the same text. Each article's extracted text is reduced
+to a MinHash signature over word shingles, and an LSH index (signature
+split into `bands` buckets) finds earlier articles that share at least one
+band. Candidates whose estimated Jaccard similarity reaches `threshold`
+are near-duplicates.
+
+Every article gets a `cluster_id`: a new article starts its own cluster
+(a short hash of its link), a near-duplicate joins the cluster of the
+article it matched and also records `duplicate_of` and
+`duplicate_similarity`. With action "drop", near-duplicates are removed
+from the batch before they are scored or inserted instead.
+
+The signatures are kept between cron runs in one .npz file next to this
+module (newest `max_docs` only). When the file is lost the index is
+rebuilt from the texts already stored in Mongo.
+"""
+
+import hashlib
+import os
+import re
+import zlib
+from dataclasses import dataclass
+
+import numpy as np
+
+from db import find_projected
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+WORD_RE = re.compile(r"\w+")
+
+
+@dataclass
+class NearDupConfig:
+    path: str = os.getenv(
+        "NEAR_DUP_INDEX_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), ".near_dup_index.npz"),
+    )
+    enabled: bool = os.getenv("NEAR_DUP", "1") == "1"
+    # "cluster" keeps near-duplicates and tags them; "drop" skips them
+    action: str = os.getenv("NEAR_DUP_ACTION", "cluster")
+    # estimated Jaccard similarity at which two articles are near-duplicates
+    threshold: float = float(os.getenv("NEAR_DUP_THRESHOLD", "0.8"))
+    # words per shingle
+    shingle_size: int = int(os.getenv("NEAR_DUP_SHINGLE", "5"))
+    num_perm: int = int(os.getenv("NEAR_DUP_NUM_PERM", "128"))
+    # num_perm / bands rows per band; more bands catch lower similarities
+    # (more candidates to check), fewer bands only very close copies
+    bands: int = int(os.getenv("NEAR_DUP_BANDS", "32"))
+    # signatures remembered between runs; the oldest are dropped past this
+    max_docs: int = int(os.getenv("NEAR_DUP_MAX_DOCS", "20000"))
+    seed: int = 1
+
+
+def shingles(text, size):
+    """crc32 of every `size`-word shingle of `text` (lowercased)."""
+    words = WORD_RE.findall(text.lower())
+    if len(words) <= size:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))}
+    return {
+        zlib.crc32(" ".join(words[i : i + size]).encode("utf-8"))
+        for i in range(len(words) - size + 1)
+    }
+
+
+def cluster_id_for(link):
+    return hashlib.sha1(link.encode("utf-8")).hexdigest()[:12]
+
+
+class NearDupIndex:
+    def __init__(self, config: NearDupConfig = None):
+        self.config = config or NearDupConfig()
+        config = self.config
+        if config.num_perm % config.bands:
+            raise ValueError("NEAR_DUP_NUM_PERM must be a multiple of NEAR_DUP_BANDS")
+        self.rows = config.num_perm // config.bands
+        rng = np.random.RandomState(config.seed)
+        # universal hashing (a * x + b) mod p, one (a, b) per permutation
+        self._a = rng.randint(1, 1 << 61, size=config.num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 61, size=config.num_perm, dtype=np.uint64)
+
+        self.signatures = []
+        self.links = []
+        self.clusters = []
+        self.buckets = [{} for _ in range(config.bands)]
+        self.stats = {"checked": 0, "duplicates": 0, "dropped": 0, "candidates": 0}
+
+    # ---- persistence ---------------------------------------------------
+
+    def _params(self):
+        c = self.config
+        return np.array([c.num_perm, c.bands, c.shingle_size, c.seed], dtype=np.int64)
+
+    @classmethod
+    def load(cls, config: NearDupConfig = None):
+        index = cls(config)
+        try:
+            with np.load(index.config.path) as data:
+                if not np.array_equal(data["params"], index._params()):
+                    # signatures from other hash settings are not comparable
+                    print("near-dup index built with other settings, starting fresh")
+                    return index
+                for sig, link, cluster in zip(data["signatures"], data["links"], data["clusters"]):
+                    index.add(sig, str(link), str(cluster))
+        except FileNotFoundError:
+            pass
+        except Exception as ex:
+            print(f"near-dup index unreadable ({type(ex).__name__}), starting fresh")
+        return index
+
+    def save(self):
+        keep = slice(-self.config.max_docs, None)
+        tmp_path = f"{self.config.path}.tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            params=self._params(),
+            signatures=np.array(self.signatures[keep], dtype=np.uint32).reshape(-1, self.config.num_perm),
+            links=np.array(self.links[keep], dtype=str),
+            clusters=np.array(self.clusters[keep], dtype=str),
+        )
+        os.replace(tmp_path, self.config.path)
+
+    def load_from_collection(self, collection):
+        """Seed an empty index from the newest `max_docs` stored articles."""
+        if self.links:
+            return
+        cursor = find_projected(
+            collection,
+            fields=("link", "text", "cluster_id", "-_id"),
+            sort=[("_id", -1)],
+            limit=self.config.max_docs,
+        )
+        docs = [d for d in cursor if d.get("link") and d.get("text")]
+        for doc in reversed(docs):
+            self.add(self.signature(doc["text"]), doc["link"], doc.get("cluster_id") or cluster_id_for(doc["link"]))
+        print(f"near-dup index: {len(docs)} articles loaded from Mongo")
+
+    # ---- MinHash / LSH -------------------------------------------------
+
+    def signature(self, text):
+        """MinHash signature (num_perm uint32) of `text`'s shingles."""
+        hashes = shingles(text, self.config.shingle_size)
+        hv = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+        # uint64 products wrap mod 2**64; still a valid hash family
+        permuted = (np.outer(hv, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, sig):
+        r = self.rows
+        return [hash(sig[i * r : (i + 1) * r].tobytes()) for i in range(self.config.bands)]
+
+    def query(self, sig):
+        """(row, similarity) of the most similar indexed article at or above
+        the threshold, or None."""
+        candidates = set()
+        for bucket, key in zip(self.buckets, self._band_keys(sig)):
+            candidates.update(bucket.get(key, ()))
+        if not candidates:
+            return None
+        self.stats["candidates"] += len(candidates)
+        rows = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        similarity = (np.stack([self.signatures[i] for i in rows]) == sig).mean(axis=1)
+        best = int(similarity.argmax())
+        if similarity[best] < self.config.threshold:
+            return None
+        return int(rows[best]), float(similarity[best])
+
+    def add(self, sig, link, cluster):
+        row = len(self.signatures)
+        self.signatures.append(np.asarray(sig, dtype=np.uint32))
+        self.links.append(link)
+        self.clusters.append(cluster)
+        for bucket, key in zip(self.buckets, self._band_keys(self.signatures[row])):
+            bucket.setdefault(key, []).append(row)
+
+    # ---- articles ------------------------------------------------------
+
+    def assign(self, article):
+        """Set `cluster_id` on one article and index it.
+
+        Returns True if it is a near-duplicate of an already indexed article.
+        """
+        self.stats["checked"] += 1
+        sig = self.signature(article.get("text") or "")
+        match = self.query(sig)
+        if match is None:
+            article["cluster_id"] = cluster_id_for(article["link"])
+        else:
+            row, similarity = match
+            article["cluster_id"] = self.clusters[row]
+            article["duplicate_of"] = self.links[row]
+            article["duplicate_similarity"] = round(similarity, 3)
+            self.stats["duplicates"] += 1
+        self.add(sig, article["link"], article["cluster_id"])
+        return match is not None
+
+    def process(self, articles):
+        """Cluster a batch in place; with action "drop", remove near-duplicates."""
+        kept = [a for a in articles if not self.assign(a)]
+        if self.config.action == "drop":
+            self.stats["dropped"] += len(articles) - len(kept)
+            articles[:] = kept
+        return articles
+
+    def summary(self):
+        s = self.stats
+        verb = "dropped" if self.config.action == "drop" else "clustered"
+        return (
+            f"near-dup: {s['checked']} articles checked, {s['duplicates']} near-duplicates "
+            f"{verb} (threshold {self.config.threshold}), {len(self.links)} signatures indexed"
+        )
@@ -0,0 +1,179 @@
+"""
+In-memory response cache for the read-only Flask endpoints.
+
+Articles only change when the scraper runs, so `/cache` and `/search`
+responses are kept as ready-to-send bytes, keyed on the request and the
+data version stamp the scraper bumps in Mongo (see db.bump_data_version).
+A bump makes every older entry unreachable at once; the TTL is a safety
+net for writes that bypass the scraper. Memory is bounded by entry count
+and total bytes with LRU eviction, and each entry carries an ETag so
+clients can revalidate with If-None-Match and get a 304.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import wraps
+
+from flask import Response, make_response, request
+
+
+@dataclass
+class ResponseCacheConfig:
+    ttl: float = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+    max_entries: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+    max_bytes: int = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    # how often (seconds) the version stamp is re-read from Mongo
+    version_interval: float = float(os.getenv("RESPONSE_CACHE_VERSION_INTERVAL", "15"))
+    # response headers that are stored and replayed with the body
+    replay_headers: tuple = ("X-Next-Cursor",)
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    mimetype: str
+    etag: str
+    headers: dict
+    expires_at: float
+
+
+class ResponseCache:
+    def __init__(self, version_fn=None, config: ResponseCacheConfig = None):
+        self.config = config or ResponseCacheConfig()
+        self.version_fn = version_fn
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._version = None
+        self._version_checked = 0.0
+        self.counters = {"hits": 0, "misses": 0, "not_modified": 0, "evictions": 0, "invalidations": 0}
+
+    def version(self):
+        """Current data version, re-read at most every `version_interval`."""
+        now = time.monotonic()
+        if self.version_fn is not None and now - self._version_checked >= self.config.version_interval:
+            try:
+                version = self.version_fn()
+            except Exception:
+                version = self._version
+            self._version_checked = now
+            if version != self._version:
+                if self._version is not None:
+                    self.clear()
+                    self.counters["invalidations"] += 1
+                self._version = version
+        return self._version
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            if entry.expires_at < time.monotonic():
+                self._drop(key)
+                self.counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters["hits"] += 1
+            return entry
+
+    def put(self, key, body, mimetype, headers=None):
+        if len(body) > self.config.max_bytes:
+            return None
+        entry = CachedResponse(
+            body=body,
+            mimetype=mimetype,
+            etag=hashlib.sha1(body).hexdigest(),
+            headers=dict(headers or {}),
+            expires_at=time.monotonic() + self.config.ttl,
+        )
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self._bytes += len(body)
+            while self._entries and (
+                len(self._entries) > self.config.max_entries or self._bytes > self.config.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+                self.counters["evictions"] += 1
+        return entry
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return dict(
+                self.counters,
+                entries=len(self._entries),
+                bytes=self._bytes,
+                version=self._version,
+            )
+
+    # ---- Flask glue ----------------------------------------------------
+
+    def _tee(self, key, chunks, mimetype, headers):
+        """Pass a streamed body through, caching it once fully sent."""
+        parts = []
+        size = 0
+        for chunk in chunks:
+            data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+            if parts is not None:
+                size += len(data)
+                parts.append(data)
+                if size > self.config.max_bytes:
+                    parts = None
+            yield data
+        if parts is not None:
+            self.put(key, b"".join(parts), mimetype, headers)
+
+    def cached(self, view):
+        """Decorator serving a view's 200 responses from the cache."""
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ("GET", "POST"):
+                return view(*args, **kwargs)
+
+            key = (request.method, request.path, request.query_string, request.get_data(), self.version())
+            entry = self.get(key)
+            if entry is not None:
+                if entry.etag in request.if_none_match:
+                    self.counters["not_modified"] += 1
+                    response = Response(status=304)
+                else:
+                    response = Response(entry.body, mimetype=entry.mimetype)
+                    response.headers.update(entry.headers)
+                response.set_etag(entry.etag)
+                response.headers["X-Cache"] = "HIT"
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+            headers = {
+                h: response.headers[h] for h in self.config.replay_headers if h in response.headers
+            }
+            if response.is_streamed:
+                response.response = self._tee(key, response.response, response.mimetype, headers)
+            else:
+                entry = self.put(key, response.get_data(), response.mimetype, headers)
+                if entry is not None:
+                    response.set_etag(entry.etag)
+            response.headers["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
@@ -0,0 +1,241 @@
+"""
+Retention for the articles collection, shared by the scraper and the API.
+
+Kept free of Flask/ML imports, like db.py, so the GitHub Actions scraper
+can use it.
+
+  * junk filtering happens in Python on each batch before it is written
+    (`filter_batch`), instead of a `$regex` delete that scans the whole
+    collection after every run;
+  * every article gets a `published_date` datetime at write time (its
+    extracted publish date, or the time it was scraped), so the
+    (published_date, _id) index orders the collection. Older articles
+    with a missing or string `published_date` are converted by `enforce`
+    on every run (`backfill_published_date`, an index-only lookup when
+    there is nothing left to convert);
+  * the capped window keeps the newest `max_docs` articles. The first
+    article outside the window is found with one index-only query and
+    everything at or before it is removed with one range delete on the
+    same index. Articles older than `max_age_days` go in that same delete,
+    or, with `ttl`, are expired by Mongo itself through a TTL index.
+
+    python retention.py              # enforce the window now
+    python retention.py --dry-run    # count what would be removed
+"""
+
+import argparse
+import os
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from db import get_collection
+
+JUNK_TITLE_RE = re.compile(r"^(dell|hp|acer|lenovo)", re.IGNORECASE)
+JUNK_TEXTS = frozenset(
+    [
+        "",
+        "Get App for Better Experience",
+        "Log onto movie.ndtv.com for more celebrity pictures",
+        "No description available.",
+    ]
+)
+
+TTL_INDEX_NAME = "published_date_1"
+SORT_NEWEST = [("published_date", -1), ("_id", -1)]
+SORT_OLDEST = [("published_date", 1), ("_id", 1)]
+
+
+@dataclass
+class RetentionConfig:
+    # newest articles kept by the capped window (0 = no cap)
+    max_docs: int = int(os.getenv("RETENTION_MAX_DOCS", "1500"))
+    # articles published longer ago than this are removed (0 = no limit)
+    max_age_days: float = float(os.getenv("RETENTION_MAX_AGE_DAYS", "0"))
+    # enforce max_age_days with a TTL index instead of at cleanup time
+    ttl: bool = os.getenv("RETENTION_TTL", "0") == "1"
+
+
+def is_junk(article):
+    title = article.get("title") or ""
+    return bool(JUNK_TITLE_RE.match(title)) or (article.get("text") or "") in JUNK_TEXTS
+
+
+def published_date(article, now=None):
+    """Publish date of an article as a UTC datetime, falling back to `now`.
+
+    Dates in the future are clamped so they cannot pin an article in the window.
+    """
+    now = now or datetime.now(timezone.utc)
+    value = article.get("publish_date")
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.strip())
+        except ValueError:
+            value = None
+    if not isinstance(value, datetime):
+        return now
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return min(value, now)
+
+
+def filter_batch(articles):
+    """Drop junk articles in place and stamp `published_date`; returns the number dropped."""
+    now = datetime.now(timezone.utc)
+    kept = [a for a in articles if not is_junk(a)]
+    for article in kept:
+        article["published_date"] = published_date(article, now)
+    dropped = len(articles) - len(kept)
+    articles[:] = kept
+    return dropped
+
+
+def _at_or_before(doc):
+    """Filter for `doc` and everything before it in (published_date, _id) order.
+
+    BSON sorts null < string < date, but `$lt` only compares values of the
+    same type, so the lower types are matched explicitly. Strings are dates
+    stored before the backfill converted them (see backfill_published_date).
+    """
+    date, _id = doc.get("published_date"), doc["_id"]
+    if date is None:
+        # null sorts before every date, so only other undated articles precede it
+        return {"published_date": None, "_id": {"$lte": _id}}
+    clauses = [
+        {"published_date": {"$lt": date}},
+        {"published_date": date, "_id": {"$lte": _id}},
+        {"published_date": None},
+    ]
+    if not isinstance(date, str):
+        clauses.append({"published_date": {"$type": "string"}})
+    return {"$or": clauses}
+
+
+def _boundary(collection, sort, skip):
+    """The `skip`-th article in `sort` order, read from the index only."""
+    cursor = collection.find({}, {"published_date": 1, "_id": 1}).sort(sort).skip(skip).limit(1)
+    return next(iter(cursor), None)
+
+
+def _delete(collection, clauses, dry_run):
+    """One delete_many (or count, for a dry run) over the OR of `clauses`."""
+    if not clauses:
+        return 0
+    query = clauses[0] if len(clauses) == 1 else {"$or": clauses}
+    if dry_run:
+        return collection.count_documents(query)
+    return collection.delete_many(query).deleted_count
+
+
+def enforce(collection, config: RetentionConfig = None, dry_run=False):
+    """Backfill published_date, then apply the capped window (and age limit).
+
+    Returns {"removed", "backfilled", "seconds"}.
+    """
+    config = config or RetentionConfig()
+    start = time.perf_counter()
+    backfilled = 0 if dry_run else backfill_published_date(collection)
+    clauses = []
+    if config.max_docs > 0:
+        boundary = _boundary(collection, SORT_NEWEST, config.max_docs)
+        if boundary is not None:
+            clauses.append(_at_or_before(boundary))
+    if config.max_age_days > 0 and not config.ttl:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=config.max_age_days)
+        clauses.append({"published_date": {"$lt": cutoff}})
+    removed = _delete(collection, clauses, dry_run)
+    return {
+        "removed": removed,
+        "backfilled": backfilled,
+        "seconds": round(time.perf_counter() - start, 4),
+    }
+
+
+def delete_oldest(collection, count, dry_run=False):
+    """Remove the `count` oldest articles (all, if fewer) with one range delete."""
+    start = time.perf_counter()
+    boundary = None
+    if count > 0:
+        boundary = _boundary(collection, SORT_OLDEST, count - 1) or _boundary(
+            collection, SORT_NEWEST, 0
+        )
+    removed = _delete(collection, [_at_or_before(boundary)] if boundary else [], dry_run)
+    return {"removed": removed, "seconds": round(time.perf_counter() - start, 4)}
+
+
+def ensure_ttl_index(collection, config: RetentionConfig = None):
+    """Create, update or drop the TTL index to match `config`; returns the action taken."""
+    config = config or RetentionConfig()
+    info = collection.index_information().get(TTL_INDEX_NAME)
+    if not (config.ttl and config.max_age_days > 0):
+        if info and "expireAfterSeconds" in info:
+            collection.drop_index(TTL_INDEX_NAME)
+            return "dropped"
+        return None
+    seconds = int(config.max_age_days * 86400)
+    if info is None:
+        collection.create_index(
+            [("published_date", 1)], name=TTL_INDEX_NAME, expireAfterSeconds=seconds
+        )
+        return "created"
+    if info.get("expireAfterSeconds") != seconds:
+        collection.database.command(
+            "collMod",
+            collection.name,
+            index={"keyPattern": {"published_date": 1}, "expireAfterSeconds": seconds},
+        )
+        return "updated"
+    return None
+
+
+def backfill_published_date(collection, batch_size=500):
+    """Give every article a BSON date `published_date`; returns the count updated.
+
+    Sets it on articles stored before it was written (from `publish_date`)
+    and parses string values left by older writers into dates.
+    """
+    from pymongo import UpdateOne
+
+    updated, ops = 0, []
+    now = datetime.now(timezone.utc)
+    query = {"$or": [{"published_date": None}, {"published_date": {"$type": "string"}}]}
+    for doc in collection.find(query, {"publish_date": 1, "published_date": 1}):
+        value = doc.get("published_date")
+        source = {"publish_date": value} if isinstance(value, str) else doc
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"published_date": published_date(source, now)}}))
+        if len(ops) >= batch_size:
+            updated += collection.bulk_write(ops, ordered=False).modified_count
+            ops = []
+    if ops:
+        updated += collection.bulk_write(ops, ordered=False).modified_count
+    return updated
+
+
+def main():
+    import dotenv
+
+    parser = argparse.ArgumentParser(description="Apply the articles retention policy.")
+    parser.add_argument("--dry-run", action="store_true", help="only count what would be removed")
+    # kept so existing invocations still parse; the backfill now always runs
+    parser.add_argument("--backfill", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    dotenv.load_dotenv()
+    collection = get_collection()
+    config = RetentionConfig()
+
+    if not args.dry_run:
+        action = ensure_ttl_index(collection, config)
+        if action:
+            print(f"TTL index {action}")
+    report = enforce(collection, config, dry_run=args.dry_run)
+    verb = "would remove" if args.dry_run else "removed"
+    if report["backfilled"]:
+        print(f"backfilled published_date on {report['backfilled']} articles")
+    print(f"retention: {verb} {report['removed']} articles in {report['seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Ingest-time bias scoring for scraped articles.
+
+Each article is scored once, in batches, when the scraper writes it, and
+the result is stored on the document:
+
+    bias              predicted class (same value /predict returns)
+    bias_probability  probability of that class
+    model_version     registry version of the model that produced it
+
+After a retrain the registry version changes, and `rescore_stale` updates
+only the documents scored by an older model. /cache and /search then serve
+the stored scores without running inference.
+
+The classifier stack (pandas, sklearn, xgboost, nltk) is optional here:
+without it the scraper still runs and leaves scoring to a later run.
+"""
+
+import os
+
+SCORE_AT_INGEST = os.getenv("SCORE_AT_INGEST", "1") == "1"
+RESCORE_BATCH_SIZE = int(os.getenv("RESCORE_BATCH_SIZE", "256"))
+
+
+def load_pipeline():
+    """The shared PredictPipeline, or None if the ML stack is unavailable."""
+    if not SCORE_AT_INGEST:
+        return None
+    try:
+        from src.pipeline.predict_pipeline import load_predict_pipeline
+
+        pipeline = load_predict_pipeline()
+        print(f"scoring with model version {pipeline.model_version}")
+        return pipeline
+    except Exception as e:
+        print(f"scoring disabled ({type(e).__name__}: {e})")
+        return None
+
+
+def _text(article):
+    # same concatenation as the /predict endpoint
+    return f"{article.get('title') or ''}{article.get('text') or ''}"
+
+
+def score_articles(pipeline, articles):
+    """Score `articles` in one batch, setting the score fields in place."""
+    if pipeline is None or not articles:
+        return articles
+    try:
+        results, version = pipeline.predict_batch([_text(a) for a in articles], with_version=True)
+        for article, result in zip(articles, results):
+            article["bias"] = result["label"]
+            article["bias_probability"] = result["probability"]
+            article["model_version"] = version
+    except Exception as e:
+        # never lose articles over a scoring failure; rescore_stale catches up
+        print(f"scoring failed ({type(e).__name__}: {e})")
+    return articles
+
+
+def rescore_stale(collection, pipeline, batch_size=RESCORE_BATCH_SIZE):
+    """Re-score documents whose model_version is not the current one."""
+    from pymongo import UpdateOne
+
+    if pipeline is None:
+        return 0
+    version = pipeline.model_version
+    stale = collection.find({"model_version": {"$ne": version}}, {"title": 1, "text": 1})
+
+    rescored = 0
+    batch = []
+
+    def flush():
+        nonlocal rescored
+        score_articles(pipeline, batch)
+        ops = [
+            UpdateOne(
+                {"_id": doc["_id"]},
+                {
+                    "$set": {
+                        "bias": doc["bias"],
+                        "bias_probability": doc["bias_probability"],
+                        "model_version": doc["model_version"],
+                    }
+                },
+            )
+            for doc in batch
+            if doc.get("model_version") == version
+        ]
+        if ops:
+            rescored += collection.bulk_write(ops, ordered=False).modified_count
+        batch.clear()
+
+    for doc in stale:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    return rescored
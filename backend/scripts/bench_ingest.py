@@ -0,0 +1,80 @@
+"""
+I/O time and peak memory: CSV vs Parquet training splits.
+
+Writes the source corpus (text + target) as CSV and as Parquet with a
+categorical target, then reads each back in a fresh interpreter so peak
+RSS is per read: the old full `pd.read_csv`, a column-pruned CSV read,
+the Parquet read, and the chunked Parquet path. Files go to a temp dir.
+
+    cd backend && python scripts/bench_ingest.py [--source notebook/data.csv]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+READERS = {
+    "csv (all columns)": "pd.read_csv(path)",
+    "csv (text, target)": "pd.read_csv(path, usecols=['text', 'target'])",
+    "parquet (text, target)": "pd.read_parquet(path, columns=['text', 'target'])",
+    "parquet (chunked)": "sum(len(c) for c in iter_table(path, ['text', 'target'], 20000))",
+}
+
+_READ = """
+import resource, sys, time
+sys.path.insert(0, {backend!r})
+import pandas as pd
+from src.utils import iter_table
+path = {path!r}
+start = time.perf_counter()
+{expr}
+elapsed = time.perf_counter() - start
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+"""
+
+
+def read_in_subprocess(path, expr):
+    code = _READ.format(backend=BACKEND, path=path, expr=expr)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    elapsed, peak = out.stdout.split()[-2:]
+    return float(elapsed), float(peak)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", default=os.path.join(BACKEND, "notebook", "data.csv"))
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.source)
+    tmp = tempfile.mkdtemp()
+    csv_path = os.path.join(tmp, "train.csv")
+    parquet_path = os.path.join(tmp, "train.parquet")
+
+    start = time.perf_counter()
+    df.to_csv(csv_path, index=False)
+    csv_write = time.perf_counter() - start
+
+    pruned = df[["text", "target"]].astype({"target": "category"})
+    start = time.perf_counter()
+    pruned.to_parquet(parquet_path, index=False)
+    parquet_write = time.perf_counter() - start
+
+    print(f"rows: {len(df)}, source columns: {list(df.columns)}")
+    print(f"csv     : {os.path.getsize(csv_path) / 1e6:7.1f} MB, write {csv_write:.2f}s")
+    print(f"parquet : {os.path.getsize(parquet_path) / 1e6:7.1f} MB, write {parquet_write:.2f}s")
+
+    for name, expr in READERS.items():
+        path = parquet_path if name.startswith("parquet") else csv_path
+        elapsed, peak = read_in_subprocess(path, expr)
+        print(f"read {name:24s}: {elapsed:6.2f}s, peak rss {peak:7.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
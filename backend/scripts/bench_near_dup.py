@@ -0,0 +1,125 @@
+"""
+Benchmark near-duplicate detection (near_dup.py) on a synthetic corpus.
+
+Generates `--docs` articles of Zipf-distributed words. A `--dup-rate`
+share of them are copies of an earlier article with `--edit-rate` of the
+words replaced, plus a new dateline and a trimmed ending, the way a
+syndicated story differs between outlets. Every article is run through
+NearDupIndex.assign in order, and the detected duplicates are checked
+against the known copies:
+
+    * precision / recall of the detected near-duplicates
+    * signature and LSH query time per article
+    * index size on disk and its load time
+
+    cd backend && python scripts/bench_near_dup.py [--docs 100000] [--threshold 0.8]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+from near_dup import NearDupConfig, NearDupIndex  # noqa: E402
+
+
+def make_corpus(n_docs, dup_rate, edit_rate, words_per_doc, vocab_size, seed=0):
+    """(texts, source) where source[i] is the original of a copy, else -1."""
+    rng = np.random.default_rng(seed)
+    vocab = np.array([f"w{i}" for i in range(vocab_size)])
+    texts, tokens, source = [], [], np.full(n_docs, -1)
+    for i in range(n_docs):
+        if i and rng.random() < dup_rate:
+            src = int(rng.integers(0, i))
+            while source[src] != -1:  # copy an original, so ground truth is one cluster
+                src = int(source[src])
+            words = tokens[src].copy()
+            edits = rng.random(len(words)) < edit_rate
+            words[edits] = vocab[rng.zipf(1.3, edits.sum()) % vocab_size]
+            words = np.concatenate([["new", "delhi", f"pti{i}"], words[: int(len(words) * 0.95)]])
+            source[i] = src
+        else:
+            length = int(rng.integers(words_per_doc // 2, words_per_doc * 2))
+            words = vocab[rng.zipf(1.3, length) % vocab_size]
+        tokens.append(words)
+        texts.append(" ".join(words))
+    return texts, source
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--dup-rate", type=float, default=0.1)
+    parser.add_argument("--edit-rate", type=float, default=0.03)
+    parser.add_argument("--words", type=int, default=300)
+    parser.add_argument("--vocab", type=int, default=50_000)
+    parser.add_argument("--threshold", type=float, default=NearDupConfig.threshold)
+    parser.add_argument("--bands", type=int, default=NearDupConfig.bands)
+    parser.add_argument("--num-perm", type=int, default=NearDupConfig.num_perm)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    texts, source = make_corpus(args.docs, args.dup_rate, args.edit_rate, args.words, args.vocab)
+    print(f"corpus: {args.docs} docs, {(source >= 0).sum()} near-copies, built in {time.perf_counter() - start:.1f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = NearDupConfig(
+            path=os.path.join(tmp, "index.npz"),
+            threshold=args.threshold,
+            bands=args.bands,
+            num_perm=args.num_perm,
+            max_docs=args.docs,
+        )
+        index = NearDupIndex(config)
+        sig_s = query_s = 0.0
+        detected = np.zeros(args.docs, dtype=bool)
+        correct = np.zeros(args.docs, dtype=bool)
+        for i, text in enumerate(texts):
+            t0 = time.perf_counter()
+            sig = index.signature(text)
+            t1 = time.perf_counter()
+            match = index.query(sig)
+            t2 = time.perf_counter()
+            sig_s += t1 - t0
+            query_s += t2 - t1
+            cluster = f"c{i}"
+            if match is not None:
+                row = match[0]
+                detected[i] = True
+                cluster = index.clusters[row]
+                # right if the matched article belongs to the same original
+                correct[i] = cluster == f"c{source[i] if source[i] >= 0 else i}"
+            index.add(sig, f"doc{i}", cluster)
+
+        start = time.perf_counter()
+        index.save()
+        save_s = time.perf_counter() - start
+        size = os.path.getsize(config.path)
+        start = time.perf_counter()
+        NearDupIndex.load(config)
+        load_s = time.perf_counter() - start
+
+    copies = source >= 0
+    precision = correct.sum() / max(detected.sum(), 1)
+    recall = (correct & copies).sum() / max(copies.sum(), 1)
+    n = args.docs
+    print(
+        f"threshold {args.threshold}, {args.num_perm} perms in {args.bands} bands: "
+        f"precision {precision:.4f}, recall {recall:.4f} "
+        f"({detected.sum()} flagged, {copies.sum()} true copies)"
+    )
+    print(
+        f"per article: signature {sig_s / n * 1000:.3f} ms + LSH query {query_s / n * 1000:.3f} ms "
+        f"({n / (sig_s + query_s):.0f} articles/s), "
+        f"{index.stats['candidates'] / n:.2f} candidates checked on average"
+    )
+    print(f"index: {size / 1e6:.1f} MB on disk, save {save_s:.2f}s, load + rebuild {load_s:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
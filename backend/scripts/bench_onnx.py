@@ -0,0 +1,69 @@
+"""
+Latency benchmark: ONNX engine vs the pickle pipeline.
+
+Feature parity with export_onnx's reference builder is checked by
+tests/test_onnx_parity.py. Label agreement with the (sparse-trained)
+pickle model is reported here, not asserted, since the two models are
+trained differently.
+
+Latency is measured per request (one text at a time, as /predict does)
+and batched (predict_batch over all rows) for both engines.
+
+    cd backend && python scripts/bench_onnx.py [--rows 300]
+        [--onnx ../frontend/public/models/model.onnx]
+        [--meta ../frontend/public/models/model_meta.json]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FRONTEND_MODELS = os.path.join(BACKEND, "..", "frontend", "public", "models")
+sys.path.insert(0, BACKEND)
+
+from src.pipeline.onnx_pipeline import OnnxPipelineConfig, OnnxPredictPipeline  # noqa: E402
+from src.pipeline.predict_pipeline import PredictPipeline  # noqa: E402
+from src.utils import read_table  # noqa: E402
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=300)
+    parser.add_argument("--data", default=os.path.join(BACKEND, "artifacts", "test.parquet"))
+    parser.add_argument("--onnx", default=os.path.join(FRONTEND_MODELS, "model.onnx"))
+    parser.add_argument("--meta", default=os.path.join(FRONTEND_MODELS, "model_meta.json"))
+    args = parser.parse_args()
+
+    texts = read_table(args.data, columns=["text"])["text"].head(args.rows).tolist()
+    onnx = OnnxPredictPipeline(OnnxPipelineConfig(model_path=args.onnx, meta_path=args.meta))
+    pickle_engine = PredictPipeline()
+
+    # ---- label agreement ----
+    onnx_labels = [r["label"] for r in onnx.predict_batch(texts)]
+    pickle_labels = [r["label"] for r in pickle_engine.predict_batch(texts)]
+    agree = np.mean(np.array(onnx_labels) == np.array(pickle_labels))
+    print(f"label agreement onnx vs pickle on {len(texts)} rows: {agree:.4f}")
+
+    # ---- latency ----
+    for name, engine in (("pickle", pickle_engine), ("onnx", onnx)):
+        engine.predict(texts[0])  # warm
+        _, t_single = timed(lambda: [engine.predict(t) for t in texts])
+        _, t_batch = timed(engine.predict_batch, texts)
+        print(
+            f"{name:6s}: per-request {t_single / len(texts) * 1000:7.2f} ms | "
+            f"batched {t_batch / len(texts) * 1000:7.3f} ms/article"
+        )
+
+
+if __name__ == "__main__":
+    main()
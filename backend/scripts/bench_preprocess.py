@@ -0,0 +1,79 @@
+"""
+Benchmark for TextPreprocessor.
+
+Runs the original per-token implementation (regex compiled per call, no
+lemma cache, `Series.apply`) and the current one over the same corpus and
+prints the speedup. That the outputs are byte-identical is checked by
+tests/test_preprocess_parity.py, which uses `reference_transform` below.
+
+    cd backend && python scripts/bench_preprocess.py [--data artifacts/train.parquet]
+        [--rows N] [--lemma-table ../frontend/public/models/model_meta.json]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+from src.utils import TextPreprocessor, read_table, stop_words  # noqa: E402
+
+
+def reference_transform(series):
+    """The implementation TextPreprocessor shipped with before memoisation."""
+    from nltk.stem import WordNetLemmatizer
+
+    lemmatizer = WordNetLemmatizer()
+
+    def preprocess_text(text):
+        if isinstance(text, str):
+            text = text.lower()
+            text = re.sub(r"[^a-zA-Z0-9\s-]", "", text)
+            text = " ".join(
+                [lemmatizer.lemmatize(word) for word in text.split() if word not in stop_words]
+            )
+        return text
+
+    return series.apply(preprocess_text)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default=os.path.join(BACKEND, "artifacts", "train.parquet"))
+    parser.add_argument("--rows", type=int, default=None)
+    parser.add_argument("--lemma-table", default=None)
+    args = parser.parse_args()
+
+    texts = read_table(args.data, columns=["text"])["text"].head(args.rows)
+    n_tokens = int(texts.dropna().str.split().str.len().sum())
+    print(f"corpus: {len(texts)} rows, {n_tokens} tokens ({args.data})")
+
+    # warm WordNet so neither side pays the corpus load
+    TextPreprocessor().preprocess_text("warm up")
+
+    _, t_ref = timed(reference_transform, texts)
+    print(f"reference (apply, no cache) : {t_ref:8.3f}s")
+
+    fast = TextPreprocessor()
+    _, t_fast = timed(fast.transform, texts)
+    print(f"memoised (batch, LRU cache) : {t_fast:8.3f}s  x{t_ref / t_fast:.1f}")
+
+    _, t_warm = timed(fast.transform, texts)
+    print(f"memoised, warm cache        : {t_warm:8.3f}s  x{t_ref / t_warm:.1f}")
+
+    if args.lemma_table:
+        seeded = TextPreprocessor().load_lemma_table(args.lemma_table)
+        _, t_seed = timed(seeded.transform, texts)
+        print(f"preloaded lemma table       : {t_seed:8.3f}s  x{t_ref / t_seed:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark the scraper against a local stub HTTP server.
+
+The stub serves one RSS feed per fake site plus article pages with a fixed
+artificial latency, so the run measures the fetch engine rather than the
+network. It compares a serial configuration (one worker, one request per
+host, 0.3s politeness delay — roughly the old loop) with the concurrent
+defaults and reports articles per second.
+
+    cd backend && python scripts/bench_scraper.py [--sites 6] [--articles 20] [--latency 0.2]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+import webscapper  # noqa: E402
+from fetch_engine import FetchConfig  # noqa: E402
+
+PARAGRAPH = (
+    "The committee met on Tuesday to discuss the proposed budget, and members "
+    "from both sides of the house raised concerns about the allocation for "
+    "rural infrastructure, public health and education over the coming year. "
+)
+
+
+def make_handler(latency, n_articles):
+    class StubHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, body, ctype):
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            parts = self.path.strip("/").split("/")
+            host = self.headers.get("Host")
+            if len(parts) == 2 and parts[1] == "feed.xml":
+                site = parts[0]
+                items = "".join(
+                    f"<item><title>{site} story {i}</title>"
+                    f"<link>http://{host}/{site}/article/{i}</link></item>"
+                    for i in range(n_articles)
+                )
+                self._send(
+                    f'<?xml version="1.0"?><rss version="2.0"><channel>'
+                    f"<title>{site}</title>{items}</channel></rss>",
+                    "application/rss+xml",
+                )
+            elif len(parts) == 3 and parts[1] == "article":
+                time.sleep(latency)
+                site, idx = parts[0], parts[2]
+                body = "".join(f"<p>{PARAGRAPH}</p>" for _ in range(8))
+                self._send(
+                    f"<html><head><title>{site} story {idx}</title></head><body>"
+                    f"<article><h1>{site} story {idx}</h1>{body}</article></body></html>",
+                    "text/html",
+                )
+            else:
+                self.send_error(404)
+
+    return StubHandler
+
+
+def run(sites, count, config):
+    start = time.perf_counter()
+    articles = webscapper.scrape_sites(sites, count, config)
+    elapsed = time.perf_counter() - start
+    return len(articles), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sites", type=int, default=6)
+    parser.add_argument("--articles", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("", 0), make_handler(args.latency, args.articles))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    # every fake site lives under its own hostname alias so per-host limits apply
+    sites = [
+        (f"stub{i}", f"http://127.0.0.{i + 1}:{port}/stub{i}/feed.xml", f"http://127.0.0.{i + 1}:{port}/")
+        for i in range(args.sites)
+    ]
+
+    serial = FetchConfig(max_workers=1, per_host=1, host_delay=0.3, extract_workers=1)
+    n, t = run(sites, args.articles, serial)
+    print(f"serial     : {n} articles in {t:6.2f}s  ({n / t:6.1f} articles/s)")
+
+    n, t = run(sites, args.articles, FetchConfig())
+    print(f"concurrent : {n} articles in {t:6.2f}s  ({n / t:6.1f} articles/s)")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Query latency of the BM25 index vs Mongo $text on a synthetic corpus.
+
+Generates N articles from a Zipf-distributed vocabulary, builds the BM25
+index (reporting build time, memory and on-disk size), then times a set of
+one- to three-word queries. With --mongo-uri the same corpus is loaded into
+a scratch collection with a text index and the same queries are timed
+against $text; the collection is dropped afterwards.
+
+    cd backend && python scripts/bench_search.py [--docs 100000] [--queries 200]
+        [--mongo-uri mongodb://localhost:27017]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+from src.search_index import BM25Index, SearchIndexConfig  # noqa: E402
+
+SYLLABLES = ["ka", "lo", "mi", "ran", "te", "su", "vor", "den", "pa", "ni", "gar", "tu"]
+
+
+def make_vocab(size, rng):
+    words = set()
+    while len(words) < size:
+        n = rng.integers(2, 5)
+        words.add("".join(rng.choice(SYLLABLES, n)))
+    return sorted(words)
+
+
+def make_corpus(n_docs, vocab, rng):
+    probs = 1.0 / np.arange(1, len(vocab) + 1) ** 1.1
+    probs /= probs.sum()
+    for i in range(n_docs):
+        title = " ".join(rng.choice(vocab, 8, p=probs))
+        text = " ".join(rng.choice(vocab, int(rng.integers(150, 400)), p=probs))
+        yield i, title, text
+
+
+def percentiles(samples):
+    ms = np.array(samples) * 1000
+    return f"p50 {np.percentile(ms, 50):7.2f} ms | p95 {np.percentile(ms, 95):7.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--mongo-uri", default=None)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    vocab = make_vocab(20_000, rng)
+    corpus = list(make_corpus(args.docs, vocab, rng))
+    queries = [" ".join(rng.choice(vocab[:5000], rng.integers(1, 4))) for _ in range(args.queries)]
+
+    path = os.path.join(tempfile.mkdtemp(), "search_index.pkl")
+    index = BM25Index(SearchIndexConfig(index_path=path))
+    start = time.perf_counter()
+    for i in range(0, len(corpus), 5000):
+        index.add_many(corpus[i : i + 5000])
+    print(f"bm25 build : {len(index)} docs in {time.perf_counter() - start:.1f}s")
+
+    postings = sum(a.itemsize * len(a) for a in index.doc_ids + index.tfs)
+    print(f"bm25 index : {len(index.terms)} terms, {postings / 1e6:.1f} MB postings")
+
+    start = time.perf_counter()
+    index.save()
+    saved = time.perf_counter() - start
+    start = time.perf_counter()
+    BM25Index.load(SearchIndexConfig(index_path=path))
+    print(
+        f"bm25 disk  : {os.path.getsize(path) / 1e6:.1f} MB, "
+        f"save {saved:.2f}s, load {time.perf_counter() - start:.2f}s"
+    )
+
+    timings = []
+    for q in queries:
+        start = time.perf_counter()
+        index.search(q, limit=50)
+        timings.append(time.perf_counter() - start)
+    print(f"bm25 query : {percentiles(timings)}")
+
+    if args.mongo_uri:
+        from pymongo import MongoClient
+
+        coll = MongoClient(args.mongo_uri)["bench_search"]["articles"]
+        coll.drop()
+        for i in range(0, len(corpus), 5000):
+            coll.insert_many(
+                [{"_id": k, "title": t, "text": x} for k, t, x in corpus[i : i + 5000]]
+            )
+        coll.create_index([("title", "text"), ("text", "text")])
+
+        timings = []
+        for q in queries:
+            start = time.perf_counter()
+            list(
+                coll.find({"$text": {"$search": q}}, {"score": {"$meta": "textScore"}})
+                .sort([("score", {"$meta": "textScore"})])
+                .limit(50)
+            )
+            timings.append(time.perf_counter() - start)
+        print(f"mongo query: {percentiles(timings)}")
+        coll.database.client.drop_database("bench_search")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Cold-start profile of the API module (`import main`).
+
+Each mode imports main.py in fresh interpreters under `python -X importtime`
+and reports the median wall time of the import, then the packages that cost
+the most (self time summed per top-level package, from the last run):
+
+    legacy   NLTK checked at boot, model preloaded (the old start-up path)
+    preload  NLTK verified at build time (NLTK_DATA_VERIFIED=1), model preloaded
+    lazy     NLTK verified at build time, model loaded on first use (PRELOAD_MODEL=0)
+
+Index creation is skipped (ENSURE_INDEXES_ON_START=0) unless --with-mongo,
+so the numbers are import cost, not Mongo round trips. --ref profiles
+another git revision (e.g. the commit before the lazy imports) the same
+way, from a temporary worktree, for a before/after comparison.
+
+    cd backend && python scripts/startup_profile.py [--repeat 5] [--top 15] [--ref HEAD~1]
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = {
+    "legacy": {"NLTK_DATA_VERIFIED": "0", "PRELOAD_MODEL": "1"},
+    "preload": {"NLTK_DATA_VERIFIED": "1", "PRELOAD_MODEL": "1"},
+    "lazy": {"NLTK_DATA_VERIFIED": "1", "PRELOAD_MODEL": "0"},
+}
+
+_IMPORT_MAIN = (
+    "import time; start = time.perf_counter(); import main; "
+    "print('startup', time.perf_counter() - start)"
+)
+
+
+def run_once(cwd, env):
+    """(seconds to import main, importtime lines) in a fresh interpreter."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _IMPORT_MAIN],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    lines = [l for l in out.stderr.splitlines() if l.startswith("import time:")]
+    seconds = [l for l in out.stdout.splitlines() if l.startswith("startup ")]
+    if out.returncode != 0 or not seconds:
+        tail = "\n".join(out.stderr.splitlines()[-5:])
+        raise RuntimeError(f"import main failed (exit {out.returncode}):\n{tail}")
+    return float(seconds[-1].split()[1]), lines
+
+
+def parse_importtime(lines):
+    """{top-level package: self seconds} and [(cumulative s, module)]."""
+    by_package = defaultdict(float)
+    modules = []
+    for line in lines[1:]:  # first line is the header
+        _, self_us, cumulative_us, name = (p.strip() for p in line.replace(":", "|", 1).split("|"))
+        module = name.strip()
+        by_package[module.split(".")[0]] += int(self_us) / 1e6
+        modules.append((int(cumulative_us) / 1e6, module))
+    return by_package, modules
+
+
+def profile(cwd, modes, repeat, with_mongo):
+    results = {}
+    for mode in modes:
+        env = dict(os.environ, **MODES[mode])
+        if not with_mongo:
+            env["ENSURE_INDEXES_ON_START"] = "0"
+        timings, lines = [], []
+        for _ in range(repeat):
+            seconds, lines = run_once(cwd, env)
+            timings.append(seconds)
+        results[mode] = (statistics.median(timings), parse_importtime(lines))
+    return results
+
+
+def report(label, results, top):
+    for mode, (seconds, (by_package, modules)) in results.items():
+        print(f"\n[{label}] {mode}: import main {seconds:.3f}s (median)")
+        ranked = sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:top]
+        print("  self time by package:  " + ", ".join(f"{p} {s:.3f}s" for p, s in ranked))
+        slowest = sorted(modules, reverse=True)[:top]
+        print("  slowest imports (cumulative):")
+        for seconds_, module in slowest:
+            print(f"    {seconds_:8.3f}s  {module}")
+
+
+def worktree_for(ref, tmp):
+    """Check out `ref` into a temporary worktree; returns its backend dir."""
+    root = subprocess.run(
+        ["git", "rev-parse", "--show-toplevel"], cwd=BACKEND, capture_output=True, text=True, check=True
+    ).stdout.strip()
+    subprocess.run(["git", "worktree", "add", "--detach", tmp, ref], cwd=root, check=True, capture_output=True)
+    backend = os.path.join(tmp, os.path.relpath(BACKEND, root))
+    # untracked local settings (MONGO_DB_URI) for the old module-level client
+    if os.path.exists(os.path.join(BACKEND, ".env")):
+        shutil.copy(os.path.join(BACKEND, ".env"), backend)
+    return root, backend
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the API's cold start.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--with-mongo", action="store_true", help="include index creation at boot")
+    parser.add_argument("--ref", help="also profile this git revision (before/after)")
+    args = parser.parse_args()
+
+    after = profile(BACKEND, args.modes, args.repeat, args.with_mongo)
+    report("working tree", after, args.top)
+
+    if args.ref:
+        tmp = tempfile.mkdtemp(prefix="startup-profile-")
+        shutil.rmtree(tmp)
+        root, backend = worktree_for(args.ref, tmp)
+        try:
+            # an older main.py ignores the mode variables; one mode is enough
+            before = profile(backend, ["legacy"], args.repeat, args.with_mongo)
+            report(args.ref, before, args.top)
+            print(
+                f"\nbefore ({args.ref}) {before['legacy'][0]:.3f}s -> "
+                + ", ".join(f"{m} {after[m][0]:.3f}s" for m in after)
+            )
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", tmp], cwd=root, capture_output=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Post-training artifact optimization, guarded by test-set checks.
+
+Runs after ModelTrainer and tries progressively smaller variants of
+`model.pkl` + `preprocess.pkl`, most aggressive first:
+
+    pruned    float16 idf, and vocabulary the booster never splits on dropped
+              (booster split indices remapped to the shorter vocabulary)
+    float16   float16 idf only
+    lossless  only sklearn's `stop_words_` dropped
+
+Every variant drops `stop_words_` (sklearn documents it as safe to remove)
+and is saved as a compressed protocol-5 pickle with out-of-band buffers
+(see utils.save_object). A variant is published only if its test accuracy is
+within `max_accuracy_drop` of the original model and it agrees with the
+original on at least `min_agreement` of the test rows. The first variant
+that passes is written to a staging directory, cold-load timed, then
+swapped in with os.replace and published
+(model_registry.publish_manifest). If none passes, nothing is published.
+
+Dropping vocabulary also drops those terms from the l2 norm, so kept
+feature values shift slightly; the guardrails decide whether that is safe.
+Split thresholds stay float32 because XGBoost stores them that way.
+"""
+
+import copy
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.components.data_transformer import DataTransformationConfig
+from src.components.model_trainer import ModelTrainerConfig
+from src.exception import CustomException
+from src.logger import logging
+from src.pipeline.model_registry import publish_manifest
+from src.utils import load_object, read_table, save_object
+
+
+@dataclass
+class ArtifactOptimizerConfig:
+    model_path: str = ModelTrainerConfig.trained_model_file_path
+    preprocessor_path: str = DataTransformationConfig.preprocess_obj_file_path
+    staging_dir: str = os.path.join("artifacts", "staging")
+    # "zlib" decompresses fastest; "lzma" is smaller
+    compress: str = os.getenv("ARTIFACT_COMPRESS", "zlib")
+    max_accuracy_drop: float = float(os.getenv("ARTIFACT_MAX_ACCURACY_DROP", "0.002"))
+    min_agreement: float = float(os.getenv("ARTIFACT_MIN_AGREEMENT", "0.995"))
+
+
+def _vectorizer(preprocessor):
+    return preprocessor.transformers_[0][1].named_steps["vectorize"]
+
+
+def _drop_stop_words(preprocessor, model):
+    vectorizer = _vectorizer(preprocessor)
+    vectorizer.__dict__.pop("stop_words_", None)
+    return preprocessor, model
+
+
+def _float16_idf(preprocessor, model):
+    vectorizer = _vectorizer(preprocessor)
+    vectorizer.idf_ = vectorizer.idf_.astype(np.float16)
+    return preprocessor, model
+
+
+def _prune_vocabulary(preprocessor, model):
+    """Keep only the terms the booster splits on and renumber its splits."""
+    booster = model.get_booster()
+    kept = sorted(int(name[1:]) for name in booster.get_score(importance_type="weight"))
+    remap = {old: new for new, old in enumerate(kept)}
+
+    raw = json.loads(booster.save_raw("json"))
+    learner = raw["learner"]
+    learner["learner_model_param"]["num_feature"] = str(len(kept))
+    for tree in learner["gradient_booster"]["model"]["trees"]:
+        tree["tree_param"]["num_feature"] = str(len(kept))
+        tree["split_indices"] = [
+            remap[split] if left != -1 else 0
+            for split, left in zip(tree["split_indices"], tree["left_children"])
+        ]
+    booster.load_model(bytearray(json.dumps(raw).encode("utf-8")))
+
+    vectorizer = _vectorizer(preprocessor)
+    idf = vectorizer.idf_
+    terms = {index: term for term, index in vectorizer.vocabulary_.items()}
+    vectorizer.vocabulary_ = {terms[old]: new for new, old in enumerate(kept)}
+    vectorizer.idf_ = idf[kept]
+    return preprocessor, model
+
+
+VARIANTS = [
+    ("pruned", (_drop_stop_words, _float16_idf, _prune_vocabulary)),
+    ("float16", (_drop_stop_words, _float16_idf)),
+    ("lossless", (_drop_stop_words,)),
+]
+
+_COLD_LOAD = (
+    "import sys, time; from src.utils import load_object; "
+    "start = time.perf_counter(); load_object(sys.argv[1]); "
+    "print(time.perf_counter() - start)"
+)
+
+
+def cold_load_seconds(path):
+    """Unpickle `path` in a fresh interpreter (includes the imports it triggers)."""
+    out = subprocess.run(
+        [sys.executable, "-c", _COLD_LOAD, path],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.getcwd(),
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+class ArtifactOptimizer:
+    def __init__(self, config: ArtifactOptimizerConfig = None):
+        self.config = config or ArtifactOptimizerConfig()
+
+    def _predict(self, preprocessor, model, cleaned):
+        return model.predict(_vectorizer(preprocessor).transform(cleaned))
+
+    def initiate_artifact_optimization(self, test_path):
+        try:
+            config = self.config
+            preprocessor = load_object(config.preprocessor_path)
+            model = load_object(config.model_path)
+
+            test_df = read_table(test_path, columns=["text", "target"])
+            y_test = test_df["target"].to_numpy()
+            # text cleaning is shared by every variant; only TF-IDF differs
+            cleaned = preprocessor.transformers_[0][1].named_steps[
+                "text_preprocessing"
+            ].transform(test_df["text"])
+
+            baseline = self._predict(preprocessor, model, cleaned)
+            base_acc = float((baseline == y_test).mean())
+            report = {"original_accuracy": base_acc, "variants": {}}
+            logging.info(f"artifact optimizer: original accuracy {base_acc:.4f}")
+
+            chosen = None
+            for name, steps in VARIANTS:
+                cand_pre, cand_model = copy.deepcopy(preprocessor), copy.deepcopy(model)
+                for step in steps:
+                    cand_pre, cand_model = step(cand_pre, cand_model)
+
+                predicted = self._predict(cand_pre, cand_model, cleaned)
+                acc = float((predicted == y_test).mean())
+                agreement = float((predicted == baseline).mean())
+                passed = (
+                    acc >= base_acc - config.max_accuracy_drop
+                    and agreement >= config.min_agreement
+                )
+                report["variants"][name] = {
+                    "accuracy": acc,
+                    "agreement": agreement,
+                    "passed": passed,
+                }
+                logging.info(
+                    f"artifact optimizer: {name} accuracy {acc:.4f} "
+                    f"agreement {agreement:.4f} {'ok' if passed else 'rejected'}"
+                )
+                if passed:
+                    chosen = (name, cand_pre, cand_model)
+                    break
+
+            if chosen is None:
+                logging.info("artifact optimizer: no variant passed; artifacts unchanged")
+                report["published"] = None
+                return report
+
+            name, cand_pre, cand_model = chosen
+            staged = {}
+            for live, obj in (
+                (config.preprocessor_path, cand_pre),
+                (config.model_path, cand_model),
+            ):
+                path = os.path.join(config.staging_dir, os.path.basename(live))
+                save_object(path, obj, compress=config.compress)
+                staged[live] = path
+
+            sizes, load_seconds = {}, {}
+            for live, path in staged.items():
+                key = os.path.basename(live)
+                sizes[key] = (os.path.getsize(live), os.path.getsize(path))
+                load_seconds[key] = (cold_load_seconds(live), cold_load_seconds(path))
+
+            os.replace(staged[config.model_path], config.model_path)
+            os.replace(staged[config.preprocessor_path], config.preprocessor_path)
+            # the registry switches to the new pair only once this is written
+            publish_manifest(config.model_path, config.preprocessor_path)
+
+            report.update(published=name, sizes=sizes, cold_load_seconds=load_seconds)
+            for key in sizes:
+                logging.info(
+                    f"artifact optimizer: {key} {sizes[key][0]} -> {sizes[key][1]} bytes, "
+                    f"cold load {load_seconds[key][0]:.3f}s -> {load_seconds[key][1]:.3f}s"
+                )
+            return report
+
+        except Exception as e:
+            raise CustomException(e, sys)
@@ -3,37 +3,105 @@ import sys
 from src.logger import logging
 from src.exception import CustomException
 from dataclasses import dataclass
-import pandas as pd
 from sklearn.model_selection import train_test_split
 from src.components.data_transformer import DataTransformation
 from src.components.model_trainer import ModelTrainer
+from src.components.artifact_optimizer import ArtifactOptimizer
+from src.utils import iter_table, log_stage, read_table
+
+# the only columns training reads; anything else in the source is skipped
+COLUMNS = ["text", "target"]
+
 
 @dataclass
 class DataIngestionConfig:
-    train_data_path:str = os.path.join('artifacts','train.csv')
-    test_data_path:str = os.path.join('artifacts','test.csv')
-    raw_data_path:str = os.path.join('artifacts','raw.csv')
+    source_data_path:str = os.path.join('notebook','data.csv')
+    train_data_path:str = os.path.join('artifacts','train.parquet')
+    test_data_path:str = os.path.join('artifacts','test.parquet')
+    raw_data_path:str = os.path.join('artifacts','raw.parquet')
+    # also write raw/train/test.csv next to the Parquet splits
+    write_csv: bool = os.getenv("INGEST_WRITE_CSV", "0") == "1"
+    # rows per chunk for sources larger than RAM (0 = load in one go)
+    chunk_size: int = int(os.getenv("INGEST_CHUNK_SIZE", "0"))
 
 class DataIngestion:
     def __init__(self):
         self.ingestion_config = DataIngestionConfig()
-    
+
+    def _split_paths(self):
+        config = self.ingestion_config
+        return {
+            "raw": config.raw_data_path,
+            "train": config.train_data_path,
+            "test": config.test_data_path,
+        }
+
+    def _write_chunked(self):
+        """Stream the source chunk by chunk, appending Parquet row groups.
+
+        Each chunk is split 80/20 on its own, so the split differs from the
+        in-memory path's, with the same proportions.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        config = self.ingestion_config
+        writers = {}
+        try:
+            chunks = iter_table(config.source_data_path, COLUMNS, config.chunk_size)
+            for n, chunk in enumerate(chunks):
+                chunk["target"] = chunk["target"].astype("category")
+                # raw keeps every source row, as in the in-memory path, so its
+                # length is the offset incremental training resumes from
+                labelled = chunk.dropna(subset=COLUMNS)
+                train_set,test_set = train_test_split(labelled,test_size=0.2,random_state=42)
+                parts = {"raw": chunk, "train": train_set, "test": test_set}
+
+                for name, path in self._split_paths().items():
+                    table = pa.Table.from_pandas(parts[name], preserve_index=False)
+                    if name not in writers:
+                        writers[name] = pq.ParquetWriter(path, table.schema)
+                    writers[name].write_table(table)
+                    if config.write_csv:
+                        parts[name].to_csv(
+                            os.path.splitext(path)[0] + ".csv",
+                            mode="w" if n == 0 else "a",
+                            index=False,
+                            header=n == 0,
+                        )
+                logging.info(f"ingested chunk {n} ({len(chunk)} rows)")
+        finally:
+            for writer in writers.values():
+                writer.close()
+
     def initiate_data_ingestion(self):
         logging.info("Initiating Data Ingestion")
         try:
-            df = pd.read_csv('notebook/data.csv')
-            logging.info("Data read done")
-            os.makedirs(os.path.dirname(self.ingestion_config.train_data_path),exist_ok=True)
-            df.to_csv(self.ingestion_config.raw_data_path,index=False,header=True)
-            logging.info("train-test-split initiated")
-            train_set,test_set = train_test_split(df,test_size=0.2,random_state=42)
-            train_set.to_csv(self.ingestion_config.train_data_path,index=False,header=True)
-            test_set.to_csv(self.ingestion_config.test_data_path,index=False,header=True)
+            config = self.ingestion_config
+            os.makedirs(os.path.dirname(config.train_data_path),exist_ok=True)
+
+            if config.chunk_size > 0:
+                with log_stage("ingest (chunked)"):
+                    self._write_chunked()
+            else:
+                with log_stage("read source"):
+                    df = read_table(config.source_data_path, columns=COLUMNS)
+                logging.info("Data read done")
+                df["target"] = df["target"].astype("category")
+                logging.info("train-test-split initiated")
+                train_set,test_set = train_test_split(df,test_size=0.2,random_state=42)
+                parts = {"raw": df, "train": train_set, "test": test_set}
+
+                with log_stage("write splits"):
+                    for name, path in self._split_paths().items():
+                        parts[name].to_parquet(path,index=False)
+                        if config.write_csv:
+                            parts[name].to_csv(os.path.splitext(path)[0] + ".csv",index=False,header=True)
             logging.info("Ingestion of the data is completed")
 
             return(
-                self.ingestion_config.train_data_path,
-                self.ingestion_config.test_data_path
+                config.train_data_path,
+                config.test_data_path
 
             )
 
@@ -41,11 +109,27 @@ class DataIngestion:
             raise CustomException(e,sys)
         
 if __name__=="__main__": 
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--no-cache", action="store_true", help="rebuild cached text/TF-IDF features")
+    parser.add_argument("--tune", action="store_true", help="also run the hyperparameter search")
+    args = parser.parse_args()
+
     obj=DataIngestion()
     train_data,test_data=obj.initiate_data_ingestion()
 
-    data_transformation=DataTransformation()
+    data_transformation=DataTransformation(refresh_cache=args.no_cache)
     train_set,target_train,test_set,target_test,_= data_transformation.initiate_data_transformation(train_data,test_data)
 
+    if args.tune:
+        from src.components.model_tuner import ModelTuner, ModelTunerConfig, print_leaderboard
+
+        tuner_config=ModelTunerConfig(train_data_path=train_data,test_data_path=test_data)
+        print_leaderboard(ModelTuner(tuner_config).initiate_model_tuning())
+
     modeltrainer=ModelTrainer()
     print(modeltrainer.initiate_model_trainer(train_set,target_train,test_set,target_test))
+
+    artifact_optimizer=ArtifactOptimizer()
+    print(artifact_optimizer.initiate_artifact_optimization(test_data))
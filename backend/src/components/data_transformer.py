@@ -7,15 +7,27 @@ from src.exception import CustomException
 from sklearn.pipeline import Pipeline
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.compose import ColumnTransformer
-from src.utils import TextPreprocessor,save_object
+from src.components.feature_cache import FeatureCache
+from src.utils import TextPreprocessor,log_stage,read_table,save_object
+
+
+def decode_target(target):
+    """Labels as plain values; ingestion stores `target` as categorical."""
+    if isinstance(target.dtype, pd.CategoricalDtype):
+        return target.astype(target.cat.categories.dtype)
+    return target
 
 @dataclass
 class DataTransformationConfig:
     preprocess_obj_file_path = os.path.join('artifacts','preprocess.pkl')
+    # worker processes for text preprocessing during training (-1 = all cores)
+    n_jobs: int = int(os.getenv("PREPROCESS_N_JOBS", "-1"))
 
 class DataTransformation:
-    def __init__(self):
+    def __init__(self, refresh_cache=False):
         self.data_transformation_config = DataTransformationConfig()
+        # True rebuilds cached cleaned text / TF-IDF (the --no-cache flag)
+        self.refresh_cache = refresh_cache
     
     def get_data_transformer_obj(self):
         try:
@@ -25,7 +37,7 @@ class DataTransformation:
 
             pipeline = Pipeline(
                 steps=[
-                    ("text_preprocessing", TextPreprocessor()),  
+                    ("text_preprocessing", TextPreprocessor(n_jobs=self.data_transformation_config.n_jobs)),
                     ("vectorize", TfidfVectorizer())            
                 ]
             )
@@ -44,23 +56,39 @@ class DataTransformation:
         
     def initiate_data_transformation(self,train_path,test_path):
         try:
-            train_df = pd.read_csv(train_path)
-            test_df = pd.read_csv(test_path)
-            preprocessing_obj = self.get_data_transformer_obj()
             target_column_name="target"
-         
-            input_feature_train_df=train_df.drop(columns=[target_column_name],axis=1)
-            target_feature_train_df=train_df[target_column_name]
+            with log_stage("read splits"):
+                train_df = read_table(train_path, columns=[target_column_name])
+                test_df = read_table(test_path, columns=[target_column_name])
+            target_feature_train_df=decode_target(train_df[target_column_name])
+            target_feature_test_df=decode_target(test_df[target_column_name])
 
-            input_feature_test_df=test_df.drop(columns=[target_column_name],axis=1)
-            target_feature_test_df=test_df[target_column_name]
+            # NLTK cleaning is the slow part; reuse it across runs and scripts
+            feature_cache = FeatureCache(refresh=self.refresh_cache)
+            clean_train = feature_cache.clean_text(train_path)
+            clean_test = feature_cache.clean_text(test_path)
 
             logging.info(
                 "Applying preprocessing object on training dataframe and testing dataframe."
             )
 
-            input_feature_train_df=preprocessing_obj.fit_transform(input_feature_train_df)
-            input_feature_test_df=preprocessing_obj.transform(input_feature_test_df)
+            # the text is already clean, so fit TF-IDF with that step bypassed
+            preprocessing_obj = self.get_data_transformer_obj()
+            preprocessing_obj.set_params(text_pipeline__text_preprocessing="passthrough")
+            with log_stage("fit tfidf"):
+                input_feature_train_df=preprocessing_obj.fit_transform(pd.DataFrame({"text": clean_train}))
+                input_feature_test_df=preprocessing_obj.transform(pd.DataFrame({"text": clean_test}))
+
+            # then put a (serial) TextPreprocessor back for the saved object,
+            # which serves raw text one request at a time
+            preprocessing_obj.set_params(text_pipeline__text_preprocessing=TextPreprocessor())
+            fitted = preprocessing_obj.transformers_[0][1]
+            fitted.set_params(text_preprocessing=TextPreprocessor())
+
+            vectorizer = fitted.named_steps["vectorize"]
+            feature_cache.store_tfidf(train_path, vectorizer, input_feature_train_df)
+            feature_cache.store_tfidf(test_path, vectorizer, input_feature_test_df)
+            logging.info(f"feature cache: {feature_cache.stats}")
 
             logging.info("Saved preprocessing object.")
 
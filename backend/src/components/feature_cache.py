@@ -0,0 +1,169 @@
+"""
+Content-addressed cache for cleaned text and TF-IDF matrices.
+
+NLTK preprocessing dominates every training and export script, and they
+all clean the same train/test splits. Entries are keyed on the input
+file's sha256 plus the preprocessor version (PREPROCESS_VERSION, the
+cleanup pattern, the stopword list and the NLTK version), so an edited
+split or a changed preprocessor never serves stale features:
+
+    <cache_dir>/<key>/clean.parquet          cleaned text, one row per input row
+    <cache_dir>/<key>/tfidf-<vectorizer>.npz  sparse TF-IDF for one fitted vectorizer
+
+A TF-IDF matrix is additionally keyed on the fitted vectorizer's
+vocabulary and idf, so it is reused only with the exact same vocabulary.
+Entries unused for `max_age_days`, or beyond the `max_entries` most
+recently used, are evicted. `refresh=True` (the scripts' --no-cache)
+ignores what is cached and rebuilds it.
+"""
+
+import hashlib
+import os
+import shutil
+import sys
+import time
+from dataclasses import dataclass
+
+import nltk
+import numpy as np
+import pandas as pd
+import scipy.sparse
+
+from src.exception import CustomException
+from src.logger import logging
+from src.utils import (
+    NON_TOKEN_RE,
+    PREPROCESS_VERSION,
+    TextPreprocessor,
+    log_stage,
+    read_table,
+    stop_words,
+)
+
+
+@dataclass
+class FeatureCacheConfig:
+    cache_dir: str = os.getenv("FEATURE_CACHE_DIR", os.path.join("artifacts", "feature_cache"))
+    max_entries: int = int(os.getenv("FEATURE_CACHE_MAX_ENTRIES", "8"))
+    max_age_days: float = float(os.getenv("FEATURE_CACHE_MAX_AGE_DAYS", "14"))
+    # worker processes used to clean text on a miss (-1 = all cores)
+    n_jobs: int = int(os.getenv("PREPROCESS_N_JOBS", "-1"))
+
+
+def preprocessor_version():
+    """Fingerprint of everything that determines preprocess_text's output."""
+    digest = hashlib.sha256()
+    for part in (str(PREPROCESS_VERSION), NON_TOKEN_RE.pattern, nltk.__version__, *sorted(stop_words)):
+        digest.update(part.encode("utf-8") + b"\0")
+    return digest.hexdigest()[:12]
+
+
+def vectorizer_version(vectorizer):
+    """Fingerprint of a fitted TfidfVectorizer's vocabulary and idf."""
+    digest = hashlib.sha256()
+    for term, index in sorted(vectorizer.vocabulary_.items()):
+        digest.update(f"{term}\0{index}\0".encode("utf-8"))
+    digest.update(np.ascontiguousarray(vectorizer.idf_, dtype=np.float64).tobytes())
+    return digest.hexdigest()[:12]
+
+
+_file_hashes = {}
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """sha256 of a file, memoised per (path, mtime, size) for this process."""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if memo_key not in _file_hashes:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+        _file_hashes[memo_key] = digest.hexdigest()
+    return _file_hashes[memo_key]
+
+
+class FeatureCache:
+    def __init__(self, config: FeatureCacheConfig = None, refresh=False):
+        self.config = config or FeatureCacheConfig()
+        self.refresh = refresh
+        self.stats = {"hits": 0, "misses": 0}
+
+    def _entry(self, file_path, column):
+        key = hashlib.sha256(
+            f"{file_sha256(file_path)}\0{preprocessor_version()}\0{column}".encode("utf-8")
+        ).hexdigest()[:16]
+        entry = os.path.join(self.config.cache_dir, key)
+        os.makedirs(entry, exist_ok=True)
+        os.utime(entry)  # last use, for eviction
+        return entry
+
+    def _hit(self, path):
+        if not self.refresh and os.path.exists(path):
+            self.stats["hits"] += 1
+            return True
+        self.stats["misses"] += 1
+        return False
+
+    def clean_text(self, file_path, column="text", preprocessor=None):
+        """Cleaned `column` of a .parquet/.csv table, as a list in row order."""
+        try:
+            path = os.path.join(self._entry(file_path, column), "clean.parquet")
+            if self._hit(path):
+                return pd.read_parquet(path)["clean"].tolist()
+
+            with log_stage(f"clean text {os.path.basename(file_path)}"):
+                texts = read_table(file_path, columns=[column])[column]
+                preprocessor = preprocessor or TextPreprocessor()
+                clean = preprocessor.transform_series(texts, n_jobs=self.config.n_jobs)
+
+            tmp = f"{path}.tmp"
+            pd.DataFrame({"clean": clean.to_numpy()}).to_parquet(tmp, index=False)
+            os.replace(tmp, path)
+            self.evict()
+            return clean.tolist()
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def tfidf(self, file_path, vectorizer, column="text", preprocessor=None):
+        """TF-IDF of `column` under an already fitted `vectorizer` (CSR)."""
+        try:
+            entry = self._entry(file_path, column)
+            path = os.path.join(entry, f"tfidf-{vectorizer_version(vectorizer)}.npz")
+            if self._hit(path):
+                return scipy.sparse.load_npz(path).tocsr()
+
+            clean = self.clean_text(file_path, column, preprocessor)
+            with log_stage(f"tfidf {os.path.basename(file_path)}"):
+                X = vectorizer.transform(clean)
+            self.store_tfidf(file_path, vectorizer, X, column)
+            return X
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def store_tfidf(self, file_path, vectorizer, X, column="text"):
+        """Save a matrix computed elsewhere (e.g. by fit_transform)."""
+        path = os.path.join(
+            self._entry(file_path, column), f"tfidf-{vectorizer_version(vectorizer)}.npz"
+        )
+        tmp = f"{path}.tmp.npz"
+        scipy.sparse.save_npz(tmp, scipy.sparse.csr_matrix(X))
+        os.replace(tmp, path)
+
+    def evict(self):
+        """Drop entries older than max_age_days, then all but the newest max_entries."""
+        root = self.config.cache_dir
+        if not os.path.isdir(root):
+            return
+        entries = sorted(
+            (os.path.join(root, name) for name in os.listdir(root)),
+            key=os.path.getmtime,
+            reverse=True,
+        )
+        cutoff = time.time() - self.config.max_age_days * 86400
+        for i, entry in enumerate(entries):
+            if i >= self.config.max_entries or os.path.getmtime(entry) < cutoff:
+                shutil.rmtree(entry, ignore_errors=True)
+                logging.info(f"feature cache: evicted {os.path.basename(entry)}")
@@ -0,0 +1,303 @@
+"""
+Incremental retraining: add boosting rounds instead of refitting.
+
+Labelled rows are streamed in chunks from a CSV or Parquet table (`text`,
+`target`) or from the articles collection (documents carrying
+`label_field`). Each chunk is vectorized with the saved preprocessor, and
+the existing `model.pkl` booster is continued by `rounds_per_chunk` new
+trees. Nothing is refit:
+
+    fixed    (default) reuse preprocess.pkl's fitted TF-IDF vocabulary;
+             words outside it are ignored, exactly as at serve time
+    hashing  a stateless HashingVectorizer + l2 norm, so new words get
+             features too. Its feature space differs from the TF-IDF
+             model's, so the first hashing run starts a new booster and
+             later runs continue it.
+
+`state_path` records what earlier runs trained on, so each run only sees
+rows added since: the last trained `_id` for Mongo, and the number of rows
+already read from each CSV/Parquet file (new rows are expected to be
+appended). With no record yet, the ingestion source starts after the rows
+ingestion split into train/test. preprocess.pkl is rewritten only when it changes (the switch to
+hashing). Stage timings and memory go to src.logger.
+
+    python -m src.components.incremental_trainer --source mongo
+    python -m src.components.incremental_trainer --source csv --csv notebook/data.csv
+"""
+
+import argparse
+import json
+import os
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import xgboost
+from sklearn.compose import ColumnTransformer
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.pipeline import Pipeline
+from xgboost import XGBClassifier
+
+from src.components.data_ingestion import DataIngestionConfig
+from src.components.data_transformer import DataTransformationConfig
+from src.components.model_trainer import ModelTrainerConfig
+from src.exception import CustomException
+from src.logger import logging
+from src.pipeline.model_registry import publish_manifest
+from src.utils import (
+    TextPreprocessor,
+    iter_table,
+    load_object,
+    log_stage,
+    read_table,
+    save_object,
+)
+
+
+@dataclass
+class IncrementalTrainerConfig:
+    source: str = os.getenv("TRAIN_SOURCE", "csv")  # "csv" or "mongo"
+    csv_path: str = DataIngestionConfig.source_data_path
+    # Mongo field holding a human-assigned 0/1 label
+    label_field: str = os.getenv("TRAIN_LABEL_FIELD", "label")
+    chunk_size: int = int(os.getenv("TRAIN_CHUNK_SIZE", "5000"))
+    rounds_per_chunk: int = int(os.getenv("TRAIN_ROUNDS_PER_CHUNK", "10"))
+    vectorizer: str = os.getenv("TRAIN_VECTORIZER", "fixed")  # "fixed" or "hashing"
+    hashing_features: int = 1 << 18
+    model_path: str = ModelTrainerConfig.trained_model_file_path
+    preprocessor_path: str = DataTransformationConfig.preprocess_obj_file_path
+    test_data_path: str = DataIngestionConfig.test_data_path
+    # ingestion's copy of every source row the base model was split from
+    raw_data_path: str = DataIngestionConfig.raw_data_path
+    ingestion_source_path: str = DataIngestionConfig.source_data_path
+    state_path: str = os.path.join("artifacts", "incremental_state.json")
+
+
+def hashing_preprocessor(n_features):
+    """Stateless counterpart of DataTransformation's ColumnTransformer."""
+    pipeline = Pipeline(
+        steps=[
+            ("text_preprocessing", TextPreprocessor()),
+            ("vectorize", HashingVectorizer(n_features=n_features, alternate_sign=False)),
+        ]
+    )
+    preprocessor = ColumnTransformer(
+        transformers=[("text_pipeline", pipeline, "text")], remainder="drop"
+    )
+    # nothing to learn; fit on one row just to set the fitted attributes
+    return preprocessor.fit(pd.DataFrame({"text": [""]}))
+
+
+class IncrementalTrainer:
+    def __init__(self, config: IncrementalTrainerConfig = None):
+        self.config = config or IncrementalTrainerConfig()
+
+    def _load_state(self):
+        try:
+            with open(self.config.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self, state):
+        tmp = f"{self.config.state_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.config.state_path)
+
+    def _ingested_rows(self, key):
+        """Rows of `key` the full pipeline already split into train/test.
+
+        Only the ingestion source counts; its raw split holds every source
+        row, so its length is where the unseen rows start.
+        """
+        config = self.config
+        if key != os.path.abspath(config.ingestion_source_path):
+            return 0
+        if not os.path.exists(config.raw_data_path):
+            logging.info(
+                f"incremental: no {config.raw_data_path}; training on all of {key}, "
+                "including rows the base model and the test split already hold"
+            )
+            return 0
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(config.raw_data_path).metadata.num_rows
+
+    def iter_csv_chunks(self, state):
+        """Rows of `csv_path` past those read by earlier runs.
+
+        A file with no offset in `state` yet starts after the rows ingestion
+        used, so the first run neither relearns the base model's training
+        rows nor trains on the test split. The offset is advanced as chunks
+        are consumed; it only reaches disk with the artifacts (see
+        _save_state).
+        """
+        offsets = state.setdefault("csv_rows", {})
+        key = os.path.abspath(self.config.csv_path)
+        done = offsets[key] if key in offsets else self._ingested_rows(key)
+        position = 0
+        for chunk in iter_table(
+            self.config.csv_path, columns=["text", "target"], chunksize=self.config.chunk_size
+        ):
+            start, position = position, position + len(chunk)
+            if position <= done:
+                continue
+            offsets[key] = position
+            chunk = chunk.iloc[max(done - start, 0) :].dropna(subset=["text", "target"])
+            if len(chunk):
+                yield chunk
+        if position < done:
+            logging.info(
+                f"incremental: {key} has {position} rows but {done} were already trained; "
+                f"if it was replaced, drop its entry from {self.config.state_path}"
+            )
+
+    def iter_mongo_chunks(self, state):
+        """Labelled articles newer than the last run, oldest first."""
+        from bson import ObjectId
+
+        from db import find_projected, get_collection
+
+        field = self.config.label_field
+        query = {field: {"$in": [0, 1]}}
+        if state.get("last_id"):
+            query["_id"] = {"$gt": ObjectId(state["last_id"])}
+        cursor = find_projected(
+            get_collection(), query, ("title", "text", field), sort=[("_id", 1)]
+        )
+
+        rows = []
+        for doc in cursor:
+            # same title + text concatenation the models are scored on
+            rows.append(
+                {
+                    "text": f"{doc.get('title') or ''}{doc.get('text') or ''}",
+                    "target": int(doc[field]),
+                    "_id": str(doc["_id"]),
+                }
+            )
+            if len(rows) >= self.config.chunk_size:
+                yield pd.DataFrame(rows)
+                rows = []
+        if rows:
+            yield pd.DataFrame(rows)
+
+    def _load_artifacts(self):
+        """(preprocessor, model or None); model is None when starting fresh."""
+        config = self.config
+        preprocessor = load_object(config.preprocessor_path)
+        vectorize = preprocessor.transformers_[0][1].named_steps["vectorize"]
+        is_hashing = isinstance(vectorize, HashingVectorizer)
+
+        if config.vectorizer == "hashing" and not is_hashing:
+            logging.info("incremental: switching to a hashing vectorizer; new booster")
+            return hashing_preprocessor(config.hashing_features), None
+        if config.vectorizer == "fixed" and is_hashing:
+            raise ValueError("saved preprocessor is hashing; run the full pipeline to refit TF-IDF")
+        return preprocessor, load_object(config.model_path)
+
+    def _evaluate(self, preprocessor, model):
+        if model is None or not os.path.exists(self.config.test_data_path):
+            return None
+        test_df = read_table(self.config.test_data_path, columns=["text", "target"])
+        predicted = model.predict(preprocessor.transform(test_df))
+        return float((predicted == test_df["target"].to_numpy()).mean())
+
+    def initiate_incremental_training(self):
+        try:
+            config = self.config
+            state = self._load_state()
+
+            with log_stage("load artifacts"):
+                preprocessor, model = self._load_artifacts()
+            # only a switch to hashing replaces the saved preprocessor
+            new_preprocessor = model is None
+            acc_before = self._evaluate(preprocessor, model)
+
+            chunks = (
+                self.iter_mongo_chunks(state)
+                if config.source == "mongo"
+                else self.iter_csv_chunks(state)
+            )
+            booster = model.get_booster() if model is not None else None
+            params = (model or XGBClassifier()).get_xgb_params()
+            params = {k: v for k, v in params.items() if v is not None}
+            rows = 0
+
+            for n, chunk in enumerate(chunks):
+                with log_stage(f"chunk {n} vectorize ({len(chunk)} rows)"):
+                    X = preprocessor.transform(chunk[["text"]])
+                    dtrain = xgboost.DMatrix(X, label=chunk["target"].astype(int).values)
+                with log_stage(f"chunk {n} boost +{config.rounds_per_chunk} rounds"):
+                    booster = xgboost.train(
+                        params, dtrain, num_boost_round=config.rounds_per_chunk, xgb_model=booster
+                    )
+                rows += len(chunk)
+                if "_id" in chunk:
+                    state["last_id"] = chunk["_id"].iloc[-1]
+
+            if booster is None:
+                logging.info("incremental: no new labelled rows")
+                return {"rows": 0, "accuracy_before": acc_before}
+
+            if model is None:
+                model = XGBClassifier(**params)
+                model.n_classes_, model.classes_ = 2, np.array([0, 1])
+            # the sklearn wrapper serves whatever booster it holds
+            model._Booster = booster
+            model.n_estimators = booster.num_boosted_rounds()
+
+            with log_stage("save artifacts"):
+                if new_preprocessor:
+                    save_object(config.preprocessor_path, preprocessor)
+                save_object(config.model_path, model)
+                publish_manifest(config.model_path, config.preprocessor_path)
+            self._save_state(state)
+
+            acc_after = self._evaluate(preprocessor, model)
+            logging.info(
+                f"incremental: {rows} rows, {booster.num_boosted_rounds()} trees, "
+                f"test accuracy {acc_before} -> {acc_after}"
+            )
+            return {
+                "rows": rows,
+                "trees": booster.num_boosted_rounds(),
+                "accuracy_before": acc_before,
+                "accuracy_after": acc_after,
+            }
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Continue training model.pkl on new rows.")
+    parser.add_argument("--source", choices=["csv", "mongo"])
+    parser.add_argument("--csv")
+    parser.add_argument("--vectorizer", choices=["fixed", "hashing"])
+    parser.add_argument("--rounds", type=int, help="boosting rounds per chunk")
+    parser.add_argument("--chunk-size", type=int)
+    args = parser.parse_args()
+
+    config = IncrementalTrainerConfig()
+    for field, value in (
+        ("source", args.source),
+        ("csv_path", args.csv),
+        ("vectorizer", args.vectorizer),
+        ("rounds_per_chunk", args.rounds),
+        ("chunk_size", args.chunk_size),
+    ):
+        if value is not None:
+            setattr(config, field, value)
+
+    if config.source == "mongo":
+        import dotenv
+
+        dotenv.load_dotenv()
+    print(IncrementalTrainer(config).initiate_incremental_training())
+
+
+if __name__ == "__main__":
+    main()
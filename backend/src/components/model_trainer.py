@@ -8,6 +8,7 @@ from sklearn.metrics import accuracy_score
 from src.exception import CustomException
 from src.logger import logging
 
+from src.pipeline.model_registry import publish_manifest
 from src.utils import save_object
 
 @dataclass
@@ -35,6 +36,8 @@ class ModelTrainer:
                 file_path=self.model_trainer_config.trained_model_file_path,
                 obj=model
             )
+            # preprocess.pkl was written by DataTransformation; publish the pair
+            publish_manifest(model_path=self.model_trainer_config.trained_model_file_path)
             
             predicted=model.predict(X_test)
             acc = accuracy_score(y_test,predicted)
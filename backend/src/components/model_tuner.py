@@ -0,0 +1,264 @@
+"""
+Hyperparameter search over TF-IDF + XGBoost settings (tuning mode).
+
+Successive halving: `n_candidates` random configurations are scored with
+k-fold CV on a `min_fraction` sample of the training rows; the best
+1/`factor` (at least `finalists`) move to the next rung with `factor` times
+more rows, until a rung runs on all rows or only `finalists` remain. Folds of every surviving candidate run in parallel
+(joblib), each XGBoost fit single-threaded with tree_method="hist" and early
+stopping on its fold's validation split.
+
+Features come from the feature cache: cleaned text is computed once, and
+each distinct TF-IDF setting is fit once on the full training split and its
+sparse matrix cached, so CV only slices rows (vocabulary and idf therefore
+see the validation folds, which the ranking tolerates).
+
+Finalists are refit on the full training split with their early-stopped
+number of trees and scored on the test split, along with per-article
+inference latency (TF-IDF transform + predict on one cleaned text). The
+leaderboard (ranked by CV accuracy, then latency) is written to
+`leaderboard_path` and printed.
+
+    python -m src.components.model_tuner [--candidates 16] [--folds 3] [--no-cache]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.model_selection import ParameterSampler, StratifiedKFold
+from xgboost import XGBClassifier
+
+from src.components.data_ingestion import DataIngestionConfig
+from src.components.data_transformer import decode_target
+from src.components.feature_cache import FeatureCache
+from src.exception import CustomException
+from src.logger import logging
+from src.utils import effective_n_jobs, log_stage, read_table
+
+TFIDF_SPACE = {
+    "max_features": [None, 50000, 20000],
+    "ngram_range": [(1, 1), (1, 2)],
+    "min_df": [1, 2, 5],
+    "sublinear_tf": [False, True],
+}
+XGB_SPACE = {
+    "max_depth": [4, 6, 8],
+    "learning_rate": [0.05, 0.1, 0.3],
+    "subsample": [0.8, 1.0],
+    "colsample_bytree": [0.5, 0.8, 1.0],
+    "min_child_weight": [1, 3],
+}
+
+
+@dataclass
+class ModelTunerConfig:
+    train_data_path: str = DataIngestionConfig.train_data_path
+    test_data_path: str = DataIngestionConfig.test_data_path
+    leaderboard_path: str = os.path.join("artifacts", "tuning_leaderboard.json")
+    n_candidates: int = int(os.getenv("TUNE_CANDIDATES", "16"))
+    folds: int = int(os.getenv("TUNE_FOLDS", "3"))
+    factor: int = 3
+    # share of training rows each candidate sees at the first rung
+    min_fraction: float = 0.2
+    # halving stops at this many configs; they get test accuracy + latency
+    finalists: int = 4
+    max_rounds: int = 1000
+    early_stopping_rounds: int = 20
+    n_jobs: int = int(os.getenv("TUNE_N_JOBS", "-1"))
+    # test texts timed one at a time for the latency column
+    latency_rows: int = 200
+    random_state: int = 42
+
+
+def _split_params(params):
+    tfidf = {k[6:]: v for k, v in params.items() if k.startswith("tfidf_")}
+    xgb = {k[4:]: v for k, v in params.items() if k.startswith("xgb_")}
+    return tfidf, xgb
+
+
+def _fit_fold(X, y, train_idx, val_idx, xgb_params, config):
+    model = XGBClassifier(
+        tree_method="hist",
+        n_estimators=config.max_rounds,
+        early_stopping_rounds=config.early_stopping_rounds,
+        n_jobs=1,
+        random_state=config.random_state,
+        **xgb_params,
+    )
+    model.fit(X[train_idx], y[train_idx], eval_set=[(X[val_idx], y[val_idx])], verbose=False)
+    accuracy = float((model.predict(X[val_idx]) == y[val_idx]).mean())
+    return accuracy, int(model.best_iteration) + 1
+
+
+class ModelTuner:
+    def __init__(self, config: ModelTunerConfig = None, refresh_cache=False):
+        self.config = config or ModelTunerConfig()
+        self.feature_cache = FeatureCache(refresh=refresh_cache)
+        self._vectorizers = {}
+
+    def _features(self, tfidf_params, clean_train):
+        """Fitted vectorizer + cached train matrix for one TF-IDF setting."""
+        key = json.dumps(tfidf_params, sort_keys=True, default=str)
+        if key not in self._vectorizers:
+            vectorizer = TfidfVectorizer(**tfidf_params).fit(clean_train)
+            X = self.feature_cache.tfidf(self.config.train_data_path, vectorizer).tocsr()
+            self._vectorizers[key] = (vectorizer, X)
+        return self._vectorizers[key]
+
+    def _sample_candidates(self):
+        space = {f"tfidf_{k}": v for k, v in TFIDF_SPACE.items()}
+        space.update({f"xgb_{k}": v for k, v in XGB_SPACE.items()})
+        return list(
+            ParameterSampler(space, self.config.n_candidates, random_state=self.config.random_state)
+        )
+
+    def _latency_ms(self, vectorizer, model, clean_texts):
+        timings = []
+        for text in clean_texts:
+            start = time.perf_counter()
+            model.predict(vectorizer.transform([text]))
+            timings.append(time.perf_counter() - start)
+        return float(np.median(timings) * 1000)
+
+    def _row(self, cand):
+        return {
+            "params": {k: str(v) if isinstance(v, tuple) else v for k, v in cand["params"].items()},
+            "rung": cand["rung"],
+            "cv_accuracy": round(cand["cv_accuracy"], 4),
+            "cv_std": round(cand["cv_std"], 4),
+            "history": cand["history"],
+        }
+
+    def initiate_model_tuning(self):
+        try:
+            config = self.config
+            rng = np.random.default_rng(config.random_state)
+            y = decode_target(read_table(config.train_data_path, columns=["target"])["target"]).to_numpy()
+            y_test = decode_target(read_table(config.test_data_path, columns=["target"])["target"]).to_numpy()
+            clean_train = self.feature_cache.clean_text(config.train_data_path)
+            clean_test = self.feature_cache.clean_text(config.test_data_path)
+
+            candidates = [{"params": p, "history": []} for p in self._sample_candidates()]
+            eliminated = []
+            fraction, rung = config.min_fraction, 0
+            n_jobs = effective_n_jobs(config.n_jobs)
+
+            while True:
+                fraction = min(fraction, 1.0)
+                rows = np.sort(rng.choice(len(y), int(len(y) * fraction), replace=False))
+                folds = list(
+                    StratifiedKFold(config.folds, shuffle=True, random_state=config.random_state)
+                    .split(rows, y[rows])
+                )
+
+                jobs, sliced, y_rung = [], {}, y[rows]
+                for cand in candidates:
+                    tfidf_params, xgb_params = _split_params(cand["params"])
+                    key = json.dumps(tfidf_params, sort_keys=True, default=str)
+                    if key not in sliced:
+                        sliced[key] = self._features(tfidf_params, clean_train)[1][rows]
+                    X_rung = sliced[key]
+                    for train_idx, val_idx in folds:
+                        jobs.append(
+                            delayed(_fit_fold)(X_rung, y_rung, train_idx, val_idx, xgb_params, config)
+                        )
+
+                with log_stage(f"tuning rung {rung}: {len(candidates)} configs on {len(rows)} rows"):
+                    scores = Parallel(n_jobs=n_jobs)(jobs)
+
+                for i, cand in enumerate(candidates):
+                    fold_scores = scores[i * config.folds : (i + 1) * config.folds]
+                    accs = [a for a, _ in fold_scores]
+                    cand["cv_accuracy"] = float(np.mean(accs))
+                    cand["cv_std"] = float(np.std(accs))
+                    cand["best_rounds"] = int(np.mean([r for _, r in fold_scores]))
+                    cand["rung"] = rung
+                    cand["history"].append({"rows": len(rows), "cv_accuracy": cand["cv_accuracy"]})
+
+                candidates.sort(key=lambda c: c["cv_accuracy"], reverse=True)
+                if fraction >= 1.0 or len(candidates) <= config.finalists:
+                    break
+                keep = max(config.finalists, len(candidates) // config.factor)
+                eliminated += candidates[keep:]
+                candidates = candidates[:keep]
+                fraction *= config.factor
+                rung += 1
+
+            leaderboard = []
+            latency_texts = [t for t in clean_test[: config.latency_rows] if isinstance(t, str)]
+            for cand in candidates:
+                tfidf_params, xgb_params = _split_params(cand["params"])
+                vectorizer, X = self._features(tfidf_params, clean_train)
+                with log_stage(f"refit {cand['params']}"):
+                    model = XGBClassifier(
+                        tree_method="hist",
+                        n_estimators=cand["best_rounds"],
+                        random_state=config.random_state,
+                        **xgb_params,
+                    ).fit(X, y)
+                X_test = self.feature_cache.tfidf(config.test_data_path, vectorizer)
+                leaderboard.append(
+                    {
+                        **self._row(cand),
+                        "test_accuracy": round(float((model.predict(X_test) == y_test).mean()), 4),
+                        "n_estimators": cand["best_rounds"],
+                        "n_features": len(vectorizer.vocabulary_),
+                        "latency_ms": round(self._latency_ms(vectorizer, model, latency_texts), 3),
+                    }
+                )
+
+            # rank on CV, not test accuracy, so the test split stays a check;
+            # configs dropped by the halving follow, latest rung first
+            leaderboard.sort(key=lambda r: (-r["cv_accuracy"], r["latency_ms"]))
+            eliminated.sort(key=lambda c: (-c["rung"], -c["cv_accuracy"]))
+            leaderboard += [
+                dict(self._row(c), test_accuracy=None, n_estimators=c["best_rounds"], n_features=None, latency_ms=None)
+                for c in eliminated
+            ]
+            os.makedirs(os.path.dirname(config.leaderboard_path), exist_ok=True)
+            with open(config.leaderboard_path, "w", encoding="utf-8") as f:
+                json.dump(leaderboard, f, indent=2)
+            logging.info(f"tuning leaderboard written to {config.leaderboard_path}")
+            return leaderboard
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+def print_leaderboard(leaderboard):
+    def cell(value, fmt, width):
+        return f"{'-':>{width}}" if value is None else f"{value:>{width}{fmt}}"
+
+    print(f"{'#':>2}  {'rung':>4}  {'cv acc':>13}  {'test acc':>8}  {'trees':>5}  {'features':>8}  {'ms/article':>10}  params")
+    for rank, row in enumerate(leaderboard, 1):
+        print(
+            f"{rank:>2}  {row['rung']:>4}  {row['cv_accuracy']:.4f}±{row['cv_std']:.4f}  "
+            f"{cell(row['test_accuracy'], '.4f', 8)}  {row['n_estimators']:>5}  "
+            f"{cell(row['n_features'], 'd', 8)}  {cell(row['latency_ms'], '.3f', 10)}  {row['params']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search TF-IDF + XGBoost settings.")
+    parser.add_argument("--candidates", type=int)
+    parser.add_argument("--folds", type=int)
+    parser.add_argument("--no-cache", action="store_true", help="rebuild cached text/TF-IDF features")
+    args = parser.parse_args()
+
+    config = ModelTunerConfig()
+    if args.candidates:
+        config.n_candidates = args.candidates
+    if args.folds:
+        config.folds = args.folds
+    print_leaderboard(ModelTuner(config, refresh_cache=args.no_cache).initiate_model_tuning())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Compact binary alternative to model_meta.json.
+
+Layout (all integers little-endian):
+
+    b"NBMETA1\\0"                 magic
+    uint32                       header length
+    header                       UTF-8 JSON: norm, n_features, accuracy and
+                                 a section table {name: [offset, nbytes]}
+    sections, each 8-byte aligned:
+      idf            float32[len(vocab)]
+      feature_index  uint32[n_features]              (pruned exports only)
+      vocab          string table, in vocab index order
+      lemma_keys     string table, sorted
+      lemma_values   string table, same order as lemma_keys
+      stopwords      string table, sorted
+
+A string table is uint32 count, uint32 offsets[count + 1], then the
+concatenated UTF-8 bytes. Numeric sections and the offset arrays are
+read as zero-copy numpy views over a memory map; strings are decoded
+only when a table is turned into a list or dict.
+
+numpy only, so frontend/scripts/export_onnx.py can import it too.
+"""
+
+import bisect
+import json
+import mmap
+import struct
+
+import numpy as np
+
+MAGIC = b"NBMETA1\0"
+ALIGN = 8
+
+
+def _pad(n):
+    return -n % ALIGN
+
+
+def _string_table(strings):
+    data = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(data) + 1, dtype="<u4")
+    offsets[1:] = np.cumsum([len(b) for b in data])
+    return struct.pack("<I", len(data)) + offsets.tobytes() + b"".join(data)
+
+
+class StringTable:
+    """Read-only view of a string table section."""
+
+    def __init__(self, buf, offset):
+        (self.count,) = struct.unpack_from("<I", buf, offset)
+        self.offsets = np.frombuffer(buf, dtype="<u4", count=self.count + 1, offset=offset + 4)
+        self.data = memoryview(buf)[offset + 4 + 4 * (self.count + 1) :]
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        return bytes(self.data[self.offsets[i] : self.offsets[i + 1]]).decode("utf-8")
+
+    def find(self, word):
+        """Index of `word` in a sorted table, or -1."""
+        i = bisect.bisect_left(self, word)
+        return i if i < self.count and self[i] == word else -1
+
+    def tolist(self):
+        raw = bytes(self.data[: self.offsets[-1]])
+        bounds = self.offsets.tolist()
+        return [raw[bounds[i] : bounds[i + 1]].decode("utf-8") for i in range(self.count)]
+
+
+def write_bundle(meta, path):
+    """Write a model_meta.json-shaped dict as a binary bundle."""
+    lemma = sorted(meta["lemma"].items())
+    sections = [("idf", np.asarray(meta["idf"], dtype="<f4").tobytes())]
+    if meta.get("feature_index"):
+        sections.append(("feature_index", np.asarray(meta["feature_index"], dtype="<u4").tobytes()))
+    sections += [
+        ("vocab", _string_table(meta["vocab"])),
+        ("lemma_keys", _string_table([k for k, _ in lemma])),
+        ("lemma_values", _string_table([v for _, v in lemma])),
+        ("stopwords", _string_table(sorted(meta["stopwords"]))),
+    ]
+
+    # offsets are relative to the end of the header, so the header can be
+    # serialised before they are known
+    table, pos = {}, 0
+    for name, payload in sections:
+        table[name] = [pos, len(payload)]
+        pos += len(payload) + _pad(len(payload))
+    header = json.dumps(
+        {
+            "norm": meta.get("norm", "l2"),
+            "n_features": int(meta["n_features"]),
+            "accuracy": float(meta.get("accuracy", 0.0)),
+            "sections": table,
+        }
+    ).encode("utf-8")
+    header += b" " * _pad(len(MAGIC) + 4 + len(header))
+
+    with open(path, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(header)) + header)
+        for _, payload in sections:
+            f.write(payload + b"\0" * _pad(len(payload)))
+
+
+class MetaBundle:
+    """Memory-mapped reader for `write_bundle` output."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.buf[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a meta bundle")
+        (size,) = struct.unpack_from("<I", self.buf, len(MAGIC))
+        start = len(MAGIC) + 4
+        self.header = json.loads(bytes(self.buf[start : start + size]))
+        self.base = start + size
+
+    def _offset(self, name):
+        return self.base + self.header["sections"][name][0]
+
+    def has(self, name):
+        return name in self.header["sections"]
+
+    def array(self, name, dtype):
+        offset, nbytes = self.header["sections"][name]
+        count = nbytes // np.dtype(dtype).itemsize
+        return np.frombuffer(self.buf, dtype=dtype, count=count, offset=self.base + offset)
+
+    def strings(self, name):
+        return StringTable(self.buf, self._offset(name))
+
+    def to_meta(self):
+        """The same dict json.load(model_meta.json) returns (idf as an array)."""
+        meta = {
+            "vocab": self.strings("vocab").tolist(),
+            "idf": self.array("idf", "<f4"),
+            "norm": self.header["norm"],
+            "lemma": dict(
+                zip(self.strings("lemma_keys").tolist(), self.strings("lemma_values").tolist())
+            ),
+            "n_features": self.header["n_features"],
+            "accuracy": self.header["accuracy"],
+            "stopwords": self.strings("stopwords").tolist(),
+        }
+        if self.has("feature_index"):
+            meta["feature_index"] = self.array("feature_index", "<u4").tolist()
+        return meta
+
+
+def read_meta(path):
+    """Load model metadata from a bundle or a model_meta.json, by content."""
+    with open(path, "rb") as f:
+        is_bundle = f.read(len(MAGIC)) == MAGIC
+    if is_bundle:
+        return MetaBundle(path).to_meta()
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
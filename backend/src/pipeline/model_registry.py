@@ -0,0 +1,262 @@
+"""
+Process-wide registry for the pickled inference artifacts.
+
+`model.pkl` and `preprocess.pkl` are unpickled once per worker and shared
+by every request thread. Trainers write both files and then publish
+`manifest.json` (`publish_manifest`), which names the pair and the sha256
+of each file. Each access does a cheap `os.stat` of the manifest, at most
+once per `check_interval` seconds; only a new manifest triggers a reload,
+and the pair is swapped in only if both files still match it and a warm-up
+prediction succeeds. Otherwise the new pair is rejected and the previous
+one keeps serving. Without a manifest (artifacts from before it existed)
+the configured files are loaded once and never hot-reloaded.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+
+from src.exception import CustomException
+from src.logger import logging
+
+
+@dataclass
+class ModelRegistryConfig:
+    model_path: str = os.path.join("artifacts", "model.pkl")
+    preprocessor_path: str = os.path.join("artifacts", "preprocess.pkl")
+    # written last by every trainer; names the pair the registry serves
+    manifest_path: str = os.path.join("artifacts", "manifest.json")
+    # seconds between stat() checks for new artifacts on disk
+    check_interval: float = float(os.getenv("MODEL_CHECK_INTERVAL", "5"))
+
+
+@dataclass
+class LoadedModel:
+    """An immutable snapshot of a matching model + preprocessor pair."""
+
+    model: object
+    preprocessor: object
+    version: str
+    loaded_at: float
+
+
+@dataclass
+class _FileState:
+    mtime: float = 0.0
+    size: int = -1
+    sha256: str = ""
+
+
+def _file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _pair_version(model_sha256, preprocessor_sha256):
+    return hashlib.sha256((model_sha256 + preprocessor_sha256).encode()).hexdigest()[:12]
+
+
+def publish_manifest(model_path=None, preprocessor_path=None, manifest_path=None):
+    """Publish a freshly written model + preprocessor pair; returns the manifest.
+
+    Call only once both files are in place. Paths default to
+    ModelRegistryConfig; the manifest stores them relative to itself.
+    """
+    defaults = ModelRegistryConfig()
+    model_path = model_path or defaults.model_path
+    preprocessor_path = preprocessor_path or defaults.preprocessor_path
+    manifest_path = manifest_path or defaults.manifest_path
+    base = os.path.dirname(os.path.abspath(manifest_path))
+
+    model_sha256 = _file_sha256(model_path)
+    preprocessor_sha256 = _file_sha256(preprocessor_path)
+    manifest = {
+        "version": _pair_version(model_sha256, preprocessor_sha256),
+        "model": {"path": os.path.relpath(os.path.abspath(model_path), base), "sha256": model_sha256},
+        "preprocessor": {
+            "path": os.path.relpath(os.path.abspath(preprocessor_path), base),
+            "sha256": preprocessor_sha256,
+        },
+        "published_at": time.time(),
+    }
+    fd, tmp_path = tempfile.mkstemp(dir=base, prefix=".manifest.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, manifest_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    logging.info(f"published model manifest {manifest['version']}")
+    return manifest
+
+
+def _warm_up(model, preprocessor):
+    """Run one dummy prediction so NLTK's lazy WordNet loader is resolved
+    before request threads race on it. Raises if the pair cannot predict."""
+    import pandas as pd
+
+    model.predict(preprocessor.transform(pd.DataFrame({"text": ["warm up"]})))
+
+
+@dataclass
+class _RegistryStats:
+    loads: int = 0
+    reloads: int = 0
+    last_load_seconds: float = 0.0
+    total_load_seconds: float = 0.0
+    hits: int = 0
+    rejected: int = 0
+    history: list = field(default_factory=list)
+
+
+class ModelRegistry:
+    def __init__(self, config: ModelRegistryConfig = None):
+        self.config = config or ModelRegistryConfig()
+        self._lock = threading.Lock()
+        self._current = None
+        self._manifest = _FileState()
+        # version of the last published pair that failed to load
+        self._rejected = None
+        self._last_check = 0.0
+        self._stats = _RegistryStats()
+
+    def _read_manifest(self):
+        """(manifest or None, its _FileState); None if no manifest is published."""
+        path = self.config.manifest_path
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None, _FileState()
+        with open(path, "rb") as f:
+            raw = f.read()
+        return json.loads(raw), _FileState(st.st_mtime, st.st_size, hashlib.sha256(raw).hexdigest())
+
+    def _changed_on_disk(self):
+        """True if a pair other than the loaded (or rejected) one was published."""
+        try:
+            st = os.stat(self.config.manifest_path)
+        except FileNotFoundError:
+            return False
+        if st.st_mtime == self._manifest.mtime and st.st_size == self._manifest.size:
+            return False
+        manifest, state = self._read_manifest()
+        self._manifest = state
+        return manifest is not None and manifest["version"] not in (self._current.version, self._rejected)
+
+    def _pair(self, manifest):
+        """(model path, preprocessor path, version) of the pair to load."""
+        if manifest is None:
+            paths = (self.config.model_path, self.config.preprocessor_path)
+            return paths + (_pair_version(*(_file_sha256(p) for p in paths)),)
+
+        base = os.path.dirname(os.path.abspath(self.config.manifest_path))
+        paths = []
+        for key in ("model", "preprocessor"):
+            path = os.path.join(base, manifest[key]["path"])
+            # a later retrain may already be overwriting the published files
+            if _file_sha256(path) != manifest[key]["sha256"]:
+                raise ValueError(f"{path} does not match manifest {manifest['version']}")
+            paths.append(path)
+        return paths[0], paths[1], manifest["version"]
+
+    def _load(self):
+        # deferred: importing src.utils pulls in pandas, nltk and sklearn
+        from src.utils import load_object
+
+        start = time.perf_counter()
+        manifest, state = self._read_manifest()
+        try:
+            model_path, preprocessor_path, version = self._pair(manifest)
+            model = load_object(file_path=model_path)
+            preprocessor = load_object(file_path=preprocessor_path)
+            _warm_up(model, preprocessor)
+        except Exception:
+            if manifest is not None:
+                self._manifest, self._rejected = state, manifest["version"]
+                self._stats.rejected += 1
+            raise
+        loaded = LoadedModel(model, preprocessor, version, time.time())
+        elapsed = time.perf_counter() - start
+
+        stats = self._stats
+        if self._current is not None:
+            stats.reloads += 1
+        stats.loads += 1
+        stats.last_load_seconds = elapsed
+        stats.total_load_seconds += elapsed
+        stats.history = (stats.history + [(version, round(elapsed, 4))])[-10:]
+        logging.info(f"model registry loaded version {version} in {elapsed:.3f}s")
+
+        self._manifest = state
+        self._current = loaded
+        return loaded
+
+    def get(self) -> LoadedModel:
+        """Return the current snapshot, loading or hot-reloading if needed."""
+        try:
+            now = time.monotonic()
+            current = self._current
+            if current is not None and now - self._last_check < self.config.check_interval:
+                self._stats.hits += 1
+                return current
+
+            with self._lock:
+                # another thread may have refreshed while we waited
+                if self._current is not None and now - self._last_check < self.config.check_interval:
+                    self._stats.hits += 1
+                    return self._current
+                if self._current is None or self._changed_on_disk():
+                    self._load()
+                else:
+                    self._stats.hits += 1
+                self._last_check = time.monotonic()
+                return self._current
+
+        except Exception as e:
+            if self._current is not None:
+                # the new pair was rejected; keep serving the last good one
+                logging.info(f"model registry reload failed, keeping {self._current.version}: {e}")
+                self._last_check = time.monotonic()
+                return self._current
+            raise CustomException(e, sys)
+
+    def stats(self) -> dict:
+        s = self._stats
+        current = self._current
+        return {
+            "loaded": current is not None,
+            "version": current.version if current else None,
+            "loaded_at": current.loaded_at if current else None,
+            "loads": s.loads,
+            "reloads": s.reloads,
+            "hits": s.hits,
+            "rejected": s.rejected,
+            "rejected_version": self._rejected,
+            "last_load_seconds": round(s.last_load_seconds, 4),
+            "total_load_seconds": round(s.total_load_seconds, 4),
+            "history": list(s.history),
+        }
+
+
+_default_registry = None
+_default_lock = threading.Lock()
+
+
+def get_registry() -> ModelRegistry:
+    """The per-process registry shared by every PredictPipeline."""
+    global _default_registry
+    if _default_registry is None:
+        with _default_lock:
+            if _default_registry is None:
+                _default_registry = ModelRegistry()
+    return _default_registry
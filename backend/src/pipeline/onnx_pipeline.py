@@ -0,0 +1,205 @@
+"""
+ONNX Runtime inference engine, a drop-in alternative to PredictPipeline.
+
+Loads the dense-trained classifier that frontend/scripts/export_onnx.py
+writes (`model.onnx`) together with its `model_meta.json` (vocab, idf,
+norm, lemma table, stopwords), and builds the TF-IDF features straight
+from those arrays — no pickled sklearn objects or NLTK lemmatizer involved.
+Features follow the browser feature builder, which export_onnx verifies
+against sklearn's TfidfVectorizer.transform.
+
+Counts are accumulated per document as vocab index -> count; the l2 norm
+runs over all of them and only the model's input columns are densified.
+Pruned exports carry a `feature_index` (input column -> vocab index).
+
+Copy both files into artifacts/ (or point ONNX_MODEL_PATH / ONNX_META_PATH
+at them) and set INFERENCE_ENGINE=onnx. ONNX_META_PATH may also name the
+binary bundle (model_meta.bin, see meta_bundle.py).
+"""
+
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.exception import CustomException
+from src.logger import logging
+from src.pipeline.meta_bundle import read_meta
+
+# same cleanup as TextPreprocessor, kept local so serving needs no NLTK
+NON_TOKEN_RE = re.compile(r"[^a-zA-Z0-9\s-]")
+# sklearn TfidfVectorizer's default token_pattern
+TOKEN_RE = re.compile(r"(?u)\b\w\w+\b")
+
+
+@dataclass
+class OnnxPipelineConfig:
+    model_path: str = os.getenv("ONNX_MODEL_PATH", os.path.join("artifacts", "model.onnx"))
+    meta_path: str = os.getenv("ONNX_META_PATH", os.path.join("artifacts", "model_meta.json"))
+    # onnxruntime intra-op threads per session; 1 suits many request threads
+    intra_op_threads: int = int(os.getenv("ONNX_THREADS", "1"))
+    batch_size: int = int(os.getenv("PREDICT_BATCH_SIZE", "256"))
+
+
+class OnnxFeatureBuilder:
+    """TF-IDF features from model_meta.json, matching the browser builder."""
+
+    def __init__(self, meta):
+        self.vocab = {w: i for i, w in enumerate(meta["vocab"])}
+        self.idf = np.asarray(meta["idf"], dtype=np.float32)
+        self.norm = meta.get("norm", "l2")
+        self.lemma = meta["lemma"]
+        self.stopwords = set(meta["stopwords"])
+        self.n_features = int(meta["n_features"])
+        # vocab index -> model input column (identity for full-vocab models)
+        feature_index = meta.get("feature_index")
+        self.column = {f: i for i, f in enumerate(feature_index)} if feature_index else None
+
+    def clean(self, text):
+        """lowercase -> strip -> drop stopwords -> table lemmatize."""
+        if not isinstance(text, str):
+            return ""
+        lemma, stop = self.lemma, self.stopwords
+        words = NON_TOKEN_RE.sub("", text.lower()).split()
+        return " ".join([lemma.get(w, w) for w in words if w not in stop])
+
+    def transform(self, texts):
+        X = np.zeros((len(texts), self.n_features), dtype=np.float32)
+        vocab, column = self.vocab, self.column
+        for row, text in enumerate(texts):
+            counts = {}
+            for tok in TOKEN_RE.findall(self.clean(text)):
+                idx = vocab.get(tok)
+                if idx is not None:
+                    counts[idx] = counts.get(idx, 0) + 1
+            if not counts:
+                continue
+            idx = np.fromiter(counts, dtype=np.int64, count=len(counts))
+            weights = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+            weights *= self.idf[idx]
+            if self.norm == "l2":
+                weights /= np.sqrt((weights**2).sum())
+            if column is None:
+                X[row, idx] = weights
+            else:
+                for i, w in zip(idx.tolist(), weights):
+                    col = column.get(i)
+                    if col is not None:
+                        X[row, col] = w
+        return X
+
+
+class OnnxPredictPipeline:
+    """Same interface as PredictPipeline (predict, predict_batch,
+    model_version, stats), backed by onnxruntime on CPU."""
+
+    def __init__(self, config: OnnxPipelineConfig = None):
+        self.config = config or OnnxPipelineConfig()
+        self._lock = threading.Lock()
+        self._loaded = None
+        self._pid = None
+        self._stats = {"loads": 0, "load_seconds": 0.0}
+
+    def _load(self):
+        # onnxruntime sessions are not fork-safe: a session created before a
+        # fork (gunicorn preload_app) is replaced in each worker
+        if self._loaded is not None and self._pid == os.getpid():
+            return self._loaded
+        with self._lock:
+            if self._loaded is not None and self._pid == os.getpid():
+                return self._loaded
+            try:
+                import onnxruntime as rt
+
+                start = time.perf_counter()
+                builder = OnnxFeatureBuilder(read_meta(self.config.meta_path))
+
+                options = rt.SessionOptions()
+                options.intra_op_num_threads = self.config.intra_op_threads
+                options.inter_op_num_threads = 1
+                session = rt.InferenceSession(
+                    self.config.model_path, options, providers=["CPUExecutionProvider"]
+                )
+
+                digest = hashlib.sha256()
+                for path in (self.config.model_path, self.config.meta_path):
+                    with open(path, "rb") as f:
+                        digest.update(hashlib.sha256(f.read()).digest())
+
+                elapsed = time.perf_counter() - start
+                self._stats = {"loads": 1, "load_seconds": round(elapsed, 4)}
+                logging.info(f"onnx engine loaded in {elapsed:.3f}s")
+                self._loaded = (builder, session, "onnx-" + digest.hexdigest()[:12])
+                self._pid = os.getpid()
+                return self._loaded
+
+            except Exception as e:
+                raise CustomException(e, sys)
+
+    @property
+    def model_version(self):
+        return self._load()[2]
+
+    def stats(self):
+        _, session, version = self._load()
+        return dict(
+            self._stats,
+            engine="onnx",
+            version=version,
+            threads=self.config.intra_op_threads,
+            loaded=True,
+        )
+
+    def _run(self, features, session=None):
+        session = session or self._load()[1]
+        outputs = session.run(None, {session.get_inputs()[0].name: features})
+        labels = np.asarray(outputs[0]).ravel()
+        proba = np.asarray(outputs[1]) if len(outputs) > 1 else None
+        return labels, proba
+
+    def predict(self, features):
+        try:
+            builder, _, _ = self._load()
+            if isinstance(features, str):
+                texts = [features]
+            elif hasattr(features, "columns"):
+                texts = features["text"].tolist()
+            else:
+                texts = list(features)
+            labels, _ = self._run(builder.transform(texts))
+            return labels
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def predict_batch(self, texts, batch_size=None, n_jobs=None, with_version=False):
+        """Same output as PredictPipeline.predict_batch; `n_jobs` is accepted
+        for interface parity (feature building is plain dict lookups)."""
+        try:
+            builder, session, version = self._load()
+            batch_size = max(1, int(batch_size or self.config.batch_size))
+            texts = list(texts)
+            results = []
+
+            for start in range(0, len(texts), batch_size):
+                labels, proba = self._run(builder.transform(texts[start : start + batch_size]), session)
+                for i, label in enumerate(labels):
+                    label = label.item() if hasattr(label, "item") else label
+                    row = proba[i] if proba is not None else None
+                    results.append(
+                        {
+                            "label": label,
+                            "probability": float(row[int(label)]) if row is not None else 1.0,
+                            "probabilities": [float(p) for p in row] if row is not None else [],
+                        }
+                    )
+
+            return (results, version) if with_version else results
+
+        except Exception as e:
+            raise CustomException(e, sys)
@@ -1,33 +1,124 @@
 import sys
 import os
-import pandas as pd
+from dataclasses import dataclass
 from src.exception import CustomException
-from src.utils import load_object
+from src.pipeline.model_registry import get_registry
+
+# pandas and src.utils (nltk, sklearn) are imported on first use, not at
+# import time, so the API process starts without them (see main.py)
+
+
+@dataclass
+class PredictPipelineConfig:
+    # rows per transform/predict_proba call; bounds peak memory of a batch
+    batch_size: int = int(os.getenv("PREDICT_BATCH_SIZE", "256"))
+    # worker processes for preprocessing bulk batches (1 = serial)
+    n_jobs: int = int(os.getenv("PREDICT_N_JOBS", "1"))
 
 
 class PredictPipeline:
-    def __init__(self):
-        pass
+    """Thin, thread-safe wrapper over the shared model registry.
+
+    The pipeline holds no per-request state, so one instance can be created
+    at import time and shared by every request thread.
+    """
+
+    def __init__(self, registry=None):
+        self.registry = registry or get_registry()
+
+    @property
+    def model_version(self):
+        return self.registry.get().version
+
+    def stats(self):
+        self.registry.get()
+        return dict(self.registry.stats(), engine="pickle")
 
-    def predict(self,features:str):
+    def predict(self,features):
         try:
-            model_path=os.path.join("artifacts","model.pkl")
-            preprocessor_path=os.path.join('artifacts','preprocess.pkl')
-            model=load_object(file_path=model_path)
-            preprocessor=load_object(file_path=preprocessor_path)
-            data_scaled=preprocessor.transform(features)
-            preds=model.predict(data_scaled)
+            loaded=self.registry.get()
+            if isinstance(features,str):
+                features=CustomData(features).get_data_as_data_frame()
+            data_scaled=loaded.preprocessor.transform(features)
+            preds=loaded.model.predict(data_scaled)
             return preds
         
         except Exception as e:
             raise CustomException(e,sys)
 
+    @staticmethod
+    def _parallel_features(preprocessor, texts, n_jobs):
+        """Clean every text across `n_jobs` processes up front, then return a
+        function vectorising a slice of the cleaned rows, matching what
+        `preprocessor.transform` would produce for the same rows."""
+        import pandas as pd
+
+        text_pipeline = preprocessor.named_transformers_["text_pipeline"]
+        cleaned = text_pipeline.named_steps["text_preprocessing"].transform_series(
+            pd.Series(texts, dtype=object), n_jobs=n_jobs
+        )
+        vectorizer = text_pipeline[1:]
+
+        def features(start, stop):
+            X = vectorizer.transform(cleaned.iloc[start:stop])
+            return X if preprocessor.sparse_output_ else X.toarray()
+
+        return features
+
+    def predict_batch(self, texts, batch_size=None, n_jobs=None, with_version=False):
+        """Score many texts with one sparse transform and one predict_proba
+        per chunk of `batch_size` rows. With `n_jobs` > 1, preprocessing of
+        the whole batch is first spread over worker processes.
+
+        Returns one {"label", "probability", "probabilities"} dict per input,
+        in input order; with `with_version`, (results, version) where the
+        version is that of the registry snapshot that scored them.
+        """
+        import pandas as pd
+
+        from src.utils import PARALLEL_MIN_ROWS, effective_n_jobs
+
+        try:
+            loaded = self.registry.get()
+            batch_size = max(1, int(batch_size or PredictPipelineConfig.batch_size))
+            n_jobs = effective_n_jobs(n_jobs or PredictPipelineConfig.n_jobs)
+            classes = [c.item() if hasattr(c, "item") else c for c in loaded.model.classes_]
+            texts = list(texts)
+            results = []
+
+            if n_jobs > 1 and len(texts) >= PARALLEL_MIN_ROWS:
+                features_for = self._parallel_features(loaded.preprocessor, texts, n_jobs)
+            else:
+                features_for = lambda start, stop: loaded.preprocessor.transform(
+                    pd.DataFrame({"text": texts[start:stop]})
+                )
+
+            for start in range(0, len(texts), batch_size):
+                features = features_for(start, start + batch_size)
+                proba = loaded.model.predict_proba(features)
+                best = proba.argmax(axis=1)
+                for row, i in zip(proba, best):
+                    results.append(
+                        {
+                            "label": classes[i],
+                            "probability": float(row[i]),
+                            "probabilities": [float(p) for p in row],
+                        }
+                    )
+
+            return (results, loaded.version) if with_version else results
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
 class CustomData:
     def __init__(  self, text:str):
 
         self.text = text
 
     def get_data_as_data_frame(self):
+        import pandas as pd
+
         try:
             custom_data_input_dict = {
                 "text": [self.text]
@@ -36,4 +127,14 @@ class CustomData:
             return pd.DataFrame(custom_data_input_dict)
 
         except Exception as e:
-            raise CustomException(e, sys)
\ No newline at end of file
+            raise CustomException(e, sys)
+
+
+def load_predict_pipeline(engine=None):
+    """PredictPipeline, or the ONNX engine when INFERENCE_ENGINE=onnx."""
+    engine = engine or os.getenv("INFERENCE_ENGINE", "pickle")
+    if engine == "onnx":
+        from src.pipeline.onnx_pipeline import OnnxPredictPipeline
+
+        return OnnxPredictPipeline()
+    return PredictPipeline()
@@ -0,0 +1,254 @@
+"""
+In-process BM25 search over article titles and text.
+
+Tokens go through the same TextPreprocessor (lowercase, cleanup, stopwords,
+WordNet lemmas) and token pattern as the classifier's TF-IDF features, so
+"elections" finds "election". Postings are stored as two flat arrays per
+term (doc ids as uint32, term frequencies as uint16) rather than Python
+lists of tuples, which keeps a few hundred thousand documents in tens of
+MB. Documents can be added and removed incrementally; removals are
+tombstoned and compacted away once they make up a third of the index.
+"""
+
+import os
+import re
+import sys
+import threading
+from array import array
+from dataclasses import dataclass
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; saving there is unguarded
+    fcntl = None
+
+from src.exception import CustomException
+from src.logger import logging
+from src.utils import TextPreprocessor, load_object, save_object
+
+# sklearn TfidfVectorizer's default token_pattern
+TOKEN_RE = re.compile(r"(?u)\b\w\w+\b")
+
+
+@dataclass
+class SearchIndexConfig:
+    index_path: str = os.path.join("artifacts", "search_index.pkl")
+    k1: float = 1.5
+    b: float = 0.75
+    # title tokens are counted this many times, a simple field boost
+    title_weight: int = 2
+    # compact postings once this fraction of documents is deleted
+    compact_ratio: float = 0.33
+
+
+class BM25Index:
+    def __init__(self, config: SearchIndexConfig = None, preprocessor=None):
+        self.config = config or SearchIndexConfig()
+        self.preprocessor = preprocessor or TextPreprocessor()
+        self.terms = {}  # term -> term id
+        self.doc_ids = []  # term id -> array('I') of doc numbers
+        self.tfs = []  # term id -> array('H') of term frequencies
+        self.keys = []  # doc number -> external key (Mongo _id)
+        self.key_to_doc = {}
+        self.doc_len = array("I")
+        self.deleted = set()
+        self.total_len = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.keys) - len(self.deleted)
+
+    def _tokens(self, texts):
+        return [
+            TOKEN_RE.findall(clean) if isinstance(clean, str) else []
+            for clean in self.preprocessor.preprocess_batch(texts)
+        ]
+
+    def add_many(self, docs):
+        """Index (key, title, text) triples; re-adding a key replaces it."""
+        docs = list(docs)
+        titles = self._tokens([title or "" for _, title, _ in docs])
+        bodies = self._tokens([text or "" for _, _, text in docs])
+
+        with self._lock:
+            for (key, _, _), title_tokens, body_tokens in zip(docs, titles, bodies):
+                if key in self.key_to_doc:
+                    self.remove(key)
+                doc = len(self.keys)
+                self.keys.append(key)
+                self.key_to_doc[key] = doc
+
+                counts = {}
+                for tok in body_tokens:
+                    counts[tok] = counts.get(tok, 0) + 1
+                for tok in title_tokens:
+                    counts[tok] = counts.get(tok, 0) + self.config.title_weight
+                length = sum(counts.values())
+                self.doc_len.append(length)
+                self.total_len += length
+
+                for tok, tf in counts.items():
+                    term = self.terms.get(tok)
+                    if term is None:
+                        term = self.terms[tok] = len(self.doc_ids)
+                        self.doc_ids.append(array("I"))
+                        self.tfs.append(array("H"))
+                    self.doc_ids[term].append(doc)
+                    self.tfs[term].append(min(tf, 0xFFFF))
+
+    def remove(self, key):
+        with self._lock:
+            doc = self.key_to_doc.pop(key, None)
+            if doc is None:
+                return
+            self.deleted.add(doc)
+            self.total_len -= self.doc_len[doc]
+            if len(self.deleted) > self.config.compact_ratio * len(self.keys):
+                self.compact()
+
+    def compact(self):
+        """Drop tombstoned documents and renumber the rest."""
+        with self._lock:
+            keep = np.ones(len(self.keys), dtype=bool)
+            keep[list(self.deleted)] = False
+            remap = np.cumsum(keep, dtype=np.int64) - 1
+
+            for term in range(len(self.doc_ids)):
+                docs = np.frombuffer(self.doc_ids[term], dtype=np.uint32)
+                tfs = np.frombuffer(self.tfs[term], dtype=np.uint16)
+                alive = keep[docs]
+                self.doc_ids[term] = array("I", remap[docs[alive]].astype(np.uint32).tobytes())
+                self.tfs[term] = array("H", tfs[alive].tobytes())
+
+            self.keys = [k for k, alive in zip(self.keys, keep) if alive]
+            self.key_to_doc = {k: i for i, k in enumerate(self.keys)}
+            self.doc_len = array("I", np.frombuffer(self.doc_len, dtype=np.uint32)[keep].tobytes())
+            self.deleted = set()
+
+    def search(self, query, limit=50, skip=0):
+        """Top (key, score) pairs for `query`, best first."""
+        with self._lock:
+            n_docs = len(self)
+            if not n_docs:
+                return []
+            k1, b = self.config.k1, self.config.b
+            avg_len = self.total_len / n_docs
+            doc_len = np.frombuffer(self.doc_len, dtype=np.uint32).astype(np.float32)
+            norm = k1 * (1 - b + b * doc_len / avg_len)
+            scores = np.zeros(len(self.keys), dtype=np.float32)
+
+            for tok in set(self._tokens([query])[0]):
+                term = self.terms.get(tok)
+                if term is None:
+                    continue
+                docs = np.frombuffer(self.doc_ids[term], dtype=np.uint32)
+                tfs = np.frombuffer(self.tfs[term], dtype=np.uint16).astype(np.float32)
+                df = len(docs)  # tombstones inflate df slightly until compaction
+                idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                scores[docs] += idf * tfs * (k1 + 1) / (tfs + norm[docs])
+
+            if self.deleted:
+                scores[list(self.deleted)] = 0
+            n = min(skip + limit, int(np.count_nonzero(scores)))
+            if n <= 0:
+                return []
+            top = np.argpartition(-scores, n - 1)[:n]
+            top = top[np.argsort(-scores[top], kind="stable")][skip:]
+            return [(self.keys[i], float(scores[i])) for i in top]
+
+    def save(self, path=None):
+        with self._lock:
+            state = {
+                "terms": self.terms,
+                "doc_ids": self.doc_ids,
+                "tfs": self.tfs,
+                "keys": self.keys,
+                "doc_len": self.doc_len,
+                "deleted": self.deleted,
+                "total_len": self.total_len,
+            }
+            save_object(path or self.config.index_path, state)
+
+    @classmethod
+    def load(cls, config: SearchIndexConfig = None, preprocessor=None):
+        index = cls(config, preprocessor)
+        state = load_object(index.config.index_path)
+        index.__dict__.update(state)
+        index.key_to_doc = {
+            k: i for i, k in enumerate(index.keys) if i not in index.deleted
+        }
+        return index
+
+
+class BM25SearchBackend:
+    """Keeps a BM25Index in step with the articles collection.
+
+    `refresh` is cheap when nothing changed (one version-stamp comparison);
+    otherwise it diffs the stored `_id`s against the index, indexes only the
+    new articles and drops deleted ones.
+
+    Every gunicorn worker keeps its own copy in memory, but only one process
+    writes it to disk: the one holding an exclusive lock on
+    `<index_path>.lock` (taken without blocking, and kept until the process
+    exits). The other workers only load the saved index at start-up.
+    """
+
+    def __init__(self, config: SearchIndexConfig = None):
+        self.config = config or SearchIndexConfig()
+        self.version = None
+        self._lock = threading.Lock()
+        self._writer_lock = None
+        try:
+            self.index = BM25Index.load(self.config)
+            logging.info(f"loaded search index with {len(self.index)} documents")
+        except Exception:
+            self.index = BM25Index(self.config)
+
+    def _is_writer(self):
+        if fcntl is None or self._writer_lock is not None:
+            return True
+        lock_file = open(f"{self.config.index_path}.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._writer_lock = lock_file
+        return True
+
+    def _persist(self):
+        """Save the index, if this process is the one that writes it."""
+        if self._is_writer():
+            self.index.save()
+
+    def refresh(self, collection, version=None):
+        if version is not None and version == self.version:
+            return
+        with self._lock:
+            if version is not None and version == self.version:
+                return
+            try:
+                stored = {doc["_id"] for doc in collection.find({}, {"_id": 1})}
+                indexed = set(self.index.key_to_doc)
+                for key in indexed - stored:
+                    self.index.remove(key)
+                new = list(stored - indexed)
+                if new:
+                    docs = collection.find({"_id": {"$in": new}}, {"title": 1, "text": 1})
+                    self.index.add_many(
+                        (d["_id"], d.get("title"), d.get("text")) for d in docs
+                    )
+                if new or indexed - stored:
+                    self._persist()
+                    logging.info(
+                        f"search index: +{len(new)} -{len(indexed - stored)} documents"
+                    )
+                self.version = version
+
+            except Exception as e:
+                raise CustomException(e, sys)
+
+    def search(self, query, limit=50, skip=0):
+        return self.index.search(query, limit=limit, skip=skip)
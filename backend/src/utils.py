@@ -1,44 +1,283 @@
 import os
 import sys
+import json
+import lzma
+import struct
+import tempfile
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
 from src.exception import CustomException
+from src.logger import logging
 import pickle
 import re 
 import nltk
+import pandas as pd
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
 from sklearn.base import BaseEstimator, TransformerMixin
 stop_words = set(stopwords.words('english'))
 
+# characters dropped before tokenising; compiled once instead of per call
+NON_TOKEN_RE = re.compile(r'[^a-zA-Z0-9\s-]')
+
+# bump whenever preprocess_text's output changes; part of the feature cache key
+PREPROCESS_VERSION = 1
+
+# max distinct words kept in the word -> lemma LRU cache per preprocessor
+LEMMA_CACHE_SIZE = 1 << 17
+
+# below this many rows a process pool costs more than it saves
+PARALLEL_MIN_ROWS = 2000
+
+
+def _rss_mb():
+    """(current, peak) resident memory in MB; current is Linux-only."""
+    current = peak = float("nan")
+    try:
+        import resource
+
+        # ru_maxrss is KB on Linux, bytes on macOS
+        scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (ImportError, OSError, ValueError):
+        pass
+    return current, peak
+
+
+@contextmanager
+def log_stage(name):
+    """Log a stage's wall time and memory (rss before/after, process peak)."""
+    before, _ = _rss_mb()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        after, peak = _rss_mb()
+        logging.info(
+            f"stage {name}: {elapsed:.2f}s, rss {before:.0f} -> {after:.0f} MB, peak {peak:.0f} MB"
+        )
+
+
+def effective_n_jobs(n_jobs):
+    """Resolve sklearn-style n_jobs (None -> 1, -1 -> all cores)."""
+    if n_jobs is None or n_jobs == 0:
+        return 1
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return n_jobs
+
+
+_worker_preprocessor = None
+
+
+def _init_preprocess_worker(lemma_cache_size, lemma_table):
+    """Pool initializer: load WordNet and build one preprocessor per worker."""
+    global _worker_preprocessor
+    from nltk.corpus import wordnet
+
+    wordnet.ensure_loaded()
+    _worker_preprocessor = TextPreprocessor(lemma_cache_size=lemma_cache_size)
+    if lemma_table:
+        _worker_preprocessor.load_lemma_table(lemma_table)
+
+
+def _preprocess_shard(texts):
+    return _worker_preprocessor.preprocess_batch(texts)
+
 
 class TextPreprocessor(BaseEstimator, TransformerMixin):
-    def __init__(self):
+    """lowercase -> strip non [a-zA-Z0-9\\s-] -> drop stopwords -> lemmatize.
+
+    Lemmas are memoised in a bounded LRU cache, and can be seeded from a
+    precomputed word -> lemma table (see `load_lemma_table`). Neither the
+    cache nor the table is pickled, so saved preprocessors stay small and
+    pickles written before they existed still load.
+
+    `n_jobs` > 1 (or -1 for all cores) shards large Series across worker
+    processes; the output is identical to the serial path.
+    """
+
+    def __init__(self, lemma_cache_size=LEMMA_CACHE_SIZE, n_jobs=None):
         self.lemmatizer = WordNetLemmatizer()
+        self.lemma_cache_size = lemma_cache_size
+        self.n_jobs = n_jobs
+
+    def __getstate__(self):
+        state = dict(super().__getstate__())
+        state.pop("_lemmatize", None)
+        state.pop("_lemma_table", None)
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault("lemma_cache_size", LEMMA_CACHE_SIZE)
+        state.setdefault("n_jobs", None)
+        super().__setstate__(state)
 
+    def load_lemma_table(self, table):
+        """Preload word -> lemma pairs, e.g. from `export_onnx.build_lemma_table`.
+
+        `table` is a dict or a path to model_meta.json / model_meta.bin.
+        """
+        if isinstance(table, str):
+            from src.pipeline.meta_bundle import read_meta
+
+            table = read_meta(table)["lemma"]
+        self._lemma_table = dict(table)
+        self.__dict__.pop("_lemmatize", None)
+        return self
+
+    def _get_lemmatize(self):
+        lemmatize = self.__dict__.get("_lemmatize")
+        if lemmatize is None:
+            cached = lru_cache(maxsize=self.lemma_cache_size)(self.lemmatizer.lemmatize)
+            table = self.__dict__.get("_lemma_table")
+            if table:
+                def lemmatize(word, _get=table.get, _cached=cached):
+                    lemma = _get(word)
+                    return lemma if lemma is not None else _cached(word)
+            else:
+                lemmatize = cached
+            self._lemmatize = lemmatize
+        return lemmatize
 
     def preprocess_text(self, text):
         if isinstance(text, str):
-            text = text.lower()
-            text = re.sub(r'[^a-zA-Z0-9\s-]', '', text)
+            lemmatize = self._get_lemmatize()
+            text = NON_TOKEN_RE.sub('', text.lower())
             text = " ".join(
-                [self.lemmatizer.lemmatize(word) for word in text.split() if word not in stop_words]
+                [lemmatize(word) for word in text.split() if word not in stop_words]
             )
         return text
 
+    def preprocess_batch(self, texts):
+        """Preprocess an iterable of texts, returning a list in the same order."""
+        lemmatize = self._get_lemmatize()
+        sub = NON_TOKEN_RE.sub
+        return [
+            " ".join([lemmatize(w) for w in sub('', t.lower()).split() if w not in stop_words])
+            if isinstance(t, str)
+            else t
+            for t in texts
+        ]
+
+    def _preprocess_parallel(self, texts, n_jobs):
+        # a few shards per worker evens out uneven document lengths
+        n_shards = min(len(texts), n_jobs * 4)
+        bounds = [len(texts) * i // n_shards for i in range(n_shards + 1)]
+        shards = [texts[bounds[i] : bounds[i + 1]] for i in range(n_shards)]
+
+        with ProcessPoolExecutor(
+            max_workers=n_jobs,
+            initializer=_init_preprocess_worker,
+            initargs=(self.lemma_cache_size, self.__dict__.get("_lemma_table")),
+        ) as pool:
+            # map() yields in submission order, so rows come back in place
+            return [row for shard in pool.map(_preprocess_shard, shards) for row in shard]
+
+    def transform_series(self, X, n_jobs=None):
+        """Preprocess a Series, optionally across `n_jobs` processes."""
+        texts = X.tolist()
+        n_jobs = effective_n_jobs(n_jobs)
+        if n_jobs > 1 and len(texts) >= PARALLEL_MIN_ROWS:
+            values = self._preprocess_parallel(texts, n_jobs)
+        else:
+            values = self.preprocess_batch(texts)
+        return pd.Series(values, index=X.index, name=X.name, dtype=object)
+
     def fit(self, X, y=None):
         return self
 
     def transform(self, X, y=None):
-        return X.apply(self.preprocess_text)
+        if not isinstance(X, pd.Series):
+            return X.apply(self.preprocess_text)
+        return self.transform_series(X, n_jobs=self.n_jobs)
     
 
-def save_object(file_path, obj):
+def read_table(file_path, columns=None):
+    """Load `columns` (all if None) from a .parquet or .csv table."""
+    try:
+        if file_path.endswith(".parquet"):
+            return pd.read_parquet(file_path, columns=columns)
+        return pd.read_csv(file_path, usecols=columns)
+
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def iter_table(file_path, columns=None, chunksize=50000):
+    """Yield a .parquet or .csv table as DataFrames of at most `chunksize` rows."""
+    if file_path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(file_path, usecols=columns, chunksize=chunksize)
+
+
+# header of compressed artifacts written by save_object(..., compress=...);
+# anything else is read as a plain pickle
+PICKLE_MAGIC = b"NBPKL5\0\0"
+PICKLE_CODECS = {"zlib": zlib, "lzma": lzma}
+
+
+def _dump_compressed(file_obj, obj, compress):
+    """Pickle protocol 5 with large buffers (numpy arrays) kept out of band
+    and each chunk compressed separately."""
+    codec = PICKLE_CODECS[compress]
+    buffers = []
+    main = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    chunks = [codec.compress(main)] + [codec.compress(b.raw()) for b in buffers]
+    header = json.dumps({"codec": compress, "sizes": [len(c) for c in chunks]}).encode()
+    file_obj.write(PICKLE_MAGIC + struct.pack("<I", len(header)) + header)
+    for chunk in chunks:
+        file_obj.write(chunk)
+
+
+def _load_compressed(file_obj):
+    (size,) = struct.unpack("<I", file_obj.read(4))
+    header = json.loads(file_obj.read(size))
+    codec = PICKLE_CODECS[header["codec"]]
+    main, *buffers = [codec.decompress(file_obj.read(n)) for n in header["sizes"]]
+    # bytearrays keep the unpickled arrays writable, without another copy
+    return pickle.loads(main, buffers=[bytearray(b) for b in buffers])
+
+
+def save_object(file_path, obj, compress=None):
+    """Pickle `obj` to `file_path` atomically.
+
+    `compress` ("zlib" or "lzma") writes the compressed protocol-5 format
+    that load_object recognises by its header; the default stays a plain
+    pickle.
+    """
     try:
         dir_path = os.path.dirname(file_path)
 
-        os.makedirs(dir_path, exist_ok=True)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
 
-        with open(file_path, "wb") as file_obj:
-            pickle.dump(obj, file_obj)
+        # write a private temp file then rename, so a reader never unpickles
+        # a half-written file and concurrent writers never share a temp file
+        fd, tmp_path = tempfile.mkstemp(
+            dir=dir_path or ".", prefix=f".{os.path.basename(file_path)}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as file_obj:
+                if compress:
+                    _dump_compressed(file_obj, obj, compress)
+                else:
+                    pickle.dump(obj, file_obj)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
 
     except Exception as e:
         raise CustomException(e, sys)
@@ -47,7 +286,10 @@ def save_object(file_path, obj):
 def load_object(file_path):
     try:
         with open(file_path, "rb") as file_obj:
+            if file_obj.read(len(PICKLE_MAGIC)) == PICKLE_MAGIC:
+                return _load_compressed(file_obj)
+            file_obj.seek(0)
             return pickle.load(file_obj)
 
     except Exception as e:
-        raise CustomException(e, sys)
\ No newline at end of file
+        raise CustomException(e, sys)
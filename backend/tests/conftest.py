@@ -0,0 +1,63 @@
+"""
+Shared fixtures for the backend test suite.
+
+    cd backend && python -m pytest
+
+Suites that need optional packages, NLTK data or exported models skip
+themselves when those are missing.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FRONTEND_MODELS = os.path.join(BACKEND, "..", "frontend", "public", "models")
+# the app modules and the bench scripts' reference implementations
+for path in (BACKEND, os.path.join(BACKEND, "scripts")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# extra rows for the parity suites, e.g. artifacts/train.parquet after ingestion
+PARITY_DATA = os.getenv("PARITY_DATA", os.path.join(BACKEND, "artifacts", "train.parquet"))
+PARITY_ROWS = int(os.getenv("PARITY_ROWS", "2000"))
+
+EDGE_CASES = [
+    "",
+    "   ",
+    "The THE the of",
+    "state-of-the-art well-known e-mail -- - ---",
+    "Don't stop, it's 100% true!!! (really?)",
+    "café naïve résumé Zürich",
+    "constructor toString valueOf __proto__ hasOwnProperty",
+    "running ran runs better geese mice children",
+    "tabs\tand\nnewlines\r\nand  double  spaces",
+    None,
+    42,
+]
+
+
+@pytest.fixture(scope="session")
+def nltk_data():
+    """Skip unless every NLTK resource the preprocessor needs is installed."""
+    pytest.importorskip("nltk")
+    from download_resources import missing_resources
+
+    missing = missing_resources()
+    if missing:
+        pytest.skip(f"NLTK data missing ({', '.join(missing)}); run download_resources.py")
+
+
+@pytest.fixture(scope="session")
+def parity_texts():
+    """Golden articles, edge cases and, if present, the first PARITY_ROWS of PARITY_DATA."""
+    with open(os.path.join(FRONTEND_MODELS, "golden.json"), "r", encoding="utf-8") as f:
+        texts = [row["text"] for row in json.load(f)]
+    texts += EDGE_CASES
+    if os.path.exists(PARITY_DATA):
+        from src.utils import read_table
+
+        texts += read_table(PARITY_DATA, columns=["text"])["text"].head(PARITY_ROWS).tolist()
+    return texts
@@ -0,0 +1,75 @@
+"""Keyset pagination of /cache over dated, string-dated and undated articles."""
+
+import base64
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("flask")
+mongomock = pytest.importorskip("mongomock")
+
+# import main without loading the model or touching a real Mongo
+os.environ.setdefault("PRELOAD_MODEL", "0")
+os.environ.setdefault("ENSURE_INDEXES_ON_START", "0")
+os.environ.setdefault("NLTK_DATA_VERIFIED", "1")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    import main
+
+    db = mongomock.MongoClient().NewsBiasApp
+    collection = db.NewsArtciles
+    monkeypatch.setattr(main, "get_collection", lambda: collection)
+    monkeypatch.setattr(main, "get_db", lambda: db)
+    main.response_cache.clear()
+
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    docs = [{"title": f"dated {i}", "published_date": start + timedelta(days=i % 3)} for i in range(6)]
+    docs += [
+        {"title": "string 1", "published_date": "2023-06-01T00:00:00"},
+        {"title": "string 2", "published_date": "2023-06-01T00:00:00"},
+        {"title": "undated", "published_date": None},
+    ]
+    collection.insert_many(docs)
+    main.app.testing = True
+    return main.app.test_client(), collection
+
+
+def _pages(http, limit):
+    titles, cursor = [], None
+    while True:
+        query = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        body = http.get("/cache", query_string=query).get_json()
+        titles += [doc["title"] for doc in body["articles"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            return titles
+
+
+def test_pages_cover_every_article_in_sort_order(client):
+    http, collection = client
+    expected = [
+        doc["title"]
+        for doc in collection.find().sort([("published_date", -1), ("_id", -1)])
+    ]
+    assert _pages(http, 3) == expected
+    assert len(expected) == 9
+    assert expected[6:] == ["string 2", "string 1", "undated"]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        base64.urlsafe_b64encode(b"not json").decode(),
+        base64.urlsafe_b64encode(b'{"d": null, "i": {"$oid": "nope"}}').decode(),
+        base64.urlsafe_b64encode(b'{"d": 5, "i": {"$oid": "65a000000000000000000000"}}').decode(),
+        base64.urlsafe_b64encode(b"[1, 2]").decode(),
+    ],
+)
+def test_malformed_cursor_is_a_400(client, cursor):
+    http, _ = client
+    response = http.get("/cache", query_string={"limit": 3, "cursor": cursor})
+    assert response.status_code == 400
@@ -0,0 +1,65 @@
+"""Which CSV rows incremental training reads, first run included."""
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("xgboost")
+pytest.importorskip("pyarrow")
+
+# src.utils loads the NLTK stopwords on import
+pytestmark = pytest.mark.usefixtures("nltk_data")
+
+
+def _trainer(tmp_path, **overrides):
+    from src.components.incremental_trainer import IncrementalTrainer, IncrementalTrainerConfig
+
+    source = tmp_path / "data.csv"
+    config = IncrementalTrainerConfig(
+        csv_path=str(source),
+        ingestion_source_path=str(source),
+        raw_data_path=str(tmp_path / "raw.parquet"),
+        state_path=str(tmp_path / "incremental_state.json"),
+        chunk_size=3,
+    )
+    for field, value in overrides.items():
+        setattr(config, field, value)
+    return IncrementalTrainer(config)
+
+
+def _write_source(path, rows):
+    pd.DataFrame(
+        {"text": [f"row {i}" for i in range(rows)], "target": [i % 2 for i in range(rows)]}
+    ).to_csv(path, index=False)
+
+
+def _read(trainer, state):
+    return [text for chunk in trainer.iter_csv_chunks(state) for text in chunk["text"]]
+
+
+def test_first_run_starts_after_the_ingested_rows(tmp_path):
+    trainer = _trainer(tmp_path)
+    _write_source(trainer.config.csv_path, 8)
+    pd.read_csv(trainer.config.csv_path).to_parquet(trainer.config.raw_data_path, index=False)
+    _write_source(trainer.config.csv_path, 11)
+
+    state = {}
+    assert _read(trainer, state) == ["row 8", "row 9", "row 10"]
+    assert list(state["csv_rows"].values()) == [11]
+    assert _read(trainer, state) == []
+
+
+def test_recorded_offset_wins_over_ingestion(tmp_path):
+    trainer = _trainer(tmp_path)
+    _write_source(trainer.config.csv_path, 6)
+    pd.read_csv(trainer.config.csv_path).to_parquet(trainer.config.raw_data_path, index=False)
+
+    state = {"csv_rows": {str(tmp_path / "data.csv"): 4}}
+    assert _read(trainer, state) == ["row 4", "row 5"]
+
+
+def test_other_sources_start_at_zero(tmp_path):
+    trainer = _trainer(tmp_path, ingestion_source_path=str(tmp_path / "other.csv"))
+    _write_source(trainer.config.csv_path, 4)
+    pd.read_csv(trainer.config.csv_path).to_parquet(trainer.config.raw_data_path, index=False)
+
+    assert _read(trainer, {}) == ["row 0", "row 1", "row 2", "row 3"]
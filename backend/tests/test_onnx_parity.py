@@ -0,0 +1,83 @@
+"""
+The ONNX engine, which lemmatizes only through model_meta.json's table,
+must build the same features as export_onnx's reference builder and as
+the pickled sklearn pipeline, and its batched and per-request paths must
+agree. scripts/bench_onnx.py
+times the engines.
+"""
+
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("onnxruntime")
+# export_onnx loads the sklearn/xgboost pickles
+pytest.importorskip("sklearn")
+pytest.importorskip("xgboost")
+
+FRONTEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "frontend")
+MODELS = os.path.join(FRONTEND, "public", "models")
+ONNX_PATH = os.path.join(MODELS, "model.onnx")
+META_PATH = os.path.join(MODELS, "model_meta.json")
+
+
+@pytest.fixture(scope="module")
+def export_onnx(nltk_data):
+    for path in (ONNX_PATH, META_PATH, os.path.join(MODELS, "preprocess.pkl")):
+        if not os.path.exists(path):
+            pytest.skip(f"no exported {os.path.basename(path)}")
+    sys.path.insert(0, os.path.join(FRONTEND, "scripts"))
+    import export_onnx
+
+    return export_onnx
+
+
+@pytest.fixture(scope="module")
+def engine(export_onnx):
+    from src.pipeline.onnx_pipeline import OnnxPipelineConfig, OnnxPredictPipeline
+
+    return OnnxPredictPipeline(OnnxPipelineConfig(model_path=ONNX_PATH, meta_path=META_PATH))
+
+
+@pytest.fixture(scope="module")
+def texts(parity_texts):
+    return [t for t in parity_texts if isinstance(t, str)]
+
+
+def test_features_match_export_reference(export_onnx, engine, texts):
+    from src.pipeline.meta_bundle import read_meta
+
+    meta = read_meta(META_PATH)
+    build = export_onnx.js_features_builder(
+        export_onnx.load_vectorizer(), meta["idf"], meta["norm"], meta.get("feature_index")
+    )
+    reference = np.stack([build(t) for t in texts])
+    builder = engine._load()[0]
+    np.testing.assert_allclose(builder.transform(texts), reference, rtol=0, atol=1e-5)
+
+
+def test_features_match_sklearn_pipeline(export_onnx, engine, texts):
+    import pickle
+
+    import pandas as pd
+
+    # the pickled pipeline resolves browser_preprocess via export_onnx's sys.path
+    with open(os.path.join(MODELS, "preprocess.pkl"), "rb") as f:
+        preprocessor = pickle.load(f)
+    expected = preprocessor.transform(pd.DataFrame({"text": texts})).toarray()
+    meta_index = engine._load()[0].column
+    if meta_index is not None:
+        expected = expected[:, sorted(meta_index, key=meta_index.get)]
+    np.testing.assert_allclose(engine._load()[0].transform(texts), expected, rtol=0, atol=1e-5)
+
+
+def test_predict_batch_matches_predict(engine, texts):
+    results, version = engine.predict_batch(texts, batch_size=3, with_version=True)
+    assert version == engine.model_version
+    assert [r["label"] for r in results] == [int(engine.predict(t)[0]) for t in texts]
+    for r in results:
+        if r["probabilities"]:
+            assert sum(r["probabilities"]) == pytest.approx(1.0, abs=1e-5)
+            assert r["probability"] == max(r["probabilities"])
@@ -0,0 +1,62 @@
+"""
+The memoised, batched TextPreprocessor must produce byte-identical output
+to the per-token implementation it replaced (bench_preprocess.reference_transform).
+scripts/bench_preprocess.py times the two.
+"""
+
+import math
+import os
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+META_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "frontend", "public", "models", "model_meta.json"
+)
+
+
+@pytest.fixture(scope="module")
+def corpus(nltk_data, parity_texts):
+    return pd.Series(parity_texts, dtype=object, name="text")
+
+
+@pytest.fixture(scope="module")
+def expected(corpus):
+    from bench_preprocess import reference_transform
+
+    return reference_transform(corpus)
+
+
+def test_transform_matches_reference(corpus, expected):
+    from src.utils import TextPreprocessor
+
+    preprocessor = TextPreprocessor()
+    assert preprocessor.transform(corpus).equals(expected)
+    # second pass is served from the warm lemma cache
+    assert preprocessor.transform(corpus).equals(expected)
+
+
+def test_single_text_matches_reference(corpus, expected):
+    from src.utils import TextPreprocessor
+
+    preprocessor = TextPreprocessor()
+    assert [preprocessor.preprocess_text(t) for t in corpus] == expected.tolist()
+
+
+def test_parallel_matches_reference(corpus, expected):
+    from src.utils import PARALLEL_MIN_ROWS, TextPreprocessor
+
+    repeat = math.ceil(PARALLEL_MIN_ROWS / len(corpus))
+    texts = pd.concat([corpus] * repeat, ignore_index=True)
+    got = TextPreprocessor().transform_series(texts, n_jobs=2)
+    assert got.equals(pd.concat([expected] * repeat, ignore_index=True))
+
+
+def test_lemma_table_matches_reference(corpus, expected):
+    from src.utils import TextPreprocessor
+
+    if not os.path.exists(META_PATH):
+        pytest.skip("no exported model_meta.json")
+    seeded = TextPreprocessor().load_lemma_table(META_PATH)
+    assert seeded.transform(corpus).equals(expected)
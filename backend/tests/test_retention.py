@@ -0,0 +1,63 @@
+"""retention.enforce against a collection holding articles written before published_date was a BSON date."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+
+@pytest.fixture
+def collection():
+    return mongomock.MongoClient().NewsBiasApp.NewsArtciles
+
+
+def _dates(collection):
+    return {doc["title"]: doc.get("published_date") for doc in collection.find()}
+
+
+def test_enforce_converts_string_and_missing_dates(collection):
+    from retention import RetentionConfig, enforce
+
+    collection.insert_many(
+        [
+            {"title": "string", "published_date": "2024-03-01T12:00:00"},
+            {"title": "bad string", "published_date": "yesterday", "publish_date": "2024-02-01"},
+            {"title": "missing", "publish_date": "2024-01-01"},
+            {"title": "dated", "published_date": datetime(2024, 4, 1, tzinfo=timezone.utc)},
+        ]
+    )
+    report = enforce(collection, RetentionConfig(max_docs=0, max_age_days=0))
+
+    assert report["backfilled"] == 3
+    dates = _dates(collection)
+    assert all(isinstance(d, datetime) for d in dates.values())
+    assert dates["string"].replace(tzinfo=None) == datetime(2024, 3, 1, 12)
+    assert dates["missing"].replace(tzinfo=None) == datetime(2024, 1, 1)
+    assert enforce(collection, RetentionConfig(max_docs=0))["backfilled"] == 0
+
+
+def test_window_keeps_the_newest_once_string_dates_are_converted(collection):
+    from retention import RetentionConfig, enforce
+
+    collection.insert_many(
+        [
+            {"title": "old string", "published_date": "2020-01-01T00:00:00"},
+            {"title": "new string", "published_date": "2024-06-01T00:00:00"},
+            {"title": "old date", "published_date": datetime(2021, 1, 1, tzinfo=timezone.utc)},
+        ]
+    )
+    report = enforce(collection, RetentionConfig(max_docs=1, max_age_days=0))
+
+    assert report["removed"] == 2
+    assert list(_dates(collection)) == ["new string"]
+
+
+def test_dry_run_does_not_write(collection):
+    from retention import RetentionConfig, enforce
+
+    collection.insert_one({"title": "string", "published_date": "2024-03-01T12:00:00"})
+    report = enforce(collection, RetentionConfig(max_docs=0), dry_run=True)
+
+    assert report["backfilled"] == 0
+    assert _dates(collection) == {"string": "2024-03-01T12:00:00"}
@@ -0,0 +1,83 @@
+"""Which scraped links the fetch cache remembers between runs."""
+
+import pytest
+
+pytest.importorskip("trafilatura")
+mongomock = pytest.importorskip("mongomock")
+
+import webscapper
+from fetch_cache import FetchCache, FetchCacheConfig
+from fetch_engine import FetchConfig
+
+TEXT = "word " * 60
+
+PAGES = {
+    "https://news.test/good": {"title": "Good", "text": TEXT},
+    "https://news.test/short": {"title": "Short", "text": "too short"},
+    "https://news.test/untitled": {"title": "", "text": TEXT},
+    "https://news.test/broken": None,  # the extractor raises
+    "https://news.test/down": None,  # the download fails
+}
+
+
+def _fetch(url):
+    if url.endswith("/down"):
+        return None
+    return "é" + url  # two bytes for one character
+
+
+def _extract(html):
+    url = html[1:]
+    if url.endswith("/broken"):
+        raise ValueError("unparseable")
+    meta = dict.fromkeys(("author", "date", "tags", "categories", "image"))
+    meta.update(PAGES[url])
+    return meta
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return FetchCache(FetchCacheConfig(path=str(tmp_path / "cache.json")))
+
+
+def test_dropped_pages_are_seen_and_failed_downloads_are_not(monkeypatch, cache):
+    links = [("", url) for url in PAGES]
+    monkeypatch.setattr(webscapper, "_discover_links", lambda site, cache=None: links)
+    monkeypatch.setattr(webscapper, "extract_article", _extract)
+    config = FetchConfig(max_workers=2, per_host=2, host_delay=0, extract_workers=1)
+
+    extracted = list(webscapper._iter_extracted([("news", None, "")], 20, config, _fetch, cache))
+
+    assert [article["link"] for _, _, article in extracted] == ["https://news.test/good"]
+    # the good article is remembered only once written (see write_stream)
+    assert set(cache.seen) == {
+        "https://news.test/short",
+        "https://news.test/untitled",
+        "https://news.test/broken",
+    }
+    fetched = [url for url in PAGES if not url.endswith("/down")]
+    assert cache.stats["pages_fetched"] == len(PAGES)
+    assert cache.stats["bytes_fetched"] == sum(len(url) + 2 for url in fetched)
+
+
+def test_prepare_drops_are_seen_even_when_the_write_fails(monkeypatch, cache):
+    collection = mongomock.MongoClient().NewsBiasApp.NewsArtciles
+    articles = [{"link": f"https://news.test/{i}", "title": "t", "text": TEXT} for i in range(4)]
+
+    def drop_odd(batch):
+        batch[:] = [a for a in batch if int(a["link"][-1]) % 2 == 0]
+
+    def failing_insert(collection, batch):
+        raise RuntimeError("write failed")
+
+    monkeypatch.setattr(webscapper, "_insert_batch", failing_insert)
+    webscapper.write_stream(
+        collection,
+        iter(articles),
+        batch_size=2,
+        prepare=drop_odd,
+        on_written=cache.mark_fetched,
+        on_dropped=cache.mark_fetched,
+    )
+
+    assert set(cache.seen) == {"https://news.test/1", "https://news.test/3"}
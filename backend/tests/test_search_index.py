@@ -0,0 +1,67 @@
+"""BM25SearchBackend.refresh against a collection that gains and loses articles."""
+
+import os
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+mongomock = pytest.importorskip("mongomock")
+
+
+@pytest.fixture
+def collection():
+    return mongomock.MongoClient().NewsBiasApp.NewsArtciles
+
+
+@pytest.fixture
+def config(tmp_path, nltk_data):
+    from src.search_index import SearchIndexConfig
+
+    return SearchIndexConfig(index_path=str(tmp_path / "search_index.pkl"))
+
+
+def test_refresh_indexes_new_documents_and_saves(collection, config):
+    from src.search_index import BM25Index, BM25SearchBackend
+
+    backend = BM25SearchBackend(config)
+    election = collection.insert_one({"title": "Election results", "text": "Votes were counted."}).inserted_id
+    football = collection.insert_one({"title": "Football", "text": "A match report."}).inserted_id
+
+    backend.refresh(collection, version=1)
+    assert [key for key, _ in backend.search("elections")] == [election]
+    assert len(BM25Index.load(config)) == 2
+
+    collection.delete_one({"_id": football})
+    budget = collection.insert_one({"title": "Budget", "text": "The election budget passed."}).inserted_id
+    backend.refresh(collection, version=2)
+    assert {key for key, _ in backend.search("election")} == {election, budget}
+    assert set(BM25Index.load(config).key_to_doc) == {election, budget}
+
+
+def test_refresh_is_a_no_op_for_a_known_version(collection, config):
+    from src.search_index import BM25SearchBackend
+
+    backend = BM25SearchBackend(config)
+    collection.insert_one({"title": "Election results", "text": "Votes were counted."})
+    backend.refresh(collection, version=1)
+    collection.insert_one({"title": "Later", "text": "Another election story."})
+    backend.refresh(collection, version=1)
+    assert len(backend.index) == 1
+
+
+def test_only_the_lock_holder_saves(collection, config):
+    from src.search_index import BM25SearchBackend, fcntl
+
+    if fcntl is None:
+        pytest.skip("no flock on this platform")
+    writer, reader = BM25SearchBackend(config), BM25SearchBackend(config)
+    collection.insert_one({"title": "Election results", "text": "Votes were counted."})
+
+    writer.refresh(collection, version=1)
+    saved = os.path.getmtime(config.index_path)
+    collection.insert_one({"title": "Later", "text": "Another election story."})
+    reader.refresh(collection, version=2)
+
+    assert len(reader.index) == 2
+    assert os.path.getmtime(config.index_path) == saved
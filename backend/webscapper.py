@@ -7,6 +7,17 @@ Discovery + extraction strategy (replaces the unmaintained newspaper3k):
     as a fallback for sites without a working feed.
   * extraction: trafilatura, which reliably pulls full article text,
     title, author and date from modern news sites.
+  * concurrency: all sites are discovered at once and pages are fetched
+    through fetch_engine, with global + per-host limits and per-host
+    politeness delays; extraction runs in a process pool.
+  * writes: the cron run streams articles straight into Mongo in small
+    unordered bulk batches (write_stream), so memory stays flat and a
+    crash late in the run keeps everything written so far. Each batch is
+    filtered for junk and date-stamped (retention.py), checked for
+    near-duplicates (near_dup.py: syndicated copies under other URLs are
+    clustered or dropped), then bias-scored before insert when the
+    classifier is available (scoring.py). The retention window is applied
+    once at the end of the run.
 
 Runs as a scheduled GitHub Actions cron (see .github/workflows/scrape_news.yml)
 and writes straight to Mongo with dedupe + cleanup, mirroring the old
@@ -14,13 +25,22 @@ Flask-era behaviour but without a Python server in the loop.
 """
 
 import os
-import time
 import json
+from concurrent.futures import FIRST_COMPLETED, wait
+from functools import partial
+from urllib.parse import urljoin
 
 import trafilatura
 from trafilatura.sitemaps import sitemap_search
 from trafilatura import extract_with_metadata
 
+from db import bulk_upsert_by_link, bump_data_version, ensure_indexes, get_collection
+from fetch_cache import FetchCache
+from fetch_engine import FetchConfig, FetchEngine
+from retention import enforce as enforce_retention
+from retention import ensure_ttl_index, filter_batch
+from scoring import load_pipeline, rescore_stale, score_articles
+
 # site -> (RSS feed, sitemap/base URL). The feed is tried first.
 SITES = [
     # (label, rss_feed_or_None, homepage_or_sitemap_base)
@@ -36,8 +56,12 @@ PER_SITE_LIMIT = 20  # max articles to fetch+extract per site per run
 MAX_SITEMAP_URLS = 60  # how many candidate URLs to pull from a sitemap
 
 
-def _discover_links(site):
-    """Return (title, url) pairs for a site using RSS then sitemap."""
+def _discover_links(site, cache: FetchCache = None):
+    """Return (title, url) pairs for a site using RSS then sitemap.
+
+    With a `cache`, feeds and sitemaps are requested conditionally and a
+    304 reuses the link list stored from the previous run.
+    """
     label, rss_url, base = site
     links = []
 
@@ -45,82 +69,219 @@ def _discover_links(site):
         try:
             import feedparser
 
-            feed = feedparser.parse(rss_url)
+            etag, modified = cache.validators(rss_url) if cache else (None, None)
+            feed = feedparser.parse(rss_url, etag=etag, modified=modified)
+            if cache and feed.get("status") == 304:
+                links = cache.not_modified(rss_url)
+                print(f"[{label}] rss: not modified, {len(links)} cached links")
+                if links:
+                    return links
             for e in feed.entries:
                 url = e.get("link")
                 if url:
                     links.append((e.get("title", ""), url))
             print(f"[{label}] rss: {len(links)} links")
             if links:
+                if cache:
+                    headers = feed.get("headers", {})
+                    cache.store_feed(
+                        rss_url,
+                        feed.get("etag"),
+                        feed.get("modified"),
+                        links,
+                        int(headers.get("content-length", 0) or 0),
+                    )
                 return links
         except Exception as ex:
             print(f"[{label}] rss failed ({type(ex).__name__}), falling back to sitemap")
 
     try:
+        sitemap_url = urljoin(base, "sitemap.xml")
+        status, etag, modified = cache.probe(sitemap_url) if cache else (None, None, None)
+        if status == 304:
+            links = cache.not_modified(sitemap_url)
+            print(f"[{label}] sitemap: not modified, {len(links)} cached links")
+            if links:
+                return links
+
         urls = sitemap_search(base, target_lang="en") or []
         print(f"[{label}] sitemap: {len(urls)} links")
-        return [("", u) for u in urls[:MAX_SITEMAP_URLS]]
+        links = [("", u) for u in urls[:MAX_SITEMAP_URLS]]
+        if cache and links and (etag or modified):
+            cache.store_feed(sitemap_url, etag, modified, links)
+        return links
     except Exception as ex:
         print(f"[{label}] sitemap failed ({type(ex).__name__})")
         return []
 
 
-def scrape(websites: list = None, count: int = 20) -> list:
-    """Fetch + extract articles for each site. Returns list of article dicts.
+def extract_article(html):
+    """trafilatura extraction, run in the engine's process pool.
 
-    `websites` is accepted for backwards compatibility with the old signature
-    but discovery now uses the SITES table above.
+    Returns a plain dict (picklable across processes) or None.
+    """
+    meta = extract_with_metadata(
+        html,
+        include_comments=False,
+        include_tables=False,
+        favor_precision=True,
+    )
+    if not meta:
+        return None
+    return {
+        "title": meta.title,
+        "text": meta.text,
+        "author": meta.author,
+        "date": meta.date,
+        "tags": meta.tags,
+        "categories": meta.categories,
+        "image": meta.image,
+    }
+
+
+def _to_article(url, title_hint, meta):
+    """Apply the length/title checks and build the stored article dict."""
+    if not meta or not meta["text"] or len(meta["text"]) < 200:
+        return None
+
+    title = (meta["title"] or title_hint or "").strip()
+    if not title:
+        return None
+
+    return {
+        "link": url,
+        "title": title,
+        "text": meta["text"],
+        "author": [meta["author"]] if meta["author"] else [],
+        "publish_date": meta["date"] if meta["date"] else None,
+        "keywords": meta["tags"] or [],
+        "tags": list(meta["categories"] or []) if meta["categories"] else [],
+        "thumbnail": meta["image"] if meta["image"] else None,
+    }
+
+
+def _page_bytes(page):
+    """Size of a downloaded page in bytes (fetchers return str or bytes)."""
+    if not page:
+        return 0
+    return len(page.encode()) if isinstance(page, str) else len(page)
+
+
+def _iter_extracted(sites, count, config, fetcher, cache):
+    """Yield (label, link_index, article) as soon as each article is extracted.
+
+    Discovery runs for every site at once; article pages are fetched under
+    the engine's global and per-host limits, and each site keeps pulling
+    candidates until it has `count` articles or runs out of links. Links
+    already in `cache` are skipped without being downloaded.
+
+    Only a bounded window of fetches (per_host per site) is ever in flight,
+    and new ones are submitted only when the consumer pulls the next item,
+    so a slow writer throttles the scraper instead of piling up pages.
+    """
+    config = config or FetchConfig()
+    limit = min(count, PER_SITE_LIMIT)
+    in_flight_per_site = max(1, config.per_host)
+
+    with FetchEngine(fetcher or trafilatura.fetch_url, extract_article, config) as engine:
+        discovered = engine.map(partial(_discover_links, cache=cache), sites)
+        queues = {site[0]: list(enumerate(links)) for site, links in zip(sites, discovered)}
+        found = {site[0]: 0 for site in sites}
+        active = {site[0]: 0 for site in sites}
+        pending = {}
+
+        def refill(label):
+            queue = queues[label]
+            while queue and active[label] < in_flight_per_site and (
+                found[label] + active[label] < limit
+            ):
+                idx, (title_hint, url) = queue.pop(0)
+                if cache and cache.is_seen(url):
+                    continue
+                pending[engine.submit_fetch(url)] = ("fetch", label, idx, title_hint, url)
+                active[label] += 1
+
+        for label in queues:
+            refill(label)
+
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for fut in done:
+                stage, label, idx, title_hint, url = pending.pop(fut)
+                article = None
+                try:
+                    result = fut.result()
+                    if stage == "fetch" and cache:
+                        cache.record_fetch(_page_bytes(result))
+                    if stage == "fetch" and result:
+                        pending[engine.submit_extract(result)] = ("extract", label, idx, title_hint, url)
+                        continue
+                    article = _to_article(url, title_hint, result) if stage == "extract" else None
+                    if stage == "extract" and article is None and cache:
+                        # downloaded but unusable (no text, too short, no title)
+                        cache.mark_seen(url)
+                    if article and found[label] < limit:
+                        found[label] += 1
+                        print(f"[{label}] extracted {len(article['text'])} chars: {url[:80]}")
+                    else:
+                        article = None
+                except Exception as ex:
+                    print(f"[{label}] failed {type(ex).__name__}: {url[:70]}")
+                    # a failed download is retried next run; a failed extraction is not
+                    if stage == "extract" and cache:
+                        cache.mark_seen(url)
+                active[label] -= 1
+                if article:
+                    yield label, idx, article
+                refill(label)
+
+    print(f"**Finished Parsing**\nTotal Articles - {sum(found.values())}")
+
+
+def iter_articles(
+    sites=None, count: int = 20, config: FetchConfig = None, fetcher=None, cache: FetchCache = None
+):
+    """discover -> fetch -> extract -> validate, one article at a time.
+
+    Articles come out in completion order and are never held in a list,
+    so memory stays flat however large the run is.
     """
-    articles = []
+    for _, _, article in _iter_extracted(
+        SITES if sites is None else sites, count, config, fetcher, cache
+    ):
+        if article.get("title") and article.get("text"):
+            yield article
+
+
+def scrape_sites(
+    sites, count: int = 20, config: FetchConfig = None, fetcher=None, cache: FetchCache = None
+) -> list:
+    """List wrapper over the streaming pipeline, in per-site link order."""
+    order = {site[0]: i for i, site in enumerate(sites)}
+    extracted = sorted(
+        _iter_extracted(sites, count, config, fetcher, cache),
+        key=lambda item: (order[item[0]], item[1]),
+    )
+    return [article for _, _, article in extracted]
+
+
+def _select_sites(websites):
+    """Entries of SITES matching `websites` by base URL or label (all if empty)."""
     sites = websites if websites else [s[2] for s in SITES]
+    return [
+        site
+        for site in SITES
+        if not sites or site[2] in sites or site[0] in [str(s) for s in sites]
+    ]
 
-    for site in SITES:
-        label, _, base = site
-        if sites and base not in sites and label not in [str(s) for s in sites]:
-            continue
-
-        links = _discover_links(site)
-        fetched = 0
-        for title_hint, url in links:
-            if fetched >= count or fetched >= PER_SITE_LIMIT:
-                break
-            try:
-                html = trafilatura.fetch_url(url)
-                if not html:
-                    continue
-                meta = extract_with_metadata(
-                    html,
-                    include_comments=False,
-                    include_tables=False,
-                    favor_precision=True,
-                )
-                if not meta or not meta.text or len(meta.text) < 200:
-                    continue
 
-                title = (meta.title or title_hint or "").strip()
-                if not title:
-                    continue
+def scrape(websites: list = None, count: int = 20, cache: FetchCache = None) -> list:
+    """Fetch + extract articles for each site. Returns list of article dicts.
 
-                articles.append(
-                    {
-                        "link": url,
-                        "title": title,
-                        "text": meta.text,
-                        "author": [meta.author] if meta.author else [],
-                        "publish_date": meta.date if meta.date else None,
-                        "keywords": meta.tags or [],
-                        "tags": list(meta.categories or []) if meta.categories else [],
-                        "thumbnail": meta.image if meta.image else None,
-                    }
-                )
-                fetched += 1
-                print(f"[{label}] extracted {len(meta.text)} chars: {url[:80]}")
-                time.sleep(0.3)  # be polite
-            except Exception as ex:
-                print(f"[{label}] failed {type(ex).__name__}: {url[:70]}")
-
-    print(f"**Finished Parsing**\nTotal Articles - {len(articles)}")
-    return articles
+    `websites` is accepted for backwards compatibility with the old signature
+    but discovery now uses the SITES table above.
+    """
+    return scrape_sites(_select_sites(websites), count, cache=cache)
 
 
 def save_to_json(data, output_file):
@@ -140,73 +301,166 @@ def save_to_json(data, output_file):
         print(f"Failed to save data to JSON. Error: {e}")
 
 
-def _insert_and_clean(collection, valid_results):
-    """Insert articles with dedupe + cleanup, mirroring the old backend."""
-    from pymongo.errors import BulkWriteError
+WRITE_BATCH_SIZE = int(os.getenv("SCRAPE_WRITE_BATCH", "25"))
 
+
+def _insert_batch(collection, batch):
+    """Unordered bulk upsert of one micro-batch; returns (added, duplicates)."""
+    return bulk_upsert_by_link(collection, batch)
+
+
+def write_stream(
+    collection,
+    articles,
+    batch_size: int = WRITE_BATCH_SIZE,
+    prepare=None,
+    on_written=None,
+    on_dropped=None,
+):
+    """Consume an article iterator, writing it to Mongo in micro-batches.
+
+    At most `batch_size` articles are buffered; each full batch is written
+    before the next article is pulled from the pipeline, so everything
+    before a crash is already durable. `prepare`, if given, is called on
+    each batch just before it is written (e.g. to score it) and may remove
+    articles from it; `on_dropped` gets the removed ones. `on_written` is
+    called with each batch once it is stored (not if the write failed).
+    Returns (added, duplicates).
+    """
     added_count = 0
     duplicate_count = 0
+    batch = []
+
+    def flush():
+        nonlocal added_count, duplicate_count
+        if prepare is not None:
+            pulled = list(batch)
+            prepare(batch)
+            if on_dropped is not None and len(batch) < len(pulled):
+                kept = {id(article) for article in batch}
+                on_dropped([article for article in pulled if id(article) not in kept])
+        if not batch:  # prepare may drop every article
+            return
+        try:
+            added, dupes = _insert_batch(collection, batch)
+            if on_written is not None:
+                on_written(batch)
+        except Exception as e:
+            print(f"Unexpected error: {str(e)}")
+            added, dupes = 0, len(batch)
+        added_count += added
+        duplicate_count += dupes
+        print(f"wrote batch: {added} added, {dupes} duplicates")
+        batch.clear()
+
+    for article in articles:
+        batch.append(article)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
 
+    return added_count, duplicate_count
+
+
+def load_near_dup(collection):
+    """The persistent near-duplicate index, or None if disabled/unavailable."""
+    try:
+        from near_dup import NearDupConfig, NearDupIndex
+    except ImportError as e:
+        print(f"near-dup detection disabled ({e})")
+        return None
+    config = NearDupConfig()
+    if not config.enabled:
+        return None
+    index = NearDupIndex.load(config)
     try:
-        result = collection.insert_many(valid_results, ordered=False)
-        added_count = len(result.inserted_ids)
-        duplicate_count = len(valid_results) - added_count
-    except BulkWriteError as bwe:
-        write_errors = bwe.details.get("writeErrors", [])
-        added_count = len(valid_results) - len(write_errors)
-        duplicate_count = len(write_errors)
+        index.load_from_collection(collection)
     except Exception as e:
-        print(f"Unexpected error: {str(e)}")
-        return 0, len(valid_results)
-
-    unwanted_texts = [
-        "",
-        "Get App for Better Experience",
-        "Log onto movie.ndtv.com for more celebrity pictures",
-        "No description available.",
-    ]
-    collection.delete_many(
-        {"title": {"$exists": True, "$regex": "^(?i)(dell|hp|acer|lenovo)"}}
-    )
-    collection.delete_many({"text": {"$in": unwanted_texts}})
+        print(f"near-dup seed note: {e}")
+    return index
 
-    total_count = collection.count_documents({})
-    if total_count > 1500:
-        excess_docs = total_count - 1500
-        oldest_docs = (
-            collection.find({}, {"_id": 1}).sort("published_date", 1).limit(excess_docs)
-        )
-        doc_ids = [doc["_id"] for doc in oldest_docs]
-        if doc_ids:
-            collection.delete_many({"_id": {"$in": doc_ids}})
 
+def prepare_batch(near_dup, pipeline, batch):
+    """Drop junk, cluster (or drop) near-duplicates, then score what is left."""
+    junk = filter_batch(batch)
+    if junk:
+        print(f"skipped {junk} junk articles")
+    if near_dup is not None:
+        near_dup.process(batch)
+    score_articles(pipeline, batch)
+
+
+def _clean(collection):
+    """Apply the retention window (retention.py) and report what it removed."""
+    report = enforce_retention(collection)
+    print(f"retention: removed {report['removed']} articles in {report['seconds']}s")
+    return report
+
+
+def _insert_and_clean(collection, valid_results):
+    """Insert articles with dedupe + cleanup, mirroring the old backend."""
+    added_count, duplicate_count = write_stream(collection, valid_results, prepare=filter_batch)
+    _clean(collection)
+    bump_data_version(collection.database)
     return added_count, duplicate_count
 
 
 def main():
     import dotenv
-    from pymongo import MongoClient
 
     dotenv.load_dotenv()
-    mongodb_url = str(os.getenv("MONGO_DB_URI")) + "&ssl_cert_reqs=CERT_NONE"
-    client = MongoClient(mongodb_url, serverSelectionTimeoutMS=30000)
-    db = client["NewsBiasApp"]
-    collection = db["NewsArtciles"]
+    collection = get_collection()
 
     # unique index on link so re-runs dedupe instead of duplicating
     try:
-        collection.create_index([("link", 1)], unique=True)
+        created = ensure_indexes(collection)
+        if created:
+            print(f"created indexes: {', '.join(created)}")
+        ttl = ensure_ttl_index(collection)
+        if ttl:
+            print(f"TTL index {ttl}")
     except Exception as e:
         print(f"index note: {e}")
 
-    results = scrape(count=PER_SITE_LIMIT)
-    valid_results = [r for r in results if r.get("title") and r.get("text")]
+    cache = FetchCache.load()
+    try:
+        cache.load_seen_from_collection(collection)
+    except Exception as e:
+        print(f"seen-link load note: {e}")
+
+    pipeline = load_pipeline()
+    near_dup = load_near_dup(collection)
+    try:
+        added, dupes = write_stream(
+            collection,
+            iter_articles(count=PER_SITE_LIMIT, cache=cache),
+            prepare=partial(prepare_batch, near_dup, pipeline),
+            on_written=cache.mark_fetched,
+            on_dropped=cache.mark_fetched,
+        )
+    finally:
+        cache.save()
+        print(cache.summary())
+        if near_dup is not None:
+            near_dup.save()
+            print(near_dup.summary())
+
+    # catch up on articles scored by an older model (or not scored at all)
+    rescored = 0
+    try:
+        rescored = rescore_stale(collection, pipeline)
+        if rescored:
+            print(f"re-scored {rescored} articles with model {pipeline.model_version}")
+    except Exception as e:
+        print(f"rescore note: {e}")
 
-    if not valid_results:
+    if not added and not dupes and not rescored:
         print("No valid results to insert")
         return
 
-    added, dupes = _insert_and_clean(collection, valid_results)
+    _clean(collection)
+    bump_data_version(collection.database)
     print(
         f"Scraping completed! Added articles: {added}, "
         f"Duplicates skipped: {dupes}, Total in DB: {collection.count_documents({})}"
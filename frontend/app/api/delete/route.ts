@@ -6,23 +6,38 @@ export async function DELETE() {
   try {
     const client = await clientPromise
     const collection: Collection = client.db("NewsBiasApp").collection("NewsArtciles")
-    
-    // Find oldest 1000 documents
-    const oldestDocs = await collection
-      .find({})
-      .sort({ published_date: 1 })
-      .limit(1000)
+    const start = performance.now()
+
+    // The 1000th oldest document, read from the (published_date, _id) index;
+    // everything at or before it goes in one range delete (backend/retention.py)
+    const [boundary] = await collection
+      .find({}, { projection: { published_date: 1 } })
+      .sort({ published_date: 1, _id: 1 })
+      .skip(999)
+      .limit(1)
       .toArray()
-    
-    const docIds = oldestDocs.map(doc => doc._id)
-    
-    if (docIds.length) {
-      const result = await collection.deleteMany({
-        _id: { $in: docIds }
-      })
-      
+    const cutoff = boundary ?? (await collection
+      .find({}, { projection: { published_date: 1 } })
+      .sort({ published_date: -1, _id: -1 })
+      .limit(1)
+      .next())
+
+    if (cutoff) {
+      const date = cutoff.published_date ?? null
+      const filter = date === null
+        ? { published_date: null, _id: { $lte: cutoff._id } }
+        : {
+            $or: [
+              { published_date: { $lt: date } },
+              { published_date: date, _id: { $lte: cutoff._id } },
+              { published_date: null },
+            ],
+          }
+      const result = await collection.deleteMany(filter)
+
       return NextResponse.json({
-        message: `Deleted ${result.deletedCount} documents`
+        message: `Deleted ${result.deletedCount} documents`,
+        seconds: (performance.now() - start) / 1000
       })
     }
     
@@ -35,4 +50,4 @@ export async function DELETE() {
       { status: 500 }
     )
   }
-}
\ No newline at end of file
+}
@@ -0,0 +1,73 @@
+import { afterEach, beforeEach, describe, expect, it, vi } from "vitest";
+
+// The session stub labels an article "right" (1) when the "constructor"
+// column is set, so the result shows whether that token was featurised.
+const { run } = vi.hoisted(() => ({ run: vi.fn() }));
+
+vi.mock("onnxruntime-web", () => ({
+	env: { wasm: {} },
+	InferenceSession: {
+		create: vi.fn(async () => ({
+			inputNames: ["float_input"],
+			outputNames: ["label"],
+			run,
+		})),
+	},
+	Tensor: class {
+		constructor(
+			public type: string,
+			public data: Float32Array,
+			public dims: number[]
+		) {}
+	},
+}));
+
+import { classifyText, predictBias } from "./onnxClassifier";
+
+// export_onnx.py leaves identity entries out of the lemma table, so words
+// like "constructor" are absent from it, exactly as in a real export
+const meta = {
+	vocab: ["bill", "constructor", "vote"],
+	idf: [1, 1, 1],
+	norm: "l2",
+	lemma: { votes: "vote" },
+	n_features: 3,
+	accuracy: 1,
+	stopwords: ["the", "of"],
+};
+
+describe("onnxClassifier", () => {
+	beforeEach(() => {
+		vi.stubGlobal(
+			"fetch",
+			vi.fn(async () => ({
+				ok: true,
+				json: async () => meta,
+				arrayBuffer: async () => new ArrayBuffer(0),
+			}))
+		);
+		run.mockImplementation(async (feeds) => {
+			const features: Float32Array = feeds.float_input.data;
+			return { label: { data: [features[1] > 0 ? BigInt(1) : BigInt(0)] } };
+		});
+	});
+
+	afterEach(() => {
+		vi.unstubAllGlobals();
+		run.mockReset();
+	});
+
+	it("classifies text containing Object.prototype names", async () => {
+		await expect(classifyText("The Constructor of the bill")).resolves.toBe("right");
+
+		const features: Float32Array = run.mock.calls[0][0].float_input.data;
+		expect(Array.from(features)).toEqual([Math.SQRT1_2, Math.SQRT1_2, 0].map(Math.fround));
+	});
+
+	it("applies the lemma table", async () => {
+		await expect(predictBias({ title: "Votes", text: "toString valueOf" })).resolves.toBe("left");
+
+		const features: Float32Array = run.mock.calls[0][0].float_input.data;
+		expect(Array.from(features)).toEqual([0, 0, 1]);
+	});
+});
@@ -12,13 +12,21 @@ type Meta = {
 	n_features: number;
 	accuracy: number;
 	stopwords: string[];
+	// model input column -> vocab index; absent for full-vocab models
+	feature_index?: number[];
 };
 
 type LoadedModel = {
 	meta: Meta;
 	session: ort.InferenceSession;
 	stopwordSet: Set<string>;
+	// a Map, not the JSON object: identity entries are left out of the
+	// table, so a plain-object lookup of e.g. "constructor" would hit
+	// Object.prototype
+	lemma: Map<string, string>;
 	vocabIndex: Map<string, number>;
+	// vocab index -> model input column
+	inputColumn: Map<number, number> | null;
 };
 
 let modelPromise: Promise<LoadedModel> | null = null;
@@ -44,7 +52,11 @@ export async function loadOnnxModel(): Promise<LoadedModel> {
 				meta,
 				session,
 				stopwordSet: new Set(meta.stopwords),
+				lemma: new Map(Object.entries(meta.lemma)),
 				vocabIndex: new Map(meta.vocab.map((w, i) => [w, i])),
+				inputColumn: meta.feature_index
+					? new Map(meta.feature_index.map((f, i) => [f, i]))
+					: null,
 			};
 		} catch (err) {
 			// Reset so a transient failure (e.g. WASM still warm on first load)
@@ -62,35 +74,41 @@ export async function loadOnnxModel(): Promise<LoadedModel> {
  * 1. lowercase -> strip non [a-zA-Z0-9\s-] -> drop stopwords -> lemmatize
  * 2. tokenize with sklearn's token_pattern (?u)\b\w\w+\b
  * 3. count -> * idf -> L2 normalize
+ * Counts are kept sparse (vocab index -> count); the L2 norm is taken over
+ * every term, then only the model's input columns are written out.
  */
 function buildFeatures(text: string, m: LoadedModel): Float32Array {
-	const { meta, stopwordSet, vocabIndex } = m;
-	const vec = new Float32Array(meta.n_features);
+	const { meta, stopwordSet, lemma, vocabIndex, inputColumn } = m;
+	const counts = new Map<number, number>();
 
 	const cleaned = text
 		.toLowerCase()
 		.replace(/[^a-zA-Z0-9\s-]/g, "")
 		.split(/\s+/)
 		.filter((w) => w.length > 0 && !stopwordSet.has(w))
-		.map((w) => meta.lemma[w] ?? w);
+		.map((w) => lemma.get(w) ?? w);
 
 	const tokenRe = /[a-zA-Z0-9-]{2,}/g;
 	for (const w of cleaned) {
 		for (const tok of w.match(tokenRe) || []) {
 			const idx = vocabIndex.get(tok);
-			if (idx !== undefined) vec[idx] += 1;
+			if (idx !== undefined) counts.set(idx, (counts.get(idx) ?? 0) + 1);
 		}
 	}
 
-	for (let i = 0; i < meta.n_features; i++) vec[i] *= meta.idf[i];
-
-	if (meta.norm === "l2") {
-		let sum = 0;
-		for (let i = 0; i < meta.n_features; i++) sum += vec[i] * vec[i];
-		const n = Math.sqrt(sum);
-		if (n > 0) for (let i = 0; i < meta.n_features; i++) vec[i] /= n;
+	let sum = 0;
+	for (const [idx, count] of counts) {
+		const w = count * meta.idf[idx];
+		counts.set(idx, w);
+		sum += w * w;
 	}
+	const n = meta.norm === "l2" && sum > 0 ? Math.sqrt(sum) : 1;
 
+	const vec = new Float32Array(meta.n_features);
+	for (const [idx, w] of counts) {
+		const col = inputColumn ? inputColumn.get(idx) : idx;
+		if (col !== undefined) vec[col] = w / n;
+	}
 	return vec;
 }
 
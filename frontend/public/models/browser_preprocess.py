@@ -5,37 +5,95 @@ In the browser this file is made importable by adding /models to sys.path,
 so pickle.load() can resolve the class without needing the FastAPI backend.
 
 Identical behaviour to backend/src/utils.py: lowercase -> strip non
-[a-zA-Z0-9-] -> drop NLTK english stopwords -> WordNet lemmatize.
+[a-zA-Z0-9-] -> drop NLTK english stopwords -> WordNet lemmatize, with the
+same memoised lemma lookup (bounded LRU, optionally seeded from the
+model_meta.json lemma table).
 """
 
+import json
 import re
+from functools import lru_cache
 
+import pandas as pd
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
 from sklearn.base import BaseEstimator, TransformerMixin
 
 stop_words = set(stopwords.words("english"))
 
+NON_TOKEN_RE = re.compile(r"[^a-zA-Z0-9\s-]")
+LEMMA_CACHE_SIZE = 1 << 17
+
 
 class TextPreprocessor(BaseEstimator, TransformerMixin):
-    def __init__(self):
+    def __init__(self, lemma_cache_size=LEMMA_CACHE_SIZE):
         self.lemmatizer = WordNetLemmatizer()
+        self.lemma_cache_size = lemma_cache_size
+
+    def __getstate__(self):
+        state = dict(super().__getstate__())
+        state.pop("_lemmatize", None)
+        state.pop("_lemma_table", None)
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault("lemma_cache_size", LEMMA_CACHE_SIZE)
+        super().__setstate__(state)
+
+    def load_lemma_table(self, table):
+        """Preload word -> lemma pairs (dict or path to model_meta.json)."""
+        if isinstance(table, str):
+            with open(table, "r", encoding="utf-8") as f:
+                table = json.load(f)["lemma"]
+        self._lemma_table = dict(table)
+        self.__dict__.pop("_lemmatize", None)
+        return self
+
+    def _get_lemmatize(self):
+        lemmatize = self.__dict__.get("_lemmatize")
+        if lemmatize is None:
+            cached = lru_cache(maxsize=self.lemma_cache_size)(
+                self.lemmatizer.lemmatize
+            )
+            table = self.__dict__.get("_lemma_table")
+            if table:
+
+                def lemmatize(word, _get=table.get, _cached=cached):
+                    lemma = _get(word)
+                    return lemma if lemma is not None else _cached(word)
+
+            else:
+                lemmatize = cached
+            self._lemmatize = lemmatize
+        return lemmatize
 
     def preprocess_text(self, text):
         if isinstance(text, str):
-            text = text.lower()
-            text = re.sub(r"[^a-zA-Z0-9\s-]", "", text)
+            lemmatize = self._get_lemmatize()
+            text = NON_TOKEN_RE.sub("", text.lower())
             text = " ".join(
-                [
-                    self.lemmatizer.lemmatize(word)
-                    for word in text.split()
-                    if word not in stop_words
-                ]
+                [lemmatize(word) for word in text.split() if word not in stop_words]
             )
         return text
 
+    def preprocess_batch(self, texts):
+        lemmatize = self._get_lemmatize()
+        sub = NON_TOKEN_RE.sub
+        return [
+            " ".join(
+                [lemmatize(w) for w in sub("", t.lower()).split() if w not in stop_words]
+            )
+            if isinstance(t, str)
+            else t
+            for t in texts
+        ]
+
     def fit(self, X, y=None):
         return self
 
     def transform(self, X, y=None):
-        return X.apply(self.preprocess_text)
+        if not isinstance(X, pd.Series):
+            return X.apply(self.preprocess_text)
+        return pd.Series(
+            self.preprocess_batch(X.tolist()), index=X.index, name=X.name, dtype=object
+        )
@@ -13,16 +13,33 @@ token pattern) runs in JavaScript. This ships:
 
   * model.onnx          — XGBoost classifier, dense float input
   * model_meta.json     — vocab, idf, norm, lemma table for the JS feature builder
+  * model_meta.bin      — the same metadata as a binary bundle (raw float32
+                          idf, sorted string tables with offsets, small JSON
+                          header; see backend/src/pipeline/meta_bundle.py)
 
 The JS feature builder must match sklearn's TfidfVectorizer.transform
 exactly (verified below to ~1e-8).
+
+Pruning: the dense model only ever splits on a small fraction of the
+vocabulary, so after the first fit we keep just the features the booster
+uses, retrain on those columns and export a model whose input is
+len(feature_index) wide instead of the whole vocabulary. `feature_index`
+in model_meta.json maps each model input column to its vocabulary index.
+The full vocab/idf stay in the meta because the l2 norm is taken over
+every term of a document, not only the kept ones. Features are built
+sparse (term -> weight) and only the kept columns are densified.
+Pass --no-prune to export the full-width model, or --lemma-only to
+rebuild just the lemma table of the current export.
 """
 
+import argparse
+
 import json
 import os
 import pickle
 import re
 import sys
+import time
 
 import numpy as np
 import pandas as pd
@@ -31,15 +48,37 @@ import xgboost
 
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, os.path.join(ROOT, "public", "models"))
-from browser_preprocess import TextPreprocessor  # noqa: E402
+from browser_preprocess import NON_TOKEN_RE, TextPreprocessor, stop_words  # noqa: E402
+
+sys.path.insert(0, os.path.join(ROOT, "..", "backend"))
+from src.components.feature_cache import FeatureCache, FeatureCacheConfig  # noqa: E402
+from src.pipeline.meta_bundle import read_meta, write_bundle  # noqa: E402
 
 print("export stack: sklearn", sklearn.__version__, "| xgboost", xgboost.__version__)
 
-TRAIN = os.path.join(ROOT, "..", "backend", "artifacts", "train.csv")
-TEST = os.path.join(ROOT, "..", "backend", "artifacts", "test.csv")
+ARTIFACTS = os.path.join(ROOT, "..", "backend", "artifacts")
+
+
+def split_path(name):
+    """artifacts/<name>.parquet from ingestion, falling back to the CSV."""
+    path = os.path.join(ARTIFACTS, name + ".parquet")
+    return path if os.path.exists(path) else os.path.join(ARTIFACTS, name + ".csv")
+
+
+def read_split(name, columns=("text", "target")):
+    path = split_path(name)
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path, columns=list(columns))
+    else:
+        df = pd.read_csv(path, usecols=list(columns))
+    if "target" in df and isinstance(df["target"].dtype, pd.CategoricalDtype):
+        df["target"] = df["target"].astype(df["target"].cat.categories.dtype)
+    return df
+
 
 OUT_ONNX = os.path.join(ROOT, "public", "models", "model.onnx")
 OUT_META = os.path.join(ROOT, "public", "models", "model_meta.json")
+OUT_BUNDLE = os.path.join(ROOT, "public", "models", "model_meta.bin")
 
 
 def load_vectorizer():
@@ -48,117 +87,287 @@ def load_vectorizer():
     return preprocess.transformers_[0][1].named_steps["vectorize"]
 
 
-def build_lemma_table(vectorizer, train):
-    """word -> lemma for every token in the corpus + vocabulary."""
+def vocab_inflections(vocab, lemmatizer, rounds=2):
+    """Words WordNet lemmatizes (as nouns) to a vocabulary term, or to such
+    a word again (`rounds` deep).
+
+    Inverts WordNet's noun suffix rules and exception list, keeping only
+    candidates the lemmatizer really maps back, so plurals that never
+    occurred in the training corpus still resolve to their vocab term.
+    """
+    from nltk.corpus import wordnet
+
+    wordnet.ensure_loaded()
+    rules = wordnet.MORPHOLOGICAL_SUBSTITUTIONS[wordnet.NOUN]
+    exceptions = {}
+    for form, bases in wordnet._exception_map[wordnet.NOUN].items():
+        for base in bases:
+            exceptions.setdefault(base, []).append(form)
+
+    found, targets = set(), set(vocab)
+    for _ in range(rounds):
+        new = set()
+        for lemma in targets:
+            candidates = [
+                lemma[: len(lemma) - len(suffix)] + old for old, suffix in rules if lemma.endswith(suffix)
+            ]
+            for word in candidates + exceptions.get(lemma, []):
+                if word != lemma and word not in found and lemmatizer.lemmatize(word) == lemma:
+                    new.add(word)
+        found |= new
+        targets = new
+    return found
+
+
+def build_lemma_table(vectorizer, texts, stop_words):
+    """word -> lemma for every word the JS/ONNX feature builders can meet.
+
+    Keys are the raw words those builders look up: lowercased, stripped
+    and stopword-filtered, but not yet lemmatized (a table built from
+    already lemmatized text misses "details", "says", "geese", ...). They
+    come from the vocabulary, every such word of `texts` (the training
+    corpus) and vocab_inflections.
+    """
     from nltk.stem import WordNetLemmatizer
 
     lemmatizer = WordNetLemmatizer()
-    table = {}
-    pre = TextPreprocessor()
-    for w in vectorizer.vocabulary_:
-        table[w] = lemmatizer.lemmatize(w)
-    for doc in train["text"].apply(pre.preprocess_text):
-        for w in doc.split():
-            if w not in table:
-                table[w] = lemmatizer.lemmatize(w)
-    return table
-
-
-def js_features_builder(vectorizer, idf, norm, table):
-    """Return a function that builds features exactly like the JS code."""
+    words = set(vectorizer.vocabulary_)
+    for text in texts:
+        if isinstance(text, str):
+            words.update(w for w in NON_TOKEN_RE.sub("", text.lower()).split() if w not in stop_words)
+    words |= vocab_inflections(vectorizer.vocabulary_, lemmatizer)
+    return {w: lemmatizer.lemmatize(w) for w in sorted(words)}
+
+
+def js_features_builder(vectorizer, idf, norm, feature_index=None):
+    """Return a function that builds the features the JS code must produce.
+
+    Words are lemmatized by NLTK itself, as sklearn's pipeline does, so
+    any word missing from the exported lemma table shows up as a
+    difference. Terms are accumulated sparsely; the returned vector holds only the
+    model's input columns (`feature_index`, or the whole vocab if None).
+    """
     vocab = vectorizer.vocabulary_
     tok = re.compile(r"(?u)\b\w\w+\b")
-    n = len(vocab)
     idf_arr = np.array(idf, dtype=np.float32)
+    if feature_index is None:
+        width, column = len(vocab), None
+    else:
+        width, column = len(feature_index), {f: i for i, f in enumerate(feature_index)}
+
+    preprocessor = TextPreprocessor()
 
     def build(text):
-        clean = TextPreprocessor().preprocess_text(text)
-        vec = np.zeros(n, dtype=np.float32)
+        clean = preprocessor.preprocess_text(text)
+        counts = {}
         for w in tok.findall(clean):
-            lemma = table.get(w, w)
-            if lemma in vocab:
-                vec[vocab[lemma]] += 1.0
-        vec *= idf_arr
+            idx = vocab.get(w)
+            if idx is not None:
+                counts[idx] = counts.get(idx, 0) + 1
+        vec = np.zeros(width, dtype=np.float32)
+        if not counts:
+            return vec
+        idx = np.fromiter(counts, dtype=np.int64, count=len(counts))
+        weights = np.fromiter(counts.values(), dtype=np.float32, count=len(counts)) * idf_arr[idx]
         if norm == "l2":
-            nrm = np.sqrt((vec ** 2).sum())
+            nrm = np.sqrt((weights ** 2).sum())
             if nrm > 0:
-                vec /= nrm
+                weights /= nrm
+        if column is None:
+            vec[idx] = weights
+        else:
+            for i, w in zip(idx.tolist(), weights):
+                if i in column:
+                    vec[column[i]] = w
         return vec
 
     return build
 
 
+def used_features(clf):
+    """Vocabulary indices the booster splits on, ascending."""
+    score = clf.get_booster().get_score(importance_type="weight")
+    return sorted(int(name[1:]) for name in score)
+
+
+def to_onnx(clf, n_inputs):
+    from onnxmltools import convert_xgboost
+    from onnxmltools.convert.common.data_types import FloatTensorType
+
+    return convert_xgboost(
+        clf.get_booster(),
+        initial_types=[("features", FloatTensorType([None, n_inputs]))],
+        target_opset=15,
+    ).SerializeToString()
+
+
+def evaluate(name, onnx_bytes, build, texts, sk_feats, sk_preds):
+    """ONNX(JS features) agreement, feature parity and time per inference."""
+    import onnxruntime as rt
+
+    sess = rt.InferenceSession(onnx_bytes, providers=["CPUExecutionProvider"])
+    input_name = sess.get_inputs()[0].name
+    output_name = sess.get_outputs()[0].name
+
+    start = time.perf_counter()
+    feats = np.stack([build(t) for t in texts])
+    build_ms = (time.perf_counter() - start) / len(texts) * 1000
+
+    start = time.perf_counter()
+    for row in feats:
+        sess.run([output_name], {input_name: row[None, :]})
+    run_ms = (time.perf_counter() - start) / len(texts) * 1000
+
+    ort_preds = sess.run([output_name], {input_name: feats})[0]
+    match = (ort_preds.ravel().astype(int) == sk_preds).mean()
+    diff = np.abs(sk_feats - feats).max()
+    print(
+        f"[{name}] ONNX(JS features) vs sklearn on {len(texts)} samples: {match:.4f} | "
+        f"max feature diff: {diff:.2e} | "
+        f"per inference: features {build_ms:.3f} ms + onnx {run_ms:.3f} ms"
+    )
+
+
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--no-prune", action="store_true", help="export the full-vocab model")
+    parser.add_argument("--no-bundle", action="store_true", help="skip model_meta.bin")
+    parser.add_argument("--no-cache", action="store_true", help="rebuild cached text/TF-IDF features")
+    parser.add_argument(
+        "--lemma-only", action="store_true", help="rebuild only the lemma table of the current export"
+    )
+    args = parser.parse_args()
+
     vectorizer = load_vectorizer()
+    if args.lemma_only:
+        refresh_lemma_table(vectorizer, write_bin=not args.no_bundle)
+        return
     n_features = len(vectorizer.vocabulary_)
     idf = vectorizer.idf_.astype(np.float32).tolist()
     norm = getattr(vectorizer, "norm", "l2")
 
-    train = pd.read_csv(TRAIN)
-    test = pd.read_csv(TEST)
-    pre = TextPreprocessor()
+    train = read_split("train")
+    test = read_split("test")
+    # cleaned text and TF-IDF are shared with training via the feature cache
+    cache = FeatureCache(
+        FeatureCacheConfig(cache_dir=os.path.join(ARTIFACTS, "feature_cache")), refresh=args.no_cache
+    )
 
-    print("building lemma table (train corpus)...")
-    table = build_lemma_table(vectorizer, train)
+    print("building lemma table (raw train corpus + vocab inflections)...")
+    table = build_lemma_table(vectorizer, train["text"], stop_words)
 
     print("fitting dense classifier...")
-    X_tr = vectorizer.transform(train["text"].apply(pre.preprocess_text)).toarray().astype(np.float32)
-    X_te = vectorizer.transform(test["text"].apply(pre.preprocess_text)).toarray().astype(np.float32)
+    # TF-IDF stays sparse; only the training matrix is densified, because
+    # xgboost reads sparse zeros as missing and the model must see 0.0
+    X_tr = cache.tfidf(split_path("train"), vectorizer).astype(np.float32).tocsc()
+    X_te = cache.tfidf(split_path("test"), vectorizer).astype(np.float32).tocsc()
+    print(f"feature cache: {cache.stats}")
     y_tr = train["target"].values
     y_te = test["target"].values
 
     clf = xgboost.XGBClassifier()
-    clf.fit(X_tr, y_tr)
-    acc = (clf.predict(X_te) == y_te).mean()
-    print(f"dense-trained test accuracy: {acc:.4f}")
+    clf.fit(X_tr.toarray(), y_tr)
+    acc = (clf.predict(X_te.toarray()) == y_te).mean()
+    print(f"dense-trained test accuracy: {acc:.4f} ({n_features} features)")
+
+    texts = test["text"].iloc[:300]
+    sk_preds = clf.predict(X_te[:300].toarray())
+    full_onnx = to_onnx(clf, n_features)
+    evaluate(
+        "full",
+        full_onnx,
+        js_features_builder(vectorizer, idf, norm),
+        texts,
+        X_te[:300].toarray(),
+        sk_preds,
+    )
+    print(f"[full] model.onnx {len(full_onnx)} bytes, input width {n_features}")
+
+    feature_index = None
+    onnx_bytes = full_onnx
+    if not args.no_prune:
+        feature_index = used_features(clf)
+        print(f"pruning to {len(feature_index)} of {n_features} features the booster splits on...")
+        clf = xgboost.XGBClassifier()
+        clf.fit(X_tr[:, feature_index].toarray(), y_tr)
+        X_te_kept = X_te[:, feature_index].toarray()
+        pruned_acc = (clf.predict(X_te_kept) == y_te).mean()
+        print(f"pruned test accuracy: {pruned_acc:.4f} (full: {acc:.4f})")
+        acc = pruned_acc
+
+        onnx_bytes = to_onnx(clf, len(feature_index))
+        evaluate(
+            "pruned",
+            onnx_bytes,
+            js_features_builder(vectorizer, idf, norm, feature_index),
+            texts,
+            X_te_kept[:300],
+            clf.predict(X_te_kept[:300]),
+        )
 
     # ---- export ONNX ----
-    from onnxmltools import convert_xgboost
-    from onnxmltools.convert.common.data_types import FloatTensorType
-
-    booster = clf.get_booster()
-    model_onnx = convert_xgboost(
-        booster,
-        initial_types=[("features", FloatTensorType([None, n_features]))],
-        target_opset=15,
-    )
     with open(OUT_ONNX, "wb") as f:
-        f.write(model_onnx.SerializeToString())
+        f.write(onnx_bytes)
     print("wrote", OUT_ONNX, os.path.getsize(OUT_ONNX), "bytes")
 
     meta = {
         "vocab": [w for w, _ in sorted(vectorizer.vocabulary_.items(), key=lambda kv: kv[1])],
         "idf": idf,
         "norm": norm,
-        "lemma": table,
-        "n_features": n_features,
+        # identity entries are redundant: lookups fall back to the word itself
+        "lemma": {w: l for w, l in table.items() if w != l},
+        "n_features": len(feature_index) if feature_index else n_features,
         "accuracy": acc,
         "stopwords": sorted(
             __import__("nltk").corpus.stopwords.words("english")
         ),
     }
+    if feature_index:
+        meta["feature_index"] = feature_index
     with open(OUT_META, "w") as f:
         json.dump(meta, f)
     print("wrote", OUT_META, os.path.getsize(OUT_META), "bytes")
 
-    # ---- verify: JS feature builder + ONNX == sklearn dense ----
-    import onnxruntime as rt
+    if not args.no_bundle:
+        write_bundle(meta, OUT_BUNDLE)
+        print("wrote", OUT_BUNDLE, os.path.getsize(OUT_BUNDLE), "bytes")
+        compare_meta_formats(texts)
 
-    sess = rt.InferenceSession(OUT_ONNX, providers=["CPUExecutionProvider"])
-    input_name = sess.get_inputs()[0].name
-    output_name = sess.get_outputs()[0].name
 
-    build = js_features_builder(vectorizer, idf, norm, table)
-    feats = np.stack([build(t) for t in test["text"].iloc[:300]])
-    sk_preds = clf.predict(X_te[:300])
-    ort_preds = sess.run([output_name], {input_name: feats})[0]
-    match = (ort_preds.ravel().astype(int) == sk_preds).mean()
-    print(f"ONNX(JS features) vs sklearn on 300 samples: {match:.4f}")
+def refresh_lemma_table(vectorizer, write_bin=True):
+    """Rebuild the lemma table of the exported model_meta.json in place.
 
-    # feature parity
-    sk_feats = X_te[:300]
-    diff = np.abs(sk_feats - feats).max()
-    print(f"max feature diff vs sklearn.transform: {diff:.2e}")
+    The model and every other field are kept. Words come from the train
+    split when it is on disk, and otherwise from the current table's keys.
+    """
+    meta = read_meta(OUT_META)
+    path = split_path("train")
+    texts = read_split("train", columns=("text",))["text"] if os.path.exists(path) else list(meta["lemma"])
+    table = build_lemma_table(vectorizer, texts, stop_words)
+    meta["lemma"] = {w: l for w, l in table.items() if w != l}
+    with open(OUT_META, "w") as f:
+        json.dump(meta, f)
+    print("wrote", OUT_META, os.path.getsize(OUT_META), "bytes", f"({len(meta['lemma'])} lemma entries)")
+    if write_bin:
+        write_bundle(meta, OUT_BUNDLE)
+        print("wrote", OUT_BUNDLE, os.path.getsize(OUT_BUNDLE), "bytes")
+
+
+def compare_meta_formats(texts):
+    """Load time of both meta formats, and identical features from each."""
+    from src.pipeline.onnx_pipeline import OnnxFeatureBuilder
+
+    builders = {}
+    for path in (OUT_META, OUT_BUNDLE):
+        start = time.perf_counter()
+        builders[path] = OnnxFeatureBuilder(read_meta(path))
+        elapsed = time.perf_counter() - start
+        print(
+            f"{os.path.basename(path)}: {os.path.getsize(path)} bytes, "
+            f"load + builder {elapsed * 1000:.1f} ms"
+        )
+    a, b = (builders[p].transform(list(texts)) for p in (OUT_META, OUT_BUNDLE))
+    print(f"max feature diff json vs bundle: {np.abs(a - b).max():.2e}")
 
 
 if __name__ == "__main__":
@@ -8,6 +8,7 @@ joblib 1.5.3, pandas 3.0.2, xgboost 2.1.4, nltk 3.9.4
 Same data, same preprocessing, same model class as the original repo.
 """
 
+import argparse
 import os
 import re
 import pickle
@@ -29,8 +30,27 @@ ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, os.path.join(ROOT, "public", "models"))
 from browser_preprocess import TextPreprocessor  # noqa: E402
 
-TRAIN = os.path.join(ROOT, "..", "backend", "artifacts", "train.csv")
-TEST = os.path.join(ROOT, "..", "backend", "artifacts", "test.csv")
+sys.path.insert(0, os.path.join(ROOT, "..", "backend"))
+from src.components.feature_cache import FeatureCache, FeatureCacheConfig  # noqa: E402
+
+ARTIFACTS = os.path.join(ROOT, "..", "backend", "artifacts")
+
+
+def split_path(name):
+    """artifacts/<name>.parquet from ingestion, falling back to the CSV."""
+    path = os.path.join(ARTIFACTS, name + ".parquet")
+    return path if os.path.exists(path) else os.path.join(ARTIFACTS, name + ".csv")
+
+
+def read_split(name, columns=("text", "target")):
+    path = split_path(name)
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path, columns=list(columns))
+    else:
+        df = pd.read_csv(path, usecols=list(columns))
+    if "target" in df and isinstance(df["target"].dtype, pd.CategoricalDtype):
+        df["target"] = df["target"].astype(df["target"].cat.categories.dtype)
+    return df
 
 
 def build_pipeline():
@@ -53,15 +73,32 @@ def build_pipeline():
 
 
 def main():
-    train = pd.read_csv(TRAIN)
-    test = pd.read_csv(TEST)
-    X_train, y_train = train[["text"]], train["target"]
-    X_test, y_test = test[["text"]], test["target"]
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--no-cache", action="store_true", help="rebuild cached cleaned text")
+    args = parser.parse_args()
+
+    train = read_split("train")
+    test = read_split("test")
+    y_train, y_test = train["target"], test["target"]
+
+    # NLTK cleaning comes from the shared feature cache; fit on the cleaned
+    # text with the preprocessing step bypassed, then put it back below
+    cache = FeatureCache(
+        FeatureCacheConfig(cache_dir=os.path.join(ARTIFACTS, "feature_cache")), refresh=args.no_cache
+    )
+    X_train = pd.DataFrame({"text": cache.clean_text(split_path("train"))})
+    X_test = pd.DataFrame({"text": cache.clean_text(split_path("test"))})
 
     pipe = build_pipeline()
+    pipe.set_params(preprocess__text_pipeline__text_preprocessing="passthrough")
     pipe.fit(X_train, y_train)
 
     y_pred = pipe.predict(X_test)
+
+    pipe.set_params(preprocess__text_pipeline__text_preprocessing=TextPreprocessor())
+    pipe.named_steps["preprocess"].transformers_[0][1].set_params(
+        text_preprocessing=TextPreprocessor()
+    )
     print(f"test accuracy  : {accuracy_score(y_test, y_pred):.4f}")
     print(f"test f1        : {f1_score(y_test, y_pred):.4f}")
     print(f"test precision : {precision_score(y_test, y_pred):.4f}")